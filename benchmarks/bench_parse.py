@@ -0,0 +1,94 @@
+"""
+Parse benchmark: astropy.io.ascii.read (with format guessing, as the
+original code used) against comp333.files.mist_reader.
+
+By default synthetic files of realistic size are generated (one 707-EEP,
+77-column track and a 107-age isochrone); pass real MIST files with
+--track / --iso to measure those instead.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_parse [--track F.track.eep] [--iso F.iso.cmd] [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from comp333.files.mist_reader import (  # noqa: E402
+    ISO_LOG_AGE, ISO_LOG_L, ISO_LOG_TEFF, LOG_L, LOG_TEFF, STAR_AGE, read_iso, read_track,
+)
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _compare(name, path, astropy_fn, reader_fn, repeat):
+    astropy_s = _time(astropy_fn, repeat)
+    reader_s = _time(reader_fn, repeat)
+    result = {
+        "file": name,
+        "path": path,
+        "size_mb": round(os.path.getsize(path) / 1e6, 2),
+        "astropy_s": round(astropy_s, 4),
+        "mist_reader_s": round(reader_s, 4),
+        "speedup": round(astropy_s / reader_s, 1),
+    }
+    print(f"{name:<8s} {result['size_mb']:7.2f} MB  astropy {astropy_s:8.3f} s  "
+          f"mist_reader {reader_s:8.3f} s  x{result['speedup']}")
+    return result
+
+
+def run_parse_benchmark(track_path=None, iso_path=None, repeat=5):
+    from astropy.io import ascii
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if track_path is None or iso_path is None:
+            from mist_fixtures import write_isochrone, write_track
+            track_path = track_path or write_track(os.path.join(tmp_dir, "00100M.track.eep"), 1.0)
+            iso_path = iso_path or write_isochrone(os.path.join(tmp_dir, "bench.iso.cmd"))
+
+        return [
+            _compare(
+                "track", track_path,
+                lambda: ascii.read(track_path),
+                lambda: read_track(track_path, (STAR_AGE, LOG_L, LOG_TEFF)),
+                repeat,
+            ),
+            # astropy reads a multi-block .iso.cmd as one table, as plt_iso used to
+            _compare(
+                "iso", iso_path,
+                lambda: ascii.read(iso_path),
+                lambda: read_iso(iso_path, (ISO_LOG_AGE, ISO_LOG_TEFF, ISO_LOG_L)),
+                max(1, repeat // 2),
+            ),
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--track", help="a real .track.eep file")
+    parser.add_argument("--iso", help="a real .iso.cmd file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run_parse_benchmark(args.track, args.iso, args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
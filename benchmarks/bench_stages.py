@@ -0,0 +1,321 @@
+"""
+Stage-by-stage benchmark of the run_from_config pipeline.
+
+Every stage is timed on its own against synthetic MIST-format data written
+at realistic sizes (77-column, 707-EEP tracks; a 107-age isochrone file):
+
+  download         fetch + extract an EEPS tarball from a local HTTP server
+  manifest         cold manifest build and warm find_eep_dir lookups
+  track parse      load_eep_grid with a cold and a warm track cache, and packed
+  interpolation    interpolate_masses for a fan of masses
+  isochrone        index build + age block read, cold and warm
+  constraints      draw_constraints for a mixed list of points
+  render           save_figure of a full HR diagram, and a full cached run
+
+Results are written as JSON so runs from different releases can be
+compared; --compare flags stages that got slower than a saved baseline.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_stages [--tracks 40] [--repeat 5] [--json out.json]
+                                       [--compare baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+from mist_fixtures import mass_to_code, write_eep_dir, write_iso_dir  # noqa: E402
+from comp333.files import config_utils, eep_grid, grid_pack, iso_index, manifest  # noqa: E402
+from comp333.files.grid_cache import GRID_CACHE  # noqa: E402
+
+RESULT_VERSION = 1
+MIN_TRACKS = 3
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _median_time(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"median_s": round(statistics.median(times), 5), "min_s": round(min(times), 5)}
+
+
+def _record(results, stage, timing, **extra):
+    entry = {"stage": stage, **timing, **extra}
+    results.append(entry)
+    notes = "  ".join(f"{k}={v}" for k, v in extra.items())
+    print(f"{stage:<28s} median {timing['median_s'] * 1e3:9.2f} ms  {notes}")
+
+
+def _clear_memos():
+    manifest._MEMO.clear()
+    GRID_CACHE.clear()
+    iso_index._INDEX_MEMO.clear()
+
+
+def bench_download(results, tmp_dir, eep_dir, repeat):
+    from comp333.files.download_engine import fetch_and_extract
+
+    serve_dir = os.path.join(tmp_dir, "serve")
+    os.makedirs(serve_dir)
+    name = os.path.basename(eep_dir)
+    archive = os.path.join(serve_dir, name + ".txz")
+    with tarfile.open(archive, "w:xz", preset=0) as tar:
+        tar.add(eep_dir, arcname=name)
+    size_mb = os.path.getsize(archive) / 1e6
+
+    handler = functools.partial(_QuietHandler, directory=serve_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/{name}.txz"
+    target_dir = os.path.join(tmp_dir, "downloads")
+
+    def reset():
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.makedirs(target_dir)
+
+    try:
+        for mode in ("resume", "stream"):
+            timing = _median_time(
+                lambda: fetch_and_extract(url, os.path.join(target_dir, name + ".txz"), mode=mode),
+                repeat, setup=reset,
+            )
+            _record(results, f"download ({mode})", timing,
+                    archive_mb=round(size_mb, 2), mb_per_s=round(size_mb / timing["median_s"], 1))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def bench_manifest(results, data_dir, repeat):
+    manifest_path = os.path.join(data_dir, manifest.MANIFEST_FILE)
+
+    def cold():
+        manifest._MEMO.clear()
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    _record(results, "manifest (cold build)",
+            _median_time(lambda: manifest.load_manifest(data_dir), repeat, setup=cold))
+
+    # One lookup is too short to time on its own: time n and report per call
+    n = 1000
+    timing = _median_time(
+        lambda: [manifest.find_eep_dir(data_dir, 0.0, 0.4) for _ in range(n)], repeat
+    )
+    per_call = {name: round(value / n, 8) for name, value in timing.items()}
+    _record(results, "manifest (warm lookup)", per_call, per_call_us=round(timing["median_s"] / n * 1e6, 2))
+
+
+def bench_tracks(results, eep_dir, repeat):
+    cache_dir = os.path.join(eep_dir, ".track_cache")
+    codes = manifest.eep_mass_codes(eep_dir)
+
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        GRID_CACHE.clear()
+
+    _record(results, "track parse (cold cache)",
+            _median_time(lambda: eep_grid.load_eep_grid(eep_dir, codes=codes), repeat, setup=cold),
+            tracks=len(codes))
+    _record(results, "track parse (warm cache)",
+            _median_time(lambda: eep_grid.load_eep_grid(eep_dir, codes=codes), repeat,
+                         setup=GRID_CACHE.clear),
+            tracks=len(codes))
+
+    grid_pack.pack_eep_dir(eep_dir)
+    try:
+        _record(results, "track parse (packed)",
+                _median_time(lambda: eep_grid.load_eep_grid(eep_dir, codes=codes), repeat,
+                             setup=GRID_CACHE.clear),
+                tracks=len(codes))
+    finally:
+        os.remove(grid_pack.pack_path(eep_dir))
+
+
+def bench_interpolation(results, eep_dir, repeat):
+    grid = eep_grid.load_eep_grid(eep_dir, codes=manifest.eep_mass_codes(eep_dir))
+    targets = np.linspace(grid.masses[0], grid.masses[-1], 100)
+    _record(results, "mass interpolation",
+            _median_time(lambda: eep_grid.interpolate_masses(grid, targets), repeat),
+            masses=len(targets))
+
+
+def bench_isochrone(results, iso_path, repeat):
+    ages = (8.5, 9.0)
+
+    def read():
+        for age in ages:
+            iso_index.read_iso_block(iso_path, age)
+
+    def cold():
+        iso_index._INDEX_MEMO.clear()
+        GRID_CACHE.clear()
+        index_path = iso_path + iso_index.INDEX_SUFFIX
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    size_mb = round(os.path.getsize(iso_path) / 1e6, 2)
+    _record(results, "isochrone (cold index)", _median_time(read, repeat, setup=cold), file_mb=size_mb)
+    _record(results, "isochrone (warm index)",
+            _median_time(read, repeat, setup=GRID_CACHE.clear), file_mb=size_mb)
+
+
+def _bench_points(n):
+    rng = np.random.default_rng(0)
+    kinds = [
+        lambda x, y: {"x": x, "y": y, "x_err": 0.01, "y_err": 0.05},
+        lambda x, y: {"x": x, "y_range": [y - 0.1, y + 0.1]},
+        lambda x, y: {"y": y, "x_range": [x - 0.01, x + 0.01]},
+        lambda x, y: {"x_range": [x - 0.01, x + 0.01], "y_range": [y - 0.1, y + 0.1]},
+    ]
+    points = []
+    for i in range(n):
+        x, y = float(rng.uniform(3.6, 3.8)), float(rng.uniform(-0.5, 1.5))
+        points.append({"name": f"Star {i}", **kinds[i % len(kinds)](x, y)})
+    return points
+
+
+def bench_constraints(results, repeat, n_points):
+    from comp333.files.isochrone import draw_constraints
+    from comp333.files.render import new_figure
+
+    points = _bench_points(n_points)
+    _record(results, "constraint drawing",
+            _median_time(lambda: draw_constraints(new_figure()[1], points), repeat),
+            points=n_points)
+
+
+def bench_render(results, tmp_dir, cfg, repeat):
+    from comp333.master import run_from_config
+    from comp333.files.render import save_figure
+
+    run_cfg = dict(cfg, output={"path": os.path.join(tmp_dir, "bench.png")})
+    fig = run_from_config(run_cfg)  # warms every cache the timed runs rely on
+    _record(results, "render (savefig png)",
+            _median_time(lambda: save_figure(fig, os.path.join(tmp_dir, "save.png")), repeat))
+    _record(results, "run_from_config (cached)",
+            _median_time(lambda: run_from_config(run_cfg), repeat))
+
+
+def _plot_mass_codes(masses):
+    """Plotted mass range: 0.9-1.2 Msun, shrunk to the inner tracks of a small grid."""
+    if len(masses) < MIN_TRACKS:
+        raise ValueError(f"The render stage needs at least {MIN_TRACKS} tracks, got {len(masses)}.")
+    return mass_to_code(min(0.9, masses[1])), mass_to_code(min(1.2, masses[-2]))
+
+
+def run_stage_benchmark(n_tracks=40, repeat=5, n_points=50, skip_download=False) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = os.path.join(tmp_dir, "data")
+        masses = np.round(np.linspace(0.5, 0.5 + 0.05 * (n_tracks - 1), n_tracks), 2)
+        min_code, max_code = _plot_mass_codes(masses)
+        eep_dir = write_eep_dir(data_dir, masses)
+        iso_dir = write_iso_dir(data_dir, [0.0])
+        iso_path = os.path.join(iso_dir, os.listdir(iso_dir)[0])
+
+        config_file = os.path.join(tmp_dir, "config.json")
+        with open(config_file, "w") as f:
+            json.dump({"DOWNLOAD_DIR": data_dir, "MIST_BASE_URL": "http://127.0.0.1:9/"}, f)
+        old_config_file = config_utils.CONFIG_FILE
+        config_utils.CONFIG_FILE = config_file
+        _clear_memos()
+        try:
+            if not skip_download:
+                bench_download(results, tmp_dir, eep_dir, repeat)
+            bench_manifest(results, data_dir, repeat)
+            bench_tracks(results, eep_dir, repeat)
+            bench_interpolation(results, eep_dir, repeat)
+            bench_isochrone(results, iso_path, repeat)
+            bench_constraints(results, repeat, n_points)
+            bench_render(results, tmp_dir, {
+                "eep_plot_settings": {
+                    "min_mass_code": min_code, "max_mass_code": max_code,
+                    "age_min": 1.0e6, "age_max": 1.0e10, "vcrit": 0.4, "n_masses": 5,
+                },
+                "plot_settings": {
+                    "iso_directory": iso_dir, "age_min": 8.5, "age_max": 9.0, "vcrit": 0.0,
+                    "title": "bench", "xlabel": "log(T_eff)", "ylabel": "log(L)",
+                },
+                "points": _bench_points(5),
+            }, repeat)
+        finally:
+            config_utils.CONFIG_FILE = old_config_file
+            _clear_memos()
+
+    return {
+        "version": RESULT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "params": {"tracks": n_tracks, "repeat": repeat, "points": n_points},
+        "stages": results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, tolerance=0.25) -> list:
+    """Stages whose median time grew by more than tolerance (a fraction)."""
+    before = {s["stage"]: s["median_s"] for s in baseline.get("stages", [])}
+    regressions = []
+    for stage in current["stages"]:
+        old = before.get(stage["stage"])
+        if old and stage["median_s"] > old * (1.0 + tolerance):
+            regressions.append((stage["stage"], old, stage["median_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=40, help="mass tracks in the synthetic EEPS grid")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--points", type=int, default=50, help="constraints drawn in the constraint stage")
+    parser.add_argument("--skip-download", action="store_true")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = parser.parse_args()
+    if args.tracks < MIN_TRACKS:
+        parser.error(f"--tracks must be at least {MIN_TRACKS}")
+
+    results = run_stage_benchmark(args.tracks, args.repeat, args.points, args.skip_download)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for stage, old, new in regressions:
+            print(f"[WARN] {stage}: {old * 1e3:.2f} ms -> {new * 1e3:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"[INFO] No stage slower than baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Startup-time benchmark for the comp333.master CLI paths.
+
+Each scenario runs in a fresh interpreter so import cost is measured the
+way a user pays it. Reported per scenario: median wall time over N runs and
+which heavy dependencies ended up imported.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_startup [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "matplotlib", "astropy", "requests")
+
+# Runs inside the child interpreter. {setup} points comp333 at a private
+# config.json; the loaded heavy modules are printed as the last line.
+CHILD_TEMPLATE = """
+import json, sys
+from comp333.files import config_utils
+config_utils.CONFIG_FILE = {config_file!r}
+{body}
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def _run_child(body, config_file):
+    code = CHILD_TEMPLATE.format(config_file=config_file, body=body, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _measure(name, body, config_file, repeat):
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        elapsed, loaded = _run_child(body, config_file)
+        times.append(elapsed)
+    result = {
+        "scenario": name,
+        "median_s": round(statistics.median(times), 4),
+        "min_s": round(min(times), 4),
+        "heavy_modules_loaded": loaded,
+    }
+    print(f"{name:<22s} median {result['median_s']:.3f} s  loaded: {', '.join(loaded) or '-'}")
+    return result
+
+
+def _prepare_data(tmp_dir):
+    """Synthetic grids already 'installed' so no scenario touches the network."""
+    sys.path.insert(0, REPO_ROOT)
+    from mist_fixtures import write_eep_dir, write_iso_dir
+    from comp333.files.track_cache import warm_cache
+
+    data_dir = os.path.join(tmp_dir, "data")
+    eep_dir = write_eep_dir(data_dir, [0.9, 1.0, 1.1, 1.2])
+    iso_dir = write_iso_dir(data_dir, [0.0], log_ages=[8.5, 9.0], eep_step=4)
+    warm_cache(eep_dir)
+
+    config_file = os.path.join(tmp_dir, "config.json")
+    with open(config_file, "w") as f:
+        json.dump({"DOWNLOAD_DIR": data_dir, "MIST_BASE_URL": "http://127.0.0.1:9/"}, f)
+
+    download_only = {
+        "eep_download": {"run": True, "vcrit": 0.4, "feh": [0.0]},
+        "iso_download": {"run": True, "vcrit": 0.0},
+    }
+    cached_render = {
+        "eep_plot_settings": {
+            "min_mass_code": "00095", "max_mass_code": "00115",
+            "age_min": 1.0e6, "age_max": 3.0e9, "vcrit": 0.4,
+        },
+        "plot_settings": {
+            "iso_directory": iso_dir, "age_min": 9.0, "age_max": 9.0, "vcrit": 0.0,
+            "title": "bench", "xlabel": "log(T_eff)", "ylabel": "log(L)",
+        },
+        "points": [],
+        "output": {"path": os.path.join(tmp_dir, "bench.png")},
+    }
+    # Render once so the isochrone index exists before timing.
+    _run_child(f"from comp333.master import run_from_config\nrun_from_config({cached_render!r})", config_file)
+    return config_file, download_only, cached_render
+
+
+def run_startup_benchmark(repeat=5):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file, download_only, cached_render = _prepare_data(tmp_dir)
+        return [
+            _measure("interpreter", "pass", config_file, repeat),
+            _measure("import master", "import comp333.master", config_file, repeat),
+            _measure(
+                "download-only (noop)",
+                f"from comp333.master import run_from_config\nrun_from_config({download_only!r})",
+                config_file, repeat,
+            ),
+            _measure(
+                "cached render",
+                f"from comp333.master import run_from_config\nrun_from_config({cached_render!r})",
+                config_file, repeat,
+            ),
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from comp333.files.config_utils import load_config, ensure_config_dir_exists
+from comp333.master import run_from_config
+
+OUTPUT_FORMATS = ("png", "pdf", "svg")
+
+
+def find_run_configs(paths) -> list:
+    """
+    Expand a mix of run-config files and directories into a sorted list of
+    .json config paths. Directories contribute every *.json file they hold.
+    """
+    configs = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            configs.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(".json")
+            )
+        elif os.path.isfile(path):
+            configs.append(path)
+        else:
+            print(f"[WARN] Skipping missing run config: {path}")
+    return configs
+
+
+def _output_path_for(config_path, output_dir, fmt):
+    stem = os.path.splitext(os.path.basename(config_path))[0]
+    return os.path.join(output_dir, f"{stem}.{fmt}")
+
+
+def _render_one(config_path, output_dir, fmt):
+    """
+    Render one run config to a file. Errors are returned, not raised, so
+    one bad star does not stop the rest of the batch.
+    """
+    output_path = _output_path_for(config_path, output_dir, fmt)
+    start = time.perf_counter()
+    try:
+        with open(config_path) as f:
+            cfg = json.load(f)
+        run_from_config(cfg, output_path=output_path)
+        return config_path, output_path, None, time.perf_counter() - start
+    except Exception as e:
+        return config_path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def _render_chunk(config_paths, output_dir, fmt):
+    # Runs inside one worker process so the parsed-data cache (GRID_CACHE)
+    # is shared by every config in the chunk.
+    # Each run draws on its own Agg Figure, so no pyplot state is shared.
+    return [_render_one(path, output_dir, fmt) for path in config_paths]
+
+
+def run_batch(paths, output_dir, fmt="png", workers=1) -> list:
+    """
+    Render every run config found in paths into output_dir.
+
+    With workers == 1 everything runs in this process and all runs share
+    one in-memory cache of parsed tracks and isochrones. With workers > 1
+    the configs are split into one contiguous chunk per worker process;
+    each worker keeps its own cache for its whole chunk.
+
+    Returns a list of (config_path, output_path, error, seconds) tuples.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format {fmt!r}; use one of {OUTPUT_FORMATS}.")
+
+    configs = find_run_configs(paths)
+    if not configs:
+        print("[WARN] No run configs found.")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    ensure_config_dir_exists(load_config())
+
+    workers = max(1, min(int(workers), len(configs)))
+    if workers == 1:
+        results = _render_chunk(configs, output_dir, fmt)
+    else:
+        chunk_size = -(-len(configs) // workers)  # ceiling division
+        chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_chunk, chunk, output_dir, fmt) for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+
+    failed = [r for r in results if r[2] is not None]
+    total_s = sum(r[3] for r in results)
+    print(f"[INFO] Batch finished: {len(results) - len(failed)} rendered, "
+          f"{len(failed)} failed, {total_s:.1f} s of render time")
+    for config_path, _, error, _ in failed:
+        print(f"[ERROR] {config_path}: {error}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python3 -m comp333.batch",
+        description="Render many run configs headlessly in one process.",
+    )
+    parser.add_argument("paths", nargs="+", help="run config files and/or directories of them")
+    parser.add_argument("-o", "--output-dir", default="hr_diagrams", help="where figures are written")
+    parser.add_argument("-f", "--format", default="png", choices=OUTPUT_FORMATS)
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes")
+    args = parser.parse_args()
+
+    results = run_batch(args.paths, args.output_dir, fmt=args.format, workers=args.workers)
+    if any(r[2] is not None for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import instrument
+from .config_utils import load_config
+from .eep_grid import code_to_mass
+from .evolutionary_track import mass_curves
+from .isochrone import _iso_curves
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE
+
+# Animated HR diagrams: the age steps from age_min to age_max of
+# eep_plot_settings and every frame shows where each plotted mass sits on
+# its track at that age, plus the isochrone of that age. All positions and
+# isochrones are computed up front; workers only draw and save frames.
+
+ANIMATION_FORMATS = ("mp4", "gif", "frames")
+DEFAULT_FRAMES = 60
+DEFAULT_FPS = 12
+DEFAULT_DPI = 100
+FRAME_PATTERN = "frame_{:05d}.png"
+
+
+def frame_ages(age_min: float, age_max: float, n_frames: int, spacing="log") -> np.ndarray:
+    """n_frames ages in years from age_min to age_max, evenly spaced in log(age) or age."""
+    if age_min <= 0 or age_max <= age_min:
+        raise ValueError(f"Animation needs 0 < age_min < age_max, got {age_min:g} and {age_max:g}.")
+    if spacing == "log":
+        return np.logspace(np.log10(age_min), np.log10(age_max), int(n_frames))
+    if spacing == "linear":
+        return np.linspace(age_min, age_max, int(n_frames))
+    raise ValueError(f"Unknown frame spacing {spacing!r}; use 'log' or 'linear'.")
+
+
+def track_positions(age, logT, logL, ages):
+    """
+    Position of every track at every frame age in one vectorized pass:
+    age, logT, logL are (n_mass x n_eep) NaN-padded arrays, ages is
+    (n_frame,). Interpolates linearly in log(age) between neighbouring EEPs.
+    Returns (T, L), each (n_mass x n_frame), NaN where a track has not
+    started or has already ended at that age.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_age = np.log10(age)
+    log_t = np.log10(np.asarray(ages, dtype=np.float64))
+    n_valid = np.isfinite(log_age).sum(axis=1)
+
+    # Ages grow along each track, so the EEP just before t is a count of EEPs <= t
+    before = np.where(np.isfinite(log_age), log_age, np.inf)[:, :, None] <= log_t[None, None, :]
+    i0 = before.sum(axis=1) - 1
+    inside = (i0 >= 0) & (i0 < n_valid[:, None] - 1)
+    i0 = np.clip(i0, 0, log_age.shape[1] - 2)
+    rows = np.arange(log_age.shape[0])[:, None]
+
+    a0, a1 = log_age[rows, i0], log_age[rows, i0 + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = (log_t[None, :] - a0) / (a1 - a0)
+    T = logT[rows, i0] + w * (logT[rows, i0 + 1] - logT[rows, i0])
+    L = logL[rows, i0] + w * (logL[rows, i0 + 1] - logL[rows, i0])
+    T[~inside] = np.nan
+    L[~inside] = np.nan
+    return T, L
+
+
+def build_scene(eep_cfg: dict, iso_cfg: dict, anim_cfg: dict, limits) -> dict:
+    """
+    Everything the frames need, computed once: the static tracks, the
+    position of each mass at every frame age and one isochrone per frame
+    age and [Fe/H]. limits = (xlim, ylim) of the static plot.
+    """
+    download_dir = load_config()["DOWNLOAD_DIR"]
+    fehs = eep_cfg.get("feh_list", [0.0])
+    fehs = fehs if isinstance(fehs, list) else [fehs]
+    vcrit = float(eep_cfg.get("vcrit", 0.4))
+    ages = frame_ages(
+        float(anim_cfg.get("age_min", eep_cfg["age_min"])),
+        float(anim_cfg.get("age_max", eep_cfg["age_max"])),
+        anim_cfg.get("frames", DEFAULT_FRAMES),
+        anim_cfg.get("spacing", "log"),
+    )
+    target_masses = np.linspace(
+        code_to_mass(eep_cfg["min_mass_code"]), code_to_mass(eep_cfg["max_mass_code"]),
+        max(int(eep_cfg.get("n_masses", 2)), 2),
+    )
+
+    (x0, x1), (y0, y1) = limits
+    bbox = (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+    iso_source = iso_cfg.get("iso_source", "grid")
+    iso_dir = os.path.expanduser(iso_cfg.get("iso_directory", ""))
+    show_isochrones = anim_cfg.get("isochrones", True)
+
+    layers = []
+    for feh in fehs:
+        with instrument.stage("animation.positions", feh=float(feh), frames=len(ages)):
+            curves = mass_curves(download_dir, float(feh), vcrit, target_masses)
+            T, L = track_positions(curves[STAR_AGE], curves[LOG_TEFF], curves[LOG_L], ages)
+        in_window = (curves[STAR_AGE] >= ages[0]) & (curves[STAR_AGE] <= ages[-1])
+        isochrones = [(np.empty(0), np.empty(0))] * len(ages)
+        if show_isochrones:
+            with instrument.stage("animation.isochrones", feh=float(feh), frames=len(ages)):
+                isochrones = [
+                    (logT, logL) for _, logT, logL in _iso_curves(
+                        iso_cfg, iso_source, iso_dir, float(feh), float(iso_cfg.get("vcrit", 0.0)),
+                        np.log10(ages), bbox=bbox,
+                    )
+                ]
+        layers.append({
+            "feh": float(feh),
+            "tracks": [(curves[LOG_TEFF][i][in_window[i]], curves[LOG_L][i][in_window[i]])
+                       for i in range(len(target_masses))],
+            "T": T,
+            "L": L,
+            "isochrones": isochrones,
+        })
+
+    return {
+        "ages": ages,
+        "masses": target_masses,
+        "layers": layers,
+        "xlim": limits[0],
+        "ylim": limits[1],
+        "labels": (iso_cfg.get("xlabel", "log(T_eff)"), iso_cfg.get("ylabel", "log(L)"),
+                   iso_cfg.get("title", "HR Diagram")),
+        "figsize": anim_cfg.get("figsize"),
+        "dpi": anim_cfg.get("dpi", DEFAULT_DPI),
+    }
+
+
+def _render_frames(scene, frame_indices, frame_dir) -> list:
+    # Runs in a worker process: one figure per chunk. The static part
+    # (tracks, axes, legend) is rasterized once; each frame restores that
+    # image and draws only the markers, isochrones and title on top.
+    from PIL import Image
+    from .render import new_figure
+
+    fig, ax = new_figure(figsize=scene["figsize"], dpi=scene["dpi"])
+    xlabel, ylabel, title = scene["labels"]
+    moving = []
+    for k, layer in enumerate(scene["layers"]):
+        color = f"C{k}"
+        for T, L in layer["tracks"]:
+            ax.plot(T, L, "-", lw=0.8, alpha=0.4, color=color)
+        moving.append(ax.plot([], [], "--", lw=1.4, color=color, animated=True,
+                              label=f"Isochrone ([Fe/H]={layer['feh']:+.2f})")[0])
+        moving.append(ax.plot([], [], "o", ms=6, color=color, animated=True,
+                              label=f"Stars ([Fe/H]={layer['feh']:+.2f})")[0])
+    ax.set_xlim(*scene["xlim"])
+    ax.set_ylim(*scene["ylim"])
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+    ax.legend(loc="lower left")
+    ax.set_title(f"{title}  (age 0.00 Myr)")  # reserve room for the frame titles
+    fig.tight_layout()
+    ax.title.set_animated(True)
+
+    canvas = fig.canvas
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    paths = []
+    for i in frame_indices:
+        canvas.restore_region(background)
+        for k, layer in enumerate(scene["layers"]):
+            moving[2 * k].set_data(*layer["isochrones"][i])
+            moving[2 * k + 1].set_data(layer["T"][:, i], layer["L"][:, i])
+        ax.set_title(f"{title}  (age {scene['ages'][i] / 1e6:,.2f} Myr)")
+        for artist in moving + [ax.title]:
+            ax.draw_artist(artist)
+
+        path = os.path.join(frame_dir, FRAME_PATTERN.format(i))
+        Image.fromarray(np.asarray(canvas.buffer_rgba())).convert("RGB").save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def render_frames(scene: dict, frame_dir: str, workers=1) -> list:
+    """
+    Write one PNG per frame age into frame_dir. With workers > 1 the frames
+    are split into contiguous chunks, each drawn by its own process.
+    Returns the frame paths in order.
+    """
+    os.makedirs(frame_dir, exist_ok=True)
+    n_frames = len(scene["ages"])
+    workers = max(1, min(int(workers), n_frames))
+    if workers == 1:
+        return _render_frames(scene, range(n_frames), frame_dir)
+
+    chunk = -(-n_frames // workers)  # ceiling division
+    chunks = [range(i, min(i + chunk, n_frames)) for i in range(0, n_frames, chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_frames, scene, c, frame_dir) for c in chunks]
+        return [path for future in futures for path in future.result()]
+
+
+def _output_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    if not ext:
+        return "frames"
+    if ext not in ANIMATION_FORMATS:
+        raise ValueError(f"Unsupported animation format {ext!r}; use .mp4, .gif or a directory.")
+    return ext
+
+
+def assemble(frame_paths, path: str, fps=DEFAULT_FPS):
+    """Join PNG frames into an animated GIF (Pillow) or an MP4 (ffmpeg)."""
+    fmt = _output_format(path)
+    if fmt == "gif":
+        from PIL import Image
+
+        images = [Image.open(p) for p in frame_paths]
+        images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+        return path
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("Writing MP4 needs ffmpeg on PATH; use a .gif path or a frame directory instead.")
+    frame_dir = os.path.dirname(frame_paths[0])
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+         "-i", os.path.join(frame_dir, "frame_%05d.png"),
+         "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", path],
+        check=True,
+    )
+    return path
+
+
+def write_animation(eep_cfg: dict, iso_cfg: dict, anim_cfg: dict, limits) -> str:
+    """
+    Render the run config's "animation" section:
+      path    : .mp4, .gif, or a directory for the PNG frames
+      frames  : number of ages between age_min and age_max (default 60)
+      spacing : "log" (default) or "linear" steps in age
+      fps, dpi, figsize, workers, isochrones (true/false)
+    Returns the written path.
+    """
+    path = os.path.expanduser(anim_cfg.get("path", "hr_evolution.gif"))
+    fmt = _output_format(path)
+
+    with instrument.stage("animation.precompute"):
+        scene = build_scene(eep_cfg, iso_cfg, anim_cfg, limits)
+
+    frame_dir = path if fmt == "frames" else path + ".frames"
+    workers = int(anim_cfg.get("workers", 1))
+    with instrument.stage("animation.render", frames=len(scene["ages"]), workers=workers):
+        frame_paths = render_frames(scene, frame_dir, workers)
+
+    if fmt != "frames":
+        with instrument.stage("animation.assemble", format=fmt):
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            try:
+                assemble(frame_paths, path, fps=anim_cfg.get("fps", DEFAULT_FPS))
+            finally:
+                if not anim_cfg.get("keep_frames", False):
+                    shutil.rmtree(frame_dir, ignore_errors=True)
+    print(f"[INFO] Wrote {len(frame_paths)}-frame animation to {path}")
+    return path
@@ -0,0 +1,164 @@
+import csv
+import os
+import numpy as np
+
+# Columns of a star catalog (CSV header names, .npy field names or .npz keys).
+# A missing column or an empty cell means "not given" and reads as NaN.
+CATALOG_COLUMNS = ("x", "y", "x_err", "y_err", "x_min", "x_max", "y_min", "y_max")
+
+# The constraint cases of draw_constraints, as (key, legend text)
+CATEGORIES = (
+    ("point", "points"),
+    ("x_y_range", "x with y range"),
+    ("y_x_range", "y with x range"),
+    ("x_only", "x only"),
+    ("y_only", "y only"),
+    ("x_range_only", "x ranges"),
+    ("y_range_only", "y ranges"),
+    ("box", "x/y boxes"),
+)
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        header = [h.strip() for h in next(csv.reader(f))]
+    wanted = [c for c in CATALOG_COLUMNS if c in header]
+    if not wanted:
+        return {}
+    table = np.genfromtxt(
+        path, delimiter=",", skip_header=1, dtype=np.float64, ndmin=2,
+        usecols=[header.index(c) for c in wanted],
+    )
+    return {name: table[:, i] for i, name in enumerate(wanted)}
+
+
+def load_catalog(path: str) -> dict:
+    """
+    Read a star catalog from .csv, .npy (structured array) or .npz into
+    {column: float64 array} with every CATALOG_COLUMNS entry present.
+    """
+    path = os.path.expanduser(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        found = _read_csv(path)
+    elif ext == ".npy":
+        arr = np.load(path)
+        if arr.dtype.names is None:
+            raise ValueError(f"{path}: .npy catalogs must be structured arrays with named fields.")
+        found = {c: arr[c] for c in CATALOG_COLUMNS if c in arr.dtype.names}
+    elif ext == ".npz":
+        with np.load(path) as f:
+            found = {c: f[c] for c in CATALOG_COLUMNS if c in f.files}
+    else:
+        raise ValueError(f"Unsupported catalog format {ext!r}; use .csv, .npy or .npz.")
+
+    if not any(c in found for c in ("x", "y", "x_min", "y_min")):
+        raise ValueError(f"{path}: catalog needs at least one of x, y, x_min/x_max, y_min/y_max.")
+    n = len(next(iter(found.values())))
+    return {c: np.asarray(found[c], dtype=np.float64) if c in found else np.full(n, np.nan)
+            for c in CATALOG_COLUMNS}
+
+
+def classify(cat: dict) -> dict:
+    """Boolean mask per category; a star falls in at most one."""
+    hx, hy = np.isfinite(cat["x"]), np.isfinite(cat["y"])
+    hxr = np.isfinite(cat["x_min"]) & np.isfinite(cat["x_max"])
+    hyr = np.isfinite(cat["y_min"]) & np.isfinite(cat["y_max"])
+    return {
+        "point": hx & hy,
+        "x_y_range": hx & ~hy & hyr,
+        "y_x_range": hy & ~hx & hxr,
+        "x_only": hx & ~hy & ~hyr,
+        "y_only": hy & ~hx & ~hxr,
+        "x_range_only": hxr & ~hx & ~hy & ~hyr,
+        "y_range_only": hyr & ~hx & ~hy & ~hxr,
+        "box": hxr & hyr & ~hx & ~hy,
+    }
+
+
+def _err(values):
+    return np.nan_to_num(values, nan=0.0)
+
+
+def draw_catalog(ax, cat: dict, label="Catalog", color="k"):
+    """
+    Draw every star of a catalog with one artist per constraint category
+    and one legend entry each. Returns (point_x_vals, point_y_vals,
+    extra_x_extents, extra_y_extents) as arrays, like draw_constraints.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    masks = classify(cat)
+    x, y = cat["x"], cat["y"]
+    x0, x1, y0, y1 = cat["x_min"], cat["x_max"], cat["y_min"], cat["y_max"]
+    style = {"fmt": "o", "ms": 3, "color": color, "elinewidth": 0.6, "alpha": 0.7}
+    names = dict(CATEGORIES)
+
+    def tag(key, m):
+        return f"{label}: {names[key]} (n={int(np.count_nonzero(m))})"
+
+    m = masks["point"]
+    if m.any():
+        ax.errorbar(x[m], y[m], xerr=_err(cat["x_err"][m]), yerr=_err(cat["y_err"][m]),
+                    label=tag("point", m), **style)
+
+    m = masks["x_y_range"]
+    ymid = 0.5 * (y0 + y1)
+    if m.any():
+        ax.errorbar(x[m], ymid[m], xerr=_err(cat["x_err"][m]), yerr=[ymid[m] - y0[m], y1[m] - ymid[m]],
+                    label=tag("x_y_range", m), **style)
+
+    m = masks["y_x_range"]
+    xmid = 0.5 * (x0 + x1)
+    if m.any():
+        ax.errorbar(xmid[m], y[m], xerr=[xmid[m] - x0[m], x1[m] - xmid[m]], yerr=_err(cat["y_err"][m]),
+                    label=tag("y_x_range", m), **style)
+
+    # Lines and bands span the whole axis: x in data units, y in axes units (and vice versa)
+    def spans(values):
+        n = len(values)
+        return np.stack([np.column_stack([values, np.zeros(n)]), np.column_stack([values, np.ones(n)])], axis=1)
+
+    m = masks["x_only"]
+    if m.any():
+        ax.add_collection(LineCollection(spans(x[m]), transform=ax.get_xaxis_transform(), colors=color,
+                                         alpha=0.25, linewidths=2.0, label=tag("x_only", m)))
+
+    m = masks["y_only"]
+    if m.any():
+        ax.add_collection(LineCollection(spans(y[m])[:, :, ::-1], transform=ax.get_yaxis_transform(), colors=color,
+                                         alpha=0.25, linewidths=2.0, label=tag("y_only", m)))
+
+    def boxes(bx0, bx1, by0, by1):
+        return np.stack([np.column_stack([bx0, by0]), np.column_stack([bx1, by0]),
+                         np.column_stack([bx1, by1]), np.column_stack([bx0, by1])], axis=1)
+
+    m = masks["x_range_only"]
+    if m.any():
+        zeros, ones = np.zeros(m.sum()), np.ones(m.sum())
+        ax.add_collection(PolyCollection(boxes(x0[m], x1[m], zeros, ones), transform=ax.get_xaxis_transform(),
+                                         facecolors=color, alpha=0.18, label=tag("x_range_only", m)))
+
+    m = masks["y_range_only"]
+    if m.any():
+        zeros, ones = np.zeros(m.sum()), np.ones(m.sum())
+        ax.add_collection(PolyCollection(boxes(zeros, ones, y0[m], y1[m]), transform=ax.get_yaxis_transform(),
+                                         facecolors=color, alpha=0.18, label=tag("y_range_only", m)))
+
+    m = masks["box"]
+    if m.any():
+        ax.add_collection(PolyCollection(boxes(x0[m], x1[m], y0[m], y1[m]), facecolors=color,
+                                         alpha=0.15, label=tag("box", m)))
+
+    skipped = len(x) - sum(int(np.count_nonzero(v)) for v in masks.values())
+    if skipped:
+        print(f"[WARN] Skipping {skipped} catalog row(s) with no usable constraint.")
+
+    # Bounds, as draw_constraints computes them per star
+    point_x = np.concatenate([x[masks["point"]], x[masks["x_y_range"]], xmid[masks["y_x_range"]]])
+    point_y = np.concatenate([y[masks["point"]], ymid[masks["x_y_range"]], y[masks["y_x_range"]]])
+    hxr = np.isfinite(x0) & np.isfinite(x1)
+    hyr = np.isfinite(y0) & np.isfinite(y1)
+    extra_x = np.concatenate([x0[hxr], x1[hxr], x[masks["x_only"]]])
+    extra_y = np.concatenate([y0[hyr], y1[hyr], y[masks["y_only"]]])
+    return point_x, point_y, extra_x, extra_y
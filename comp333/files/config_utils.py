@@ -1,8 +1,12 @@
+import copy
 import json
 import os
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 
+# (path, mtime_ns, size) -> parsed config; one stat per call instead of a read
+_CONFIG_MEMO = {}
+
 
 def get_default_download_dir():
     home_dir = os.path.expanduser("~")
@@ -19,17 +23,37 @@ def load_config():
     """
     Loads comp333/files/config.json.
     If missing, creates it with defaults (portable for new users).
+    Parsed once per file version; callers get their own copy to modify.
     """
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
+    try:
+        st = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        st = None
+
+    if st is not None:
+        key = (CONFIG_FILE, st.st_mtime_ns, st.st_size)
+        config = _CONFIG_MEMO.get(key)
+        if config is None:
+            with open(CONFIG_FILE, "r") as f:
+                config = json.load(f)
+            _CONFIG_MEMO.clear()
+            _CONFIG_MEMO[key] = config
+        return copy.deepcopy(config)
 
     print("[INFO] config.json not found. Creating default configuration.")
     default_config = {
         "DOWNLOAD_DIR": get_default_download_dir(),
         "MIST_BASE_URL": "https://waps.cfa.harvard.edu/MIST/data/tarballs_v1.2/",
         "DEFAULT_EEPS_FILE": "",
-        "DEFAULT_ISO_FILE": ""
+        "DEFAULT_ISO_FILE": "",
+        "DOWNLOAD_MODE": "resume",
+        "EXTRACT_MODE": "all",
+        "PACK_EEPS": True,
+        "DELETE_EEPS_TEXT": False,
+        "PRECOMPUTE_DERIVED": True,
+        "MIST_CHECKSUMS": {},
+        "MIRROR_CACHE_DIR": "",
+        "MIRROR_URL": ""
     }
     save_config(default_config)
     return default_config
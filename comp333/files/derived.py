@@ -0,0 +1,253 @@
+import os
+import sys
+import numpy as np
+from . import instrument
+from .config_utils import load_config
+from .eep_grid import load_eep_grid
+from .grid_cache import GRID_CACHE
+from .manifest import eep_mass_codes, find_eep_dir, installed_grids
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE
+
+# Per-grid table of quantities derived from every track of an EEPS
+# directory, written next to the pack as derived.npz after download:
+#   codes, masses, n_eep (n_mass,)
+#   phase_age, phase_logT, phase_logL (n_mass x n_phase) at the primary EEPs
+#   logT_min, logT_max, logL_min, logL_max (n_mass,) over the whole track
+#   age, l_reach (n_mass x n_eep) for "when does the track reach log L"
+# Lookups bisect the sorted masses instead of rescanning tracks.
+
+DERIVED_FILE = "derived.npz"
+DERIVED_VERSION = 1
+
+# MIST primary EEPs (Dotter 2016); column k of the phase arrays is PHASES[k]
+PHASE_EEPS = {
+    "PreMS": 1, "ZAMS": 202, "IAMS": 353, "TAMS": 454, "RGBTip": 605,
+    "ZAHB": 631, "TAHB": 707, "TPAGB": 808, "postAGB": 1409, "WDCS": 1710,
+}
+PHASES = tuple(PHASE_EEPS)
+_ZAMS = PHASE_EEPS["ZAMS"] - 1
+
+
+def derived_path(eep_dir: str) -> str:
+    return os.path.join(eep_dir, DERIVED_FILE)
+
+
+def build_derived_table(eep_dir: str) -> str:
+    """Compute the derived table for every mass in eep_dir and write DERIVED_FILE. Returns its path."""
+    eep_dir = os.path.expanduser(eep_dir)
+    codes = eep_mass_codes(eep_dir)
+    with instrument.stage("eeps.derive", dir=os.path.basename(eep_dir), tracks=len(codes)):
+        grid = load_eep_grid(eep_dir, codes=codes)
+        age, logT, logL = grid[STAR_AGE], grid[LOG_TEFF], grid[LOG_L]
+        n_eep = np.isfinite(age).sum(axis=1).astype(np.int32)
+
+        phase_cols = np.array([PHASE_EEPS[p] - 1 for p in PHASES])
+        reached = phase_cols[None, :] < n_eep[:, None]
+        cols = np.minimum(phase_cols, grid.n_eep - 1)
+        phase = {}
+        for name, arr in (("phase_age", age), ("phase_logT", logT), ("phase_logL", logL)):
+            phase[name] = np.where(reached, arr[:, cols], np.nan)
+
+        # Running maximum of log L from the ZAMS on: a sorted row per track,
+        # so the first age at a given luminosity is one searchsorted away.
+        # Before the ZAMS it is -inf, past the end of the track +inf.
+        l_reach = np.full(logL.shape, -np.inf)
+        if logL.shape[1] > _ZAMS:
+            after = np.where(np.isfinite(logL[:, _ZAMS:]), logL[:, _ZAMS:], np.inf)
+            l_reach[:, _ZAMS:] = np.maximum.accumulate(after, axis=1)
+        l_reach[n_eep <= _ZAMS] = np.inf
+
+        path = derived_path(eep_dir)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            version=np.array(DERIVED_VERSION),
+            codes=np.array(codes),
+            masses=grid.masses,
+            n_eep=n_eep,
+            phases=np.array(PHASES),
+            logT_min=np.nanmin(logT, axis=1),
+            logT_max=np.nanmax(logT, axis=1),
+            logL_min=np.nanmin(logL, axis=1),
+            logL_max=np.nanmax(logL, axis=1),
+            age=age,
+            l_reach=l_reach,
+            **phase,
+        )
+        os.replace(tmp_path, path)
+    print(f"[INFO] Wrote derived quantities for {len(codes)} tracks of {eep_dir} to {DERIVED_FILE}")
+    return path
+
+
+class DerivedTable:
+    """
+    Read-only view of one grid's derived.npz. Mass lookups bisect the
+    sorted masses and blend the two bracketing tracks linearly in mass,
+    like eep_grid.interpolate_masses; exact grid masses return their own row.
+    """
+
+    def __init__(self, eep_dir, arrays):
+        self.eep_dir = eep_dir
+        self.codes = [str(c) for c in arrays["codes"]]
+        self.masses = arrays["masses"]
+        self.arrays = arrays
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.arrays.values())
+
+    def _bracket(self, mass):
+        mass = float(mass)
+        masses = self.masses
+        if not masses[0] <= mass <= masses[-1]:
+            raise ValueError(
+                f"Mass {mass:.2f} outside the derived table range ({masses[0]:.2f}-{masses[-1]:.2f} Msun)."
+            )
+        hi = int(np.searchsorted(masses, mass, side="left"))
+        if masses[hi] == mass or len(masses) == 1:
+            return hi, hi, 0.0
+        return hi - 1, hi, (mass - masses[hi - 1]) / (masses[hi] - masses[hi - 1])
+
+    def _blend(self, values, mass):
+        lo, hi, w = self._bracket(mass)
+        return values[lo] * (1.0 - w) + values[hi] * w
+
+    @staticmethod
+    def _phase_index(phase):
+        if phase not in PHASE_EEPS:
+            raise ValueError(f"Unknown phase {phase!r}; use one of {PHASES}.")
+        return PHASES.index(phase)
+
+    def phase_age(self, mass, phase) -> float:
+        """Age in years at which mass reaches phase (NaN if its track ends before it)."""
+        return float(self._blend(self.arrays["phase_age"][:, self._phase_index(phase)], mass))
+
+    def phase_point(self, mass, phase):
+        """(log T_eff, log L) of mass at phase."""
+        k = self._phase_index(phase)
+        return (float(self._blend(self.arrays["phase_logT"][:, k], mass)),
+                float(self._blend(self.arrays["phase_logL"][:, k], mass)))
+
+    def ms_lifetime(self, mass) -> float:
+        """Years from ZAMS to TAMS."""
+        return self.phase_age(mass, "TAMS") - self.phase_age(mass, "ZAMS")
+
+    def locus(self, phase="ZAMS"):
+        """(masses, log T_eff, log L) of every grid track that reaches phase, e.g. the ZAMS line."""
+        k = self._phase_index(phase)
+        logT, logL = self.arrays["phase_logT"][:, k], self.arrays["phase_logL"][:, k]
+        keep = np.isfinite(logT)
+        return self.masses[keep], logT[keep], logL[keep]
+
+    def extremes(self, mass) -> dict:
+        """Minimum and maximum log T_eff and log L reached over the whole track."""
+        return {name: float(self._blend(self.arrays[name], mass))
+                for name in ("logT_min", "logT_max", "logL_min", "logL_max")}
+
+    def _row_age_at(self, i, log_l):
+        row = self.arrays["l_reach"][i]
+        if len(row) <= _ZAMS or not np.isfinite(row[_ZAMS]):
+            return np.nan  # the track ends before the ZAMS
+        k = int(np.searchsorted(row, log_l, side="left"))
+        if k < _ZAMS or k >= int(self.arrays["n_eep"][i]):
+            return np.nan
+        age = self.arrays["age"][i]
+        if k == _ZAMS:
+            return age[k]  # already brighter than log_l on the ZAMS
+        l0, l1 = row[k - 1], self.arrays["l_reach"][i, k]
+        return age[k - 1] + (log_l - l0) / (l1 - l0) * (age[k] - age[k - 1])
+
+    def age_at_log_l(self, mass, log_l) -> float:
+        """
+        First age after the ZAMS at which mass reaches log L = log_l, by
+        bisection on the track's running maximum of log L. NaN if it never does.
+        """
+        lo, hi, w = self._bracket(mass)
+        a0 = self._row_age_at(lo, float(log_l))
+        if hi == lo:
+            return float(a0)
+        return float(a0 * (1.0 - w) + self._row_age_at(hi, float(log_l)) * w)
+
+    def time_in_box(self, logT_range, logL_range) -> np.ndarray:
+        """
+        Years each grid track spends with (log T_eff, log L) inside the box,
+        counting every EEP interval whose midpoint lies in it. One vectorized
+        pass over the table's stored tracks; returns one value per mass.
+        """
+        age = self.arrays["age"]
+        logT, logL = self._track_columns()
+        mid_T = 0.5 * (logT[:, 1:] + logT[:, :-1])
+        mid_L = 0.5 * (logL[:, 1:] + logL[:, :-1])
+        with np.errstate(invalid="ignore"):
+            inside = ((mid_T >= min(logT_range)) & (mid_T <= max(logT_range))
+                      & (mid_L >= min(logL_range)) & (mid_L <= max(logL_range)))
+        return np.where(inside, np.diff(age, axis=1), 0.0).sum(axis=1)
+
+    def _track_columns(self):
+        grid = load_eep_grid(self.eep_dir, codes=self.codes)
+        return grid[LOG_TEFF], grid[LOG_L]
+
+
+def load_derived_table(eep_dir: str, build=True):
+    """
+    The directory's DerivedTable, cached in GRID_CACHE. A missing table, one
+    from another DERIVED_VERSION, or one whose masses no longer match the
+    directory is rebuilt (build=True) or reported as None.
+    """
+    eep_dir = os.path.expanduser(eep_dir)
+    path = derived_path(eep_dir)
+    codes = eep_mass_codes(eep_dir)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+
+    key = ("derived", path, mtime_ns)
+    table = GRID_CACHE.get(key) if mtime_ns is not None else None
+    if table is not None and table.codes == codes:
+        return table
+
+    arrays = None
+    if mtime_ns is not None:
+        with instrument.stage("eeps.load_derived", dir=os.path.basename(eep_dir)), np.load(path) as f:
+            if int(f["version"]) == DERIVED_VERSION and [str(c) for c in f["codes"]] == codes:
+                arrays = {name: f[name] for name in f.files if name not in ("version", "phases")}
+    if arrays is None:
+        if not build:
+            return None
+        build_derived_table(eep_dir)
+        return load_derived_table(eep_dir, build=False)
+
+    table = DerivedTable(eep_dir, arrays)
+    GRID_CACHE[key] = table
+    return table
+
+
+def derived_table(feh: float, vcrit: float, download_dir=None) -> DerivedTable:
+    """DerivedTable of the installed EEPS grid for feh + vcrit."""
+    download_dir = os.path.expanduser(download_dir or load_config()["DOWNLOAD_DIR"])
+    eep_dir = find_eep_dir(download_dir, feh, vcrit)
+    if eep_dir is None:
+        raise RuntimeError(f"No EEPS grid installed for [Fe/H]={feh:+.2f}, vcrit={vcrit:.1f}.")
+    return load_derived_table(eep_dir)
+
+
+def main():
+    """
+    Usage: python3 -m comp333.files.derived [EEPS_DIR ...]
+    With no directories, builds the table for every EEPS directory in DOWNLOAD_DIR.
+    """
+    eep_dirs = sys.argv[1:]
+    if not eep_dirs:
+        download_dir = os.path.expanduser(load_config()["DOWNLOAD_DIR"])
+        eep_dirs = [grid["path"] for grid in installed_grids(download_dir, kind="eeps")]
+        if not eep_dirs:
+            print(f"[WARN] No EEPS directories found in {download_dir}")
+            return
+
+    for eep_dir in eep_dirs:
+        build_derived_table(eep_dir)
+
+
+if __name__ == "__main__":
+    main()
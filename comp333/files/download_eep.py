@@ -1,31 +1,18 @@
 import os
-import requests
-import tarfile
 from .config_utils import load_config, ensure_config_dir_exists
+from .mirror_cache import eep_archive_name, fetch_from_sources
+from .manifest import is_installed, load_manifest
+from .selective_extract import selective_enabled
 
 
-def _feh_to_code(feh: float) -> str:
-    sign = "p" if feh >= 0 else "m"
-    return f"{sign}{abs(feh):.2f}"
-
-
-def _fetch_and_extract(url, local_path):
+def _fetch_and_extract(url, local_path, session=None, progress=None, config=None, select=None):
     print(f"Starting download: {url}")
+    config = config if config is not None else load_config()
+    filename = os.path.basename(local_path)
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-
-        with open(local_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        extract_dir = os.path.dirname(local_path)
-        print(f"Extracting into: {extract_dir}")
-
-        with tarfile.open(local_path, "r:xz") as tar:
-            tar.extractall(path=extract_dir)
-
-        os.remove(local_path)
+        # Shared mirror cache, then mirror server, then MIST_BASE_URL (url)
+        fetch_from_sources(filename, local_path, config, session=session, progress=progress, select=select)
+        load_manifest(os.path.dirname(local_path))  # record the new grid
         print("Done.\n")
         return True
 
@@ -34,10 +21,14 @@ def _fetch_and_extract(url, local_path):
         return False
 
 
-def download_eep(vcrit=None, feh=None):
+def download_eep(vcrit=None, feh=None, session=None, progress=None, mass_range=None):
     """
-    vcrit : float (0.0 or 0.4)
-    feh   : float (e.g., -0.25, 0.00, +0.50)
+    vcrit      : float (0.0 or 0.4)
+    feh        : float (e.g., -0.25, 0.00, +0.50)
+    mass_range : optional (min, max) Msun; with EXTRACT_MODE "selective"
+                 only the tracks needed inside it are extracted
+    session  : optional requests.Session shared between downloads
+    progress : optional DownloadProgress for combined reporting
     """
     if vcrit is None or feh is None:
         raise ValueError("download_eep() requires numeric vcrit and feh.")
@@ -51,23 +42,37 @@ def download_eep(vcrit=None, feh=None):
     ensure_config_dir_exists(config)
     download_dir = config["DOWNLOAD_DIR"]
 
-    feh_code = _feh_to_code(float(feh))
-    vcrit_code = f"{float(vcrit):.1f}"
-
-    filename = f"MIST_v1.2_feh_{feh_code}_afe_p0.0_vvcrit{vcrit_code}_EEPS.txz"
+    filename = eep_archive_name(float(feh), vcrit)
     local_path = os.path.join(download_dir, filename)
     base_name = filename.replace(".txz", "")
 
-    # Skip if already extracted
-    if os.path.isdir(os.path.join(download_dir, base_name)):
-        print(f"Already exists → skipping {filename}\n")
-        return
-
-    # Some extractions might not be a single directory; prefix check helps.
-    if any(name.startswith(base_name) for name in os.listdir(download_dir)):
+    # Skip if already extracted. Some extractions might not be a single
+    # directory; the manifest's prefix check covers those too.
+    if is_installed(download_dir, base_name):
         print(f"Already exists → skipping {filename}\n")
         return
 
     url = f"{config['MIST_BASE_URL']}{filename}"
     print(f"Downloading: {filename}")
-    return _fetch_and_extract(url, local_path)
+    select = {"mass_range": mass_range} if selective_enabled(config) else None
+    ok = _fetch_and_extract(url, local_path, session=session, progress=progress, config=config, select=select)
+
+    eep_dir = os.path.join(download_dir, base_name)
+    if ok and config.get("PACK_EEPS", True) and os.path.isdir(eep_dir):
+        from .grid_pack import pack_eep_dir
+
+        # One compact file instead of ~200 text tracks for every later load
+        try:
+            pack_eep_dir(eep_dir, delete_text=config.get("DELETE_EEPS_TEXT", False))
+        except (KeyError, ValueError, RuntimeError) as e:
+            print(f"[WARN] Could not pack {eep_dir}; tracks will be read from text: {e}")
+        load_manifest(download_dir)
+    if ok and config.get("PRECOMPUTE_DERIVED", True) and os.path.isdir(eep_dir):
+        from .derived import build_derived_table
+
+        # Phase ages, ZAMS/TAMS points and extremes for later O(log n) lookups
+        try:
+            build_derived_table(eep_dir)
+        except (KeyError, ValueError, RuntimeError) as e:
+            print(f"[WARN] Could not precompute derived quantities for {eep_dir}: {e}")
+    return ok
@@ -0,0 +1,258 @@
+import hashlib
+import os
+import shutil
+import tarfile
+from . import instrument
+
+CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+DOWNLOAD_MODES = ("resume", "stream")
+
+
+class DownloadIntegrityError(RuntimeError):
+    """Raised when a downloaded archive has the wrong size or checksum."""
+
+
+def is_archive_file(name: str) -> bool:
+    """Downloaded (or partially downloaded) tarballs are not extracted data."""
+    return name.endswith(".txz") or name.endswith(PART_SUFFIX)
+
+
+def _default_http():
+    # Imported on first use so skipped/cached downloads never pay for requests.
+    import requests
+    return requests
+
+
+def _total_size(response, offset):
+    """
+    Full archive size from either a 206 Content-Range ("bytes a-b/total")
+    or a 200 Content-Length. Returns None if the server does not say.
+    """
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length) + offset
+    return None
+
+
+def _hash_file(path, digest):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+
+def _check_integrity(name, n_bytes, total, digest, expected_sha256):
+    if total is not None and n_bytes != total:
+        raise DownloadIntegrityError(f"{name}: received {n_bytes} bytes, expected {total}")
+    if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+        raise DownloadIntegrityError(
+            f"{name}: sha256 {digest.hexdigest()} does not match expected {expected_sha256}"
+        )
+
+
+def fetch_archive(url, archive_path, session=None, progress=None, expected_sha256=None):
+    """
+    Download url to archive_path, resuming an interrupted transfer.
+
+    Bytes go to <archive_path>.part; if that file already exists an HTTP
+    Range request continues from its end. The part file is only renamed to
+    archive_path once its size (and sha256, if given) check out, so an
+    existing archive_path is always complete.
+    Returns the archive's sha256 hex digest.
+    """
+    http = session if session is not None else _default_http()
+    name = os.path.basename(archive_path)
+    part_path = archive_path + PART_SUFFIX
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    response = http.get(url, stream=True, headers=headers)
+    try:
+        if response.status_code == 416 and offset:
+            # Nothing left to send. That only means "complete" if the server's
+            # size ("bytes */N") matches the part file; anything else is a
+            # leftover from another or a changed archive.
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            if not total.isdigit() or int(total) != offset:
+                print(f"[WARN] {name}.part does not match the server's archive size; restarting")
+                response.close()
+                os.remove(part_path)
+                return fetch_archive(url, archive_path, session=session, progress=progress,
+                                     expected_sha256=expected_sha256)
+            total = offset
+        else:
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                print(f"[WARN] Server ignored the Range request; restarting {name}")
+                offset = 0
+            total = _total_size(response, offset)
+
+            if offset:
+                print(f"[INFO] Resuming {name} at {offset / 1e6:.1f} MB")
+            if progress is not None:
+                progress.start(name, total or 0)
+                progress.update(name, offset)
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    instrument.add(bytes_read=len(chunk))
+                    if progress is not None:
+                        progress.update(name, len(chunk))
+    finally:
+        response.close()
+
+    digest = hashlib.sha256()
+    _hash_file(part_path, digest)
+    try:
+        _check_integrity(name, os.path.getsize(part_path), total, digest, expected_sha256)
+    except DownloadIntegrityError:
+        # A corrupt part cannot be resumed; start clean next time.
+        os.remove(part_path)
+        raise
+
+    os.replace(part_path, archive_path)
+    return digest.hexdigest()
+
+
+def _extract_members(tar, staging_dir):
+    if hasattr(tarfile, "data_filter"):
+        tar.extractall(path=staging_dir, filter="data")
+    else:
+        tar.extractall(path=staging_dir)
+
+
+def _publish(staging_dir, extract_dir):
+    """Move every top-level entry out of the staging directory into place."""
+    for entry in os.listdir(staging_dir):
+        target = os.path.join(extract_dir, entry)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(os.path.join(staging_dir, entry), target)
+
+
+def _staging_dir_for(extract_dir, name):
+    # Leading dot keeps it out of the downloaders' "already exists" prefix scans.
+    return os.path.join(extract_dir, f".extract-{name}-{os.getpid()}")
+
+
+def extract_archive(archive_path, extract_dir):
+    """
+    Extract an .txz archive atomically: members are unpacked into a hidden
+    staging directory and only moved into extract_dir once extraction has
+    finished, so a failure never leaves partial files behind.
+    """
+    staging_dir = _staging_dir_for(extract_dir, os.path.basename(archive_path))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    try:
+        with tarfile.open(archive_path, "r:xz") as tar:
+            _extract_members(tar, staging_dir)
+        _publish(staging_dir, extract_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+class _CountingReader:
+    """File-like wrapper that hashes and counts bytes as tarfile reads them."""
+
+    def __init__(self, raw, name, progress):
+        self._raw = raw
+        self._name = name
+        self._progress = progress
+        self.digest = hashlib.sha256()
+        self.n_bytes = 0
+
+    def read(self, size=-1):
+        chunk = self._raw.read(size)
+        self.digest.update(chunk)
+        self.n_bytes += len(chunk)
+        instrument.add(bytes_read=len(chunk))
+        if self._progress is not None and chunk:
+            self._progress.update(self._name, len(chunk))
+        return chunk
+
+    def drain(self):
+        """Read whatever tarfile left unread (end-of-archive padding)."""
+        while self.read(CHUNK_SIZE):
+            pass
+
+
+def stream_extract(url, extract_dir, session=None, progress=None, expected_sha256=None):
+    """
+    Decompress the archive straight off the socket ("r|xz") without ever
+    writing the .txz to disk. Integrity is checked after the last byte and
+    before the extracted files are moved into place.
+    Returns the archive's sha256 hex digest.
+    """
+    http = session if session is not None else _default_http()
+    name = url.rsplit("/", 1)[-1]
+    staging_dir = _staging_dir_for(extract_dir, name)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    response = http.get(url, stream=True)
+    try:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        total = _total_size(response, 0)
+        if progress is not None:
+            progress.start(name, total or 0)
+
+        reader = _CountingReader(response.raw, name, progress)
+        with tarfile.open(fileobj=reader, mode="r|xz") as tar:
+            _extract_members(tar, staging_dir)
+        reader.drain()
+
+        _check_integrity(name, reader.n_bytes, total, reader.digest, expected_sha256)
+        _publish(staging_dir, extract_dir)
+        return reader.digest.hexdigest()
+    finally:
+        response.close()
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def fetch_and_extract(url, archive_path, session=None, progress=None,
+                      expected_sha256=None, mode="resume"):
+    """
+    Download and extract one MIST tarball into the archive's directory.
+
+    mode="resume" : resumable download to disk, verify, extract, delete archive
+    mode="stream" : decompress while downloading; the archive never hits disk
+    """
+    if mode not in DOWNLOAD_MODES:
+        raise ValueError(f"Unknown download mode {mode!r}; expected one of {DOWNLOAD_MODES}.")
+
+    name = os.path.basename(archive_path)
+    with instrument.stage("download", file=name, mode=mode):
+        digest = _download_then_extract(url, archive_path, session, progress, expected_sha256, mode)
+
+    if progress is not None:
+        progress.finish(name)
+    return digest
+
+
+def _download_then_extract(url, archive_path, session, progress, expected_sha256, mode):
+    name = os.path.basename(archive_path)
+    extract_dir = os.path.dirname(archive_path)
+
+    if mode == "stream":
+        print(f"Streaming + extracting into: {extract_dir}")
+        digest = stream_extract(url, extract_dir, session, progress, expected_sha256)
+    else:
+        if os.path.exists(archive_path):
+            # Only a verified download is ever renamed to archive_path.
+            print(f"[INFO] Using previously downloaded archive {name}")
+            digest = None
+        else:
+            digest = fetch_archive(url, archive_path, session, progress, expected_sha256)
+        print(f"Extracting into: {extract_dir}")
+        with instrument.stage("extract", file=name):
+            extract_archive(archive_path, extract_dir)
+        os.remove(archive_path)
+    return digest
@@ -1,26 +1,18 @@
 import os
-import requests
-import tarfile
 from .config_utils import load_config, ensure_config_dir_exists
+from .mirror_cache import fetch_from_sources, iso_archive_name
+from .manifest import is_installed, load_manifest
+from .selective_extract import selective_enabled
 
 
-def _fetch_and_extract(url, local_path):
+def _fetch_and_extract(url, local_path, session=None, progress=None, config=None, select=None):
     print(f"Starting download: {url}")
+    config = config if config is not None else load_config()
+    filename = os.path.basename(local_path)
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-
-        with open(local_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        extract_dir = os.path.dirname(local_path)
-        print(f"Extracting into: {extract_dir}")
-
-        with tarfile.open(local_path, "r:xz") as tar:
-            tar.extractall(path=extract_dir)
-
-        os.remove(local_path)
+        # Shared mirror cache, then mirror server, then MIST_BASE_URL (url)
+        fetch_from_sources(filename, local_path, config, session=session, progress=progress, select=select)
+        load_manifest(os.path.dirname(local_path))  # record the new grid
         print("Download + extraction complete.\n")
         return True
 
@@ -29,9 +21,13 @@ def _fetch_and_extract(url, local_path):
         return False
 
 
-def download_isochrone(vcrit=None):
+def download_isochrone(vcrit=None, session=None, progress=None, fehs=None):
     """
-    vcrit : float (0.0 or 0.4)
+    vcrit    : float (0.0 or 0.4)
+    fehs     : optional [Fe/H] list; with EXTRACT_MODE "selective" only
+               their .iso.cmd files are extracted
+    session  : optional requests.Session shared between downloads
+    progress : optional DownloadProgress for combined reporting
     """
     if vcrit is None or not isinstance(vcrit, (int, float)):
         raise ValueError("download_isochrone(vcrit=...) requires numeric vcrit (e.g., 0.0 or 0.4).")
@@ -40,15 +36,15 @@ def download_isochrone(vcrit=None):
     ensure_config_dir_exists(config)
     download_dir = config["DOWNLOAD_DIR"]
 
-    vvcrit = f"{float(vcrit):.1f}"
-    filename = f"MIST_v1.2_vvcrit{vvcrit}_UBVRIplus.txz"
+    filename = iso_archive_name(vcrit)
     local_path = os.path.join(download_dir, filename)
 
     base_name = filename.rsplit(".", 1)[0]
-    if any(name.startswith(base_name) for name in os.listdir(download_dir)):
+    if is_installed(download_dir, base_name):
         print(f"Already exists → skipping {filename}\n")
         return
 
     url = f"{config['MIST_BASE_URL']}{filename}"
     print(f"Downloading Isochrone: {filename}")
-    return _fetch_and_extract(url, local_path)
+    select = {"fehs": fehs} if selective_enabled(config) else None
+    return _fetch_and_extract(url, local_path, session=session, progress=progress, config=config, select=select)
@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .download_eep import download_eep
+from .download_iso import download_isochrone
+
+DEFAULT_MAX_WORKERS = 4
+REPORT_INTERVAL_S = 2.0
+
+
+class DownloadProgress:
+    """
+    Thread-safe byte counter shared by every concurrent download.
+    Prints one combined progress line at most every REPORT_INTERVAL_S seconds.
+    """
+
+    def __init__(self, report_interval=REPORT_INTERVAL_S):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._done = {}
+        self._finished = set()
+        self._report_interval = report_interval
+        self._last_report = 0.0
+
+    def start(self, name, total_bytes):
+        with self._lock:
+            self._totals[name] = total_bytes
+            self._done[name] = 0
+
+    def update(self, name, n_bytes):
+        with self._lock:
+            self._done[name] = self._done.get(name, 0) + n_bytes
+            now = time.monotonic()
+            if now - self._last_report < self._report_interval:
+                return
+            self._last_report = now
+            line = self._format_line()
+        print(line)
+
+    def finish(self, name):
+        with self._lock:
+            self._finished.add(name)
+
+    def _format_line(self):
+        done = sum(self._done.values())
+        total = sum(self._totals.values())
+        active = len(self._totals) - len(self._finished)
+        pct = f"{100.0 * done / total:5.1f}%" if total else "  ?  "
+        return (
+            f"[INFO] Downloads: {pct} of {total / 1e6:.1f} MB "
+            f"({done / 1e6:.1f} MB received, {active} active, {len(self._finished)} finished)"
+        )
+
+    def summary(self):
+        with self._lock:
+            return self._format_line()
+
+
+class _SharedSession:
+    """
+    One requests.Session for every worker so TCP/TLS connections are reused.
+    The session (and the requests import) is only created by the first
+    worker that actually has to download something.
+    """
+
+    def __init__(self, max_workers):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._session = None
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self._max_workers, pool_maxsize=self._max_workers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def get(self, *args, **kwargs):
+        return self._get_session().get(*args, **kwargs)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+def download_all(eep_vcrit=None, fehs=(), iso_vcrit=None, max_workers=DEFAULT_MAX_WORKERS,
+                 mass_range=None, iso_fehs=None):
+    """
+    Fetch and extract every requested EEPS tarball and the isochrone tarball
+    concurrently with a bounded thread pool.
+
+    eep_vcrit   : vcrit for the EEPS downloads (None skips them)
+    fehs        : list of [Fe/H] values for the EEPS downloads
+    iso_vcrit   : vcrit for the isochrone download (None skips it)
+    max_workers : maximum number of simultaneous transfers
+    mass_range  : (min, max) Msun of the tracks a run needs; with
+                  EXTRACT_MODE "selective" only those are extracted
+    iso_fehs    : [Fe/H] values whose isochrone files are extracted in
+                  selective mode (None: all of them)
+
+    Returns {label: result} where result is True/False for a download
+    attempt and None when the data was already present.
+    """
+    max_workers = max(1, int(max_workers))
+    jobs = []
+    if eep_vcrit is not None:
+        for feh in fehs:
+            jobs.append((f"EEPS [Fe/H]={float(feh):+.2f}", download_eep, {"vcrit": eep_vcrit, "feh": feh, "mass_range": mass_range}))
+    if iso_vcrit is not None:
+        jobs.append((f"Isochrones vcrit={float(iso_vcrit):.1f}", download_isochrone, {"vcrit": iso_vcrit, "fehs": iso_fehs}))
+
+    results = {}
+    if not jobs:
+        return results
+
+    progress = DownloadProgress()
+    session = _SharedSession(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(func, session=session, progress=progress, **kwargs): label
+                for label, func, kwargs in jobs
+            }
+            # Collect in submission order so the report is deterministic
+            for future, label in futures.items():
+                results[label] = future.result()
+    finally:
+        session.close()
+
+    failed = [label for label, ok in results.items() if ok is False]
+    print(progress.summary())
+    if failed:
+        print(f"[WARN] {len(failed)} download(s) failed: {', '.join(sorted(failed))}")
+    return results
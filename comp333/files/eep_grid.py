@@ -0,0 +1,182 @@
+import os
+import numpy as np
+from .grid_cache import GRID_CACHE
+from .grid_pack import load_pack, pack_codes, pack_path
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE
+from .track_cache import load_track_columns
+
+# MIST .track.eep columns used for plotting: age (yr), log(L), log(T_eff)
+GRID_COLUMNS = (STAR_AGE, LOG_L, LOG_TEFF)
+
+# Tracks and packed grids live in GRID_CACHE under ("track", eep_dir, code,
+# mtime) and ("eep_grid", ..., file mtimes) keys, so they are read at most
+# once per process until the memory budget evicts them, and a rewritten
+# track or repacked grid is read again (as grid_pack.load_pack does).
+
+
+class EepGrid:
+    """
+    Every loaded mass track of one EEPS directory packed into padded
+    (n_mass x n_eep) arrays. Row i is the track for masses[i]; column j is
+    EEP j + 1. Tracks shorter than the longest one are padded with NaN.
+    """
+
+    def __init__(self, eep_dir, codes, masses, columns):
+        self.eep_dir = eep_dir
+        self.codes = list(codes)
+        self.masses = np.asarray(masses, dtype=np.float64)
+        self.columns = columns
+
+    @property
+    def n_eep(self):
+        return next(iter(self.columns.values())).shape[1]
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.columns.values())
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+
+def code_to_mass(code: str) -> float:
+    """ "00105" -> 1.05 solar masses """
+    return int(code) / 100.0
+
+
+def list_mass_codes(eep_dir: str) -> list:
+    codes = {f[:5] for f in os.listdir(eep_dir) if f.endswith(".track.eep")}
+    return sorted(codes.union(pack_codes(eep_dir)))
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _track_path(eep_dir, code):
+    return os.path.join(eep_dir, f"{code}M.track.eep")
+
+
+def _source_signature(eep_dir, codes) -> tuple:
+    """mtimes of the pack and of every text track a grid may be read from."""
+    return (_mtime_ns(pack_path(eep_dir)),) + tuple(_mtime_ns(_track_path(eep_dir, c)) for c in codes)
+
+
+def _load_track(eep_dir, code, columns):
+    path = _track_path(eep_dir, code)
+    key = ("track", eep_dir, code, _mtime_ns(path))
+    cached = GRID_CACHE.get(key)
+    if cached is None or any(c not in cached for c in columns):
+        loaded = load_track_columns(path, columns)
+        cached = dict(cached or {})
+        cached.update({c: np.asarray(v) for c, v in loaded.items()})
+        GRID_CACHE[key] = cached
+    return cached
+
+
+def _codes_for_range(codes, mass_range):
+    """Codes inside mass_range plus one bracketing neighbor on each side."""
+    masses = np.array([code_to_mass(c) for c in codes])
+    lo = max(int(np.searchsorted(masses, mass_range[0], side="right")) - 1, 0)
+    hi = min(int(np.searchsorted(masses, mass_range[1], side="left")) + 1, len(codes))
+    return codes[lo:hi]
+
+
+def _grid_from_pack(eep_dir, codes, columns):
+    """EepGrid sliced out of the directory's pack, or None if it lacks a code or column."""
+    pack = load_pack(eep_dir)
+    if pack is None or any(name not in pack for name in columns):
+        return None
+    row_of = {code: i for i, code in enumerate(pack["codes"])}
+    if any(code not in row_of for code in codes):
+        return None  # tracks added since packing: read them one by one
+    rows = np.array([row_of[code] for code in codes])
+    n_eep = int(pack["lengths"][rows].max())
+    packed = {name: pack[name][rows, :n_eep] for name in columns}
+    return EepGrid(eep_dir, codes, pack["masses"][rows], packed)
+
+
+def load_eep_grid(eep_dir: str, columns=GRID_COLUMNS, mass_range=None, codes=None) -> EepGrid:
+    """
+    Load mass tracks from an EEPS directory into one padded EepGrid,
+    from the directory's packed .npz when it has every requested track.
+
+    mass_range : optional (min, max) in solar masses; only the tracks needed
+                 to interpolate inside that range are loaded
+    codes      : optional precomputed list of available mass codes
+    """
+    if codes is None:
+        codes = list_mass_codes(eep_dir)
+    if not codes:
+        raise RuntimeError(f"No .track.eep files found in {eep_dir}")
+    if mass_range is not None:
+        codes = _codes_for_range(codes, mass_range)
+
+    key = ("eep_grid", eep_dir, tuple(codes), tuple(columns), _source_signature(eep_dir, codes))
+    grid = GRID_CACHE.get(key)
+    if grid is not None:
+        return grid
+
+    grid = _grid_from_pack(eep_dir, codes, columns)
+    if grid is not None:
+        GRID_CACHE[key] = grid
+        return grid
+
+    tracks = [_load_track(eep_dir, code, columns) for code in codes]
+    n_eep = max(len(t[columns[0]]) for t in tracks)
+
+    packed = {}
+    for name in columns:
+        arr = np.full((len(codes), n_eep), np.nan)
+        for i, track in enumerate(tracks):
+            values = track[name]
+            arr[i, :len(values)] = values
+        packed[name] = arr
+
+    grid = EepGrid(eep_dir, codes, [code_to_mass(c) for c in codes], packed)
+    GRID_CACHE[key] = grid
+    return grid
+
+
+def interpolate_masses(grid: EepGrid, target_masses, columns=None) -> dict:
+    """
+    Interpolate any number of masses in one vectorized pass.
+
+    Blending happens EEP by EEP, so each interpolated point lies between
+    the same evolutionary phase on the two bracketing tracks. Where the
+    shorter bracketing track ends the result is NaN.
+    Returns {column: (n_target x n_eep) array}.
+    """
+    targets = np.atleast_1d(np.asarray(target_masses, dtype=np.float64))
+    masses = grid.masses
+    if targets.min() < masses[0] or targets.max() > masses[-1]:
+        raise ValueError(
+            f"Requested mass outside available EEPS range "
+            f"({masses[0]:.2f}-{masses[-1]:.2f} Msun)."
+        )
+
+    if len(masses) == 1:
+        lo = hi = np.zeros(len(targets), dtype=int)
+        weight = np.zeros(len(targets))
+    else:
+        hi = np.clip(np.searchsorted(masses, targets, side="left"), 1, len(masses) - 1)
+        lo = hi - 1
+        weight = (targets - masses[lo]) / (masses[hi] - masses[lo])
+
+    # Exact grid masses copy their own track so NaN padding of the neighbor
+    # does not truncate them.
+    exact_lo = weight == 0.0
+    exact_hi = weight == 1.0
+    w = weight[:, None]
+
+    out = {}
+    for name in (columns or grid.columns.keys()):
+        arr = grid[name]
+        blended = arr[lo] * (1.0 - w) + arr[hi] * w
+        blended[exact_lo] = arr[lo[exact_lo]]
+        blended[exact_hi] = arr[hi[exact_hi]]
+        out[name] = blended
+    return out
@@ -1,8 +1,12 @@
-import os
 import numpy as np
-import matplotlib.pyplot as plt
-from astropy.io import ascii
+from . import instrument
 from .config_utils import load_config
+from .eep_grid import code_to_mass, interpolate_masses, load_eep_grid
+from .feh_interp import blend_tracks, bracket_feh
+from .layer_cache import cached_layers, eep_grid_signature
+from .manifest import eep_mass_codes, find_eep_dir
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE
+from .selective_extract import ensure_eep_members
 
 
 def _feh_to_code(feh: float) -> str:
@@ -10,6 +14,10 @@ def _feh_to_code(feh: float) -> str:
     return f"{sign}{abs(feh):.2f}"
 
 
+def _mass_to_code(mass: float) -> str:
+    return f"{int(round(mass * 100)):05d}"
+
+
 def _vcrit_to_code(vcrit: float) -> str:
     return f"{float(vcrit):.1f}"
 
@@ -19,36 +27,78 @@ def _find_eep_dir(download_dir: str, feh: float, vcrit: float) -> str:
     Find extracted EEPS directory matching feh + vcrit.
     Example:
       MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS
+    Lookups go through the DOWNLOAD_DIR manifest instead of listing the directory.
+    A missing grid is an error; another metallicity is never substituted.
     """
-    feh_code = _feh_to_code(float(feh))
-    vv = _vcrit_to_code(float(vcrit))
-
-    target_suffix = f"feh_{feh_code}_afe_p0.0_vvcrit{vv}_EEPS"
-    candidates = [
-        os.path.join(download_dir, d)
-        for d in os.listdir(download_dir)
-        if d.endswith("_EEPS") and target_suffix in d
-    ]
-    if candidates:
-        return sorted(candidates)[0]
-
-    # fallback: any EEPS dir (for robustness), but only if nothing matches
-    fallback = [
-        os.path.join(download_dir, d)
-        for d in os.listdir(download_dir)
-        if d.endswith("_EEPS")
-    ]
-    if fallback:
-        return sorted(fallback)[0]
-
-    raise RuntimeError("No EEPS directory found. Run eep_download first.")
-
-
-def plot_eep(cfg):
+    path = find_eep_dir(download_dir, feh=float(feh), vcrit=float(vcrit))
+    if path is not None:
+        return path
+
+    raise RuntimeError(
+        f"No EEPS directory for [Fe/H]={float(feh):+.2f}, vcrit={float(vcrit):.1f}. "
+        f"Run eep_download for it first."
+    )
+
+
+def _grid_mass_curves(download_dir, feh, vcrit, target_masses):
+    eep_path = _find_eep_dir(download_dir, feh=feh, vcrit=vcrit)
+    print(f"[INFO] Using EEPS directory for [Fe/H]={feh:+.2f}: {eep_path}")
+
+    mass_range = (float(np.min(target_masses)), float(np.max(target_masses)))
+    ensure_eep_members(eep_path, mass_range)  # selectively extracted grids: pull missing tracks
+    codes = eep_mass_codes(eep_path)
+    if not codes or mass_range[0] < code_to_mass(codes[0]) or mass_range[1] > code_to_mass(codes[-1]):
+        raise ValueError(
+            f"Requested mass code {_mass_to_code(mass_range[0])}-{_mass_to_code(mass_range[1])} "
+            f"is outside available EEPS range."
+        )
+    with instrument.stage("eep.load_grid", feh=feh):
+        grid = load_eep_grid(eep_path, mass_range=mass_range, codes=codes)
+    with instrument.stage("eep.interpolate", feh=feh, masses=len(target_masses)):
+        return interpolate_masses(grid, target_masses)
+
+
+def _grid_signature(download_dir, fehs, vcrit, mass_range=None) -> list:
+    """mtime/size of the EEPS directories, packs and tracks a layer reads."""
+    dirs = [find_eep_dir(download_dir, feh=f, vcrit=vcrit) for f in sorted(set(fehs))]
+    return eep_grid_signature(dirs, mass_range)
+
+
+def mass_curves(download_dir: str, feh: float, vcrit: float, target_masses) -> dict:
+    """
+    Tracks for target_masses at any [Fe/H] inside the MIST grid:
+    {column: (n_target x n_eep) array}. Off-grid metallicities blend the
+    two bracketing installed grids EEP by EEP.
+    """
+    lo, hi, weight = bracket_feh(feh)
+    curves = _grid_mass_curves(download_dir, lo, vcrit, target_masses)
+    if weight == 0.0:
+        return curves
+    upper = _grid_mass_curves(download_dir, hi, vcrit, target_masses)
+    return blend_tracks(curves, upper, weight)
+
+
+def _eep_layer(download_dir, feh, vcrit, target_masses, age_min, age_max) -> list:
+    """(logT, logL) per target mass inside the age window, for one metallicity."""
+    curves = mass_curves(download_dir, feh, vcrit, target_masses)
+    layer = []
+    for logT, logL, age in zip(curves[LOG_TEFF], curves[LOG_L], curves[STAR_AGE]):
+        m = (age >= age_min) & (age <= age_max)
+        layer.append((logT[m], logL[m]))
+    return layer
+
+
+def plot_eep(cfg, ax=None):
     """
     Plot two evolutionary tracks (min and max mass) for one or more metallicities.
+    Draws on ax (defaults to the current pyplot axes). With cfg["workers"]
+    > 1, metallicities missing from the layer cache are computed in a
+    process pool; drawing order always follows feh_list.
     Returns bounds tuned to the low-mass regime across all plotted tracks.
     """
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
 
     system_cfg = load_config()
     download_dir = system_cfg["DOWNLOAD_DIR"]
@@ -72,69 +122,42 @@ def plot_eep(cfg):
     all_T_accum = []
     all_L_accum = []
 
-    def load_track(path, code):
-        data = ascii.read(os.path.join(path, f"{code}M.track.eep"))
-        return (
-            np.array(data["col12"]),  # log(T_eff)
-            np.array(data["col7"]),   # log(L)
-            np.array(data["col1"]),   # age (years)
-        )
-
-    def restrict(logT, logL, age):
-        m = (age >= age_min) & (age <= age_max)
-        return logT[m], logL[m]
-
-    def interpolate(target, low, high, low_vals, high_vals):
-        if high == low:
-            return low_vals
-        w = (target - low) / (high - low)
-        return low_vals * (1 - w) + high_vals * w
-
-    def get_curve(path, codes, code):
-        if code in codes:
-            logT, logL, age = load_track(path, code)
-            return restrict(logT, logL, age)
-
-        idx = np.searchsorted(codes, code)
-        if idx <= 0 or idx >= len(codes):
-            raise ValueError(f"Requested mass code {code} is outside available EEPS range.")
-
-        low_c, high_c = codes[idx - 1], codes[idx]
-
-        low_T, low_L = restrict(*load_track(path, low_c))
-        high_T, high_L = restrict(*load_track(path, high_c))
+    min_mass = code_to_mass(min_code)
+    max_mass = code_to_mass(max_code)
 
-        n = min(len(low_T), len(high_T))
-        low_T, low_L = low_T[:n], low_L[:n]
-        high_T, high_L = high_T[:n], high_L[:n]
-
-        target = float(code)
-        low = float(low_c)
-        high = float(high_c)
-
-        logT = interpolate(target, low, high, low_T, high_T)
-        logL = interpolate(target, low, high, low_L, high_L)
-        return logT, logL
+    # Optional fan of evenly spaced intermediate masses between the two tracks
+    n_fan = int(cfg.get("n_masses", 2))
+    target_masses = np.linspace(min_mass, max_mass, max(n_fan, 2))
 
+    jobs = []
     for feh in feh_list:
-        eep_path = _find_eep_dir(download_dir, feh=float(feh), vcrit=vcrit)
-        print(f"[INFO] Using EEPS directory for [Fe/H]={feh:+.2f}: {eep_path}")
-
-        files = sorted(f for f in os.listdir(eep_path) if f.endswith(".track.eep"))
-        codes = sorted([f[:5] for f in files])
-
-        low_T, low_L = get_curve(eep_path, codes, min_code)
-        high_T, high_L = get_curve(eep_path, codes, max_code)
-
+        lo, hi, _ = bracket_feh(feh)  # off-grid [Fe/H] fails here, not as a mass-range error
+        # Curves are reused across runs until these settings or the grids change
+        inputs = {
+            "feh": float(feh), "vcrit": vcrit, "masses": target_masses.tolist(),
+            "age_window": [age_min, age_max], "grids": _grid_signature(download_dir, (lo, hi), vcrit, (min_mass, max_mass)),
+        }
+        jobs.append((inputs, (download_dir, float(feh), vcrit, target_masses, age_min, age_max)))
+
+    # Uncached metallicities load and interpolate in parallel with "workers" > 1
+    workers = int(cfg.get("workers", 1))
+    with instrument.stage("eep.layers", fehs=len(jobs), workers=workers):
+        layers = cached_layers("eep", jobs, _eep_layer, workers=workers)
+
+    for feh, layer in zip(feh_list, layers):
         # labels include metallicity so overlay is understandable
         feh_tag = f"[Fe/H]={float(feh):+.2f}"
-        plt.plot(low_T, low_L, "-", lw=2.5, label=f"{label_low} ({feh_tag})")
-        plt.plot(high_T, high_L, "-", lw=2.5, label=f"{label_high} ({feh_tag})")
-
-        all_T_accum.append(low_T)
-        all_T_accum.append(high_T)
-        all_L_accum.append(low_L)
-        all_L_accum.append(high_L)
+        last = len(target_masses) - 1
+        for i, (T, L) in enumerate(layer):
+            if i == 0:
+                ax.plot(T, L, "-", lw=2.5, label=f"{label_low} ({feh_tag})")
+            elif i == last:
+                ax.plot(T, L, "-", lw=2.5, label=f"{label_high} ({feh_tag})")
+            else:
+                ax.plot(T, L, "-", lw=0.8, alpha=0.5, color="gray")
+
+            all_T_accum.append(T)
+            all_L_accum.append(L)
 
     all_T = np.concatenate(all_T_accum) if all_T_accum else np.array([])
     all_L = np.concatenate(all_L_accum) if all_L_accum else np.array([])
@@ -0,0 +1,86 @@
+from bisect import bisect_left
+
+# Only the blending helpers need numpy: bracket_feh and grid_fehs run on
+# download-only startups, which never import it
+
+# [Fe/H] values of the published MIST v1.2 grids
+MIST_FEH_GRID = (-4.0, -3.5, -3.0, -2.5, -2.0, -1.75, -1.5, -1.25, -1.0, -0.75, -0.5, -0.25, 0.0, 0.25, 0.5)
+
+# Requested values this close to a grid point use that grid alone
+FEH_TOLERANCE = 1e-6
+
+
+def bracket_feh(feh: float, grid=MIST_FEH_GRID):
+    """
+    Bracketing grid metallicities for feh: (feh_lo, feh_hi, weight of feh_hi).
+    A value on the grid returns (feh, feh, 0.0). ValueError outside the grid.
+    """
+    feh = float(feh)
+    values = sorted(float(v) for v in grid)
+    nearest = min(values, key=lambda v: abs(v - feh))
+    if abs(nearest - feh) <= FEH_TOLERANCE:
+        return nearest, nearest, 0.0
+    if feh < values[0] or feh > values[-1]:
+        raise ValueError(
+            f"[Fe/H]={feh:+.2f} is outside the MIST grid ({values[0]:+.2f} to {values[-1]:+.2f})."
+        )
+    hi = bisect_left(values, feh)
+    lo = hi - 1
+    return values[lo], values[hi], (feh - values[lo]) / (values[hi] - values[lo])
+
+
+def grid_fehs(fehs) -> list:
+    """Sorted grid metallicities needed to plot every value in fehs."""
+    if isinstance(fehs, (int, float, str)):
+        fehs = [fehs]
+    needed = set()
+    for feh in fehs:
+        lo, hi, _ = bracket_feh(feh)
+        needed.update((lo, hi))
+    return sorted(needed)
+
+
+def blend_tracks(lo: dict, hi: dict, weight: float) -> dict:
+    """
+    Blend two {column: (n_mass x n_eep)} track sets EEP by EEP. Columns
+    are truncated to the shorter grid; where either track has ended the
+    result is NaN.
+    """
+    out = {}
+    for name in lo:
+        a, b = lo[name], hi[name]
+        n = min(a.shape[-1], b.shape[-1])
+        out[name] = a[..., :n] * (1.0 - weight) + b[..., :n] * weight
+    return out
+
+
+def blend_isochrones(lo: dict, hi: dict, weight: float, eep_key: str) -> dict:
+    """Blend two isochrones {column: array} on the EEPs present in both."""
+    import numpy as np
+
+    _, ia, ib = np.intersect1d(lo[eep_key], hi[eep_key], assume_unique=True, return_indices=True)
+    out = {eep_key: lo[eep_key][ia]}
+    for name in lo:
+        if name != eep_key:
+            out[name] = lo[name][ia] * (1.0 - weight) + hi[name][ib] * weight
+    return out
+
+
+def ensure_eep_grids(fehs, vcrit, download_dir=None, max_workers=None):
+    """
+    Download any EEPS grid needed to bracket fehs that is not installed yet.
+    Returns the grid metallicities that were missing.
+    """
+    from .config_utils import load_config
+    from .manifest import find_eep_dir
+
+    if download_dir is None:
+        download_dir = load_config()["DOWNLOAD_DIR"]
+    missing = [f for f in grid_fehs(fehs) if find_eep_dir(download_dir, f, vcrit) is None]
+    if missing:
+        from .download_manager import download_all
+
+        print(f"[INFO] Downloading bracketing EEPS grids for [Fe/H]={', '.join(f'{f:+.2f}' for f in missing)}")
+        kwargs = {} if max_workers is None else {"max_workers": max_workers}
+        download_all(eep_vcrit=vcrit, fehs=missing, **kwargs)
+    return missing
@@ -0,0 +1,324 @@
+import json
+import os
+import sys
+import numpy as np
+from .config_utils import load_config
+from .eep_grid import interpolate_masses, load_eep_grid
+from .feh_interp import grid_fehs
+from .grid_cache import GRID_CACHE
+from .manifest import eep_mass_codes, find_eep_dir
+from .mist_reader import LOG_L as LOGL_COL, LOG_TEFF as LOGT_COL, STAR_AGE as AGE_COL
+from .selective_extract import ensure_eep_members
+
+# Gaussian 1-sigma used for an exact x or y given without x_err / y_err
+DEFAULT_X_ERR = 0.01
+DEFAULT_Y_ERR = 0.05
+
+DEFAULT_CELL_SIZE = (0.01, 0.05)  # (log T_eff, log L) width of one index cell
+DEFAULT_MASS_SUBSTEPS = 4         # interpolated tracks between two grid masses
+DEFAULT_N_SIGMA = 4.0             # Gaussian constraints search this far out
+
+
+class FitIndex:
+    """
+    Every model point (one EEP on one track) of one or more [Fe/H] grids,
+    bucketed into a regular (log T_eff, log L) cell grid.
+
+    Points are sorted by cell id = ix * ny + iy, and cell_start[c] is the
+    first sorted position of cell c. All cells of one ix column between two
+    iy values are therefore one contiguous slice, so a box query costs one
+    slice per column of cells it covers.
+    """
+
+    def __init__(self, logT, logL, mass, log_age, feh, prior, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = (float(cell_size[0]), float(cell_size[1]))
+        self.x0 = float(logT.min())
+        self.y0 = float(logL.min())
+        ix = ((logT - self.x0) / self.cell_size[0]).astype(np.int64)
+        iy = ((logL - self.y0) / self.cell_size[1]).astype(np.int64)
+        self.nx = int(ix.max()) + 1
+        self.ny = int(iy.max()) + 1
+
+        cell = ix * self.ny + iy
+        order = np.argsort(cell, kind="stable")
+        self.cell_start = np.searchsorted(cell[order], np.arange(self.nx * self.ny + 1))
+
+        self.logT = logT[order]
+        self.logL = logL[order]
+        self.mass = mass[order]
+        self.log_age = log_age[order]
+        self.feh = feh[order]
+        self.prior = prior[order]
+
+    def __len__(self):
+        return len(self.logT)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.logT, self.logL, self.mass, self.log_age, self.feh, self.prior, self.cell_start,
+        ))
+
+    @staticmethod
+    def _cells(lo, hi, origin, size, n):
+        # Clip in float first so infinite (unconstrained) windows are safe
+        first = np.clip(np.floor((lo - origin) / size), 0, n)
+        last = np.clip(np.floor((hi - origin) / size), -1, n - 1)
+        return int(first), int(last)
+
+    def query(self, x_lo, x_hi, y_lo, y_hi) -> np.ndarray:
+        """Sorted positions of every model inside the box (cell-level superset)."""
+        ix0, ix1 = self._cells(x_lo, x_hi, self.x0, self.cell_size[0], self.nx)
+        iy0, iy1 = self._cells(y_lo, y_hi, self.y0, self.cell_size[1], self.ny)
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype=np.int64)
+
+        cols = np.arange(ix0, ix1 + 1) * self.ny
+        starts = self.cell_start[cols + iy0]
+        stops = self.cell_start[cols + iy1 + 1]
+        return np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+
+
+def _grid_models(eep_dir, feh, mass_range, mass_substeps):
+    """Flattened model points of one EEPS directory, densified in mass."""
+    ensure_eep_members(eep_dir, mass_range)
+    grid = load_eep_grid(
+        eep_dir,
+        columns=(AGE_COL, LOGL_COL, LOGT_COL),
+        mass_range=mass_range,
+        codes=eep_mass_codes(eep_dir),
+    )
+    masses = grid.masses
+    if mass_range is not None:
+        lo = max(float(mass_range[0]), masses[0])
+        hi = min(float(mass_range[1]), masses[-1])
+        masses = masses[(masses >= lo) & (masses <= hi)]
+        masses = np.unique(np.concatenate([[lo], masses, [hi]]))
+
+    # mass_substeps - 1 extra tracks inside every gap between grid masses
+    if len(masses) > 1 and mass_substeps > 1:
+        steps = np.linspace(0.0, 1.0, mass_substeps, endpoint=False)
+        dense = masses[:-1, None] + np.diff(masses)[:, None] * steps
+        masses = np.append(dense.ravel(), masses[-1])
+
+    curves = interpolate_masses(grid, masses)
+    age = curves[AGE_COL]
+
+    # Prior uniform in mass and age: each model stands for the mass step to
+    # its neighbours times the time the star spends around that EEP.
+    dm = np.gradient(masses) if len(masses) > 1 else np.ones(1)
+    dt = np.gradient(age, axis=1)
+    # At each track's last EEP the central difference reads the NaN pad:
+    # use the one-sided difference np.gradient takes at an array edge
+    n_valid = np.isfinite(age).sum(axis=1)
+    rows = np.flatnonzero((n_valid >= 2) & (n_valid < age.shape[1]))
+    last = n_valid[rows] - 1
+    dt[rows, last] = age[rows, last] - age[rows, last - 1]
+    prior = dm[:, None] * dt
+
+    ok = np.isfinite(age) & np.isfinite(prior) & (prior > 0)
+    mass = np.broadcast_to(masses[:, None], age.shape)
+    return (
+        curves[LOGT_COL][ok],
+        curves[LOGL_COL][ok],
+        mass[ok],
+        np.log10(age[ok]),
+        np.full(np.count_nonzero(ok), float(feh)),
+        prior[ok],
+    )
+
+
+def build_fit_index(fehs, vcrit, download_dir=None, mass_range=None,
+                    mass_substeps=DEFAULT_MASS_SUBSTEPS, cell_size=DEFAULT_CELL_SIZE) -> FitIndex:
+    """
+    Build one FitIndex over the installed EEPS grids for every [Fe/H] in fehs.
+
+    mass_range    : optional (min, max) in solar masses to limit the grid
+    mass_substeps : tracks interpolated per gap between tabulated masses
+    """
+    if download_dir is None:
+        download_dir = load_config()["DOWNLOAD_DIR"]
+    download_dir = os.path.expanduser(download_dir)
+
+    eep_dirs = []
+    for feh in fehs:
+        eep_dir = find_eep_dir(download_dir, feh=float(feh), vcrit=float(vcrit))
+        if eep_dir is None:
+            raise RuntimeError(
+                f"No EEPS grid installed for [Fe/H]={float(feh):+.2f}, vcrit={float(vcrit):.1f}. "
+                f"Run eep_download first."
+            )
+        eep_dirs.append((eep_dir, float(feh)))
+
+    key = (
+        "fit_index", tuple(eep_dirs),
+        None if mass_range is None else tuple(float(m) for m in mass_range),
+        int(mass_substeps), tuple(float(c) for c in cell_size),
+    )
+    index = GRID_CACHE.get(key)
+    if index is None:
+        parts = [_grid_models(d, feh, mass_range, int(mass_substeps)) for d, feh in eep_dirs]
+        columns = [np.concatenate(col) for col in zip(*parts)]
+        index = FitIndex(*columns, cell_size=cell_size)
+        GRID_CACHE[key] = index
+    return index
+
+
+def _axis_constraint(p, key, default_err):
+    """
+    ("gauss", center, sigma), ("box", lo, hi) or None for one axis of a
+    point spec, following the same x / x_err / x_range keys as plt_iso.
+    An exact value wins over a range, as in the plotted cases.
+    """
+    if key in p:
+        return "gauss", float(p[key]), float(p.get(f"{key}_err") or default_err)
+    rng = p.get(f"{key}_range")
+    if rng is not None:
+        if not (isinstance(rng, list) and len(rng) == 2):
+            raise ValueError(f"{key}_range must be [min, max]: {p}")
+        lo, hi = sorted(float(v) for v in rng)
+        return "box", lo, hi
+    return None
+
+
+def _window(constraint, n_sigma):
+    if constraint is None:
+        return -np.inf, np.inf
+    kind, a, b = constraint
+    if kind == "gauss":
+        return a - n_sigma * b, a + n_sigma * b
+    return a, b
+
+
+def _log_likelihood(constraint, values):
+    if constraint is None:
+        return np.zeros(len(values))
+    kind, a, b = constraint
+    if kind == "gauss":
+        return -0.5 * ((values - a) / b) ** 2
+    return np.where((values >= a) & (values <= b), 0.0, -np.inf)
+
+
+def _weighted_stats(values, weights):
+    mean = float(np.sum(weights * values))
+    std = float(np.sqrt(max(np.sum(weights * (values - mean) ** 2), 0.0)))
+    return mean, std
+
+
+def fit_point(index: FitIndex, p, n_sigma=DEFAULT_N_SIGMA):
+    """
+    Estimate mass, log(age) and [Fe/H] for one point spec from run_config.
+
+    Returns a dict with the likelihood-weighted mean and standard deviation
+    of each parameter, the single best-matching model ("best_*") and the
+    number of models used, or None if no model satisfies the constraints.
+    """
+    x_con = _axis_constraint(p, "x", DEFAULT_X_ERR)
+    y_con = _axis_constraint(p, "y", DEFAULT_Y_ERR)
+    if x_con is None and y_con is None:
+        raise ValueError(f"Point has no x or y constraint: {p}")
+
+    x_lo, x_hi = _window(x_con, n_sigma)
+    y_lo, y_hi = _window(y_con, n_sigma)
+    idx = index.query(x_lo, x_hi, y_lo, y_hi)
+    if len(idx) == 0:
+        return None
+
+    log_like = _log_likelihood(x_con, index.logT[idx]) + _log_likelihood(y_con, index.logL[idx])
+    finite = np.isfinite(log_like)
+    if not finite.any():
+        return None
+    idx = idx[finite]
+    log_like = log_like[finite]
+
+    like = np.exp(log_like - log_like.max())
+    weights = like * index.prior[idx]
+    weights /= weights.sum()
+    best = idx[np.argmax(like)]
+
+    mass, mass_err = _weighted_stats(index.mass[idx], weights)
+    log_age, log_age_err = _weighted_stats(index.log_age[idx], weights)
+    feh, feh_err = _weighted_stats(index.feh[idx], weights)
+    return {
+        "name": p.get("name", "Constraint"),
+        "mass": mass,
+        "mass_err": mass_err,
+        "log_age": log_age,
+        "log_age_err": log_age_err,
+        "feh": feh,
+        "feh_err": feh_err,
+        "best_mass": float(index.mass[best]),
+        "best_log_age": float(index.log_age[best]),
+        "best_feh": float(index.feh[best]),
+        "n_models": int(len(idx)),
+    }
+
+
+def fit_points(index: FitIndex, points, n_sigma=DEFAULT_N_SIGMA) -> list:
+    """fit_point for every point spec; unsupported or unmatched specs give None."""
+    results = []
+    for p in points:
+        try:
+            results.append(fit_point(index, p, n_sigma=n_sigma))
+        except ValueError as e:
+            print(f"[WARN] {e}")
+            results.append(None)
+    return results
+
+
+def fit_from_config(cfg) -> list:
+    """
+    Fit every entry of cfg["points"] against the EEPS grids the run config
+    plots: eep_download feh/vcrit if present, else eep_plot_settings.
+    Optional "fit" section: mass_range, mass_substeps, cell_size, n_sigma.
+    """
+    fit_cfg = cfg.get("fit", {})
+    eep_cfg = cfg.get("eep_plot_settings", {})
+
+    fehs = cfg.get("eep_download", {}).get("feh", eep_cfg.get("feh_list", [0.0]))
+    if not isinstance(fehs, list):
+        fehs = [fehs]
+    # Off-grid [Fe/H] values fit against the grids that bracket them
+    fehs = grid_fehs(fehs)
+    vcrit = cfg.get("eep_download", {}).get("vcrit", eep_cfg.get("vcrit", 0.4))
+
+    index = build_fit_index(
+        fehs,
+        vcrit,
+        mass_range=fit_cfg.get("mass_range"),
+        mass_substeps=fit_cfg.get("mass_substeps", DEFAULT_MASS_SUBSTEPS),
+        cell_size=fit_cfg.get("cell_size", DEFAULT_CELL_SIZE),
+    )
+    return fit_points(index, cfg.get("points", []), n_sigma=fit_cfg.get("n_sigma", DEFAULT_N_SIGMA))
+
+
+def print_fits(points, results):
+    print(f"{'Star':<20s} {'Mass (Msun)':>16s} {'log(age/yr)':>16s} {'[Fe/H]':>14s} {'models':>7s}")
+    for p, r in zip(points, results):
+        name = p.get("name", "Constraint")
+        if r is None:
+            print(f"{name:<20s} {'no matching models':>16s}")
+            continue
+        print(
+            f"{name:<20s} {r['mass']:>8.3f} ± {r['mass_err']:<5.3f} "
+            f"{r['log_age']:>8.3f} ± {r['log_age_err']:<5.3f} "
+            f"{r['feh']:>+6.2f} ± {r['feh_err']:<5.2f} {r['n_models']:>7d}"
+        )
+
+
+def main():
+    """
+    Usage: python3 -m comp333.files.fitting <run_config.json>
+    Prints the fitted mass, age and [Fe/H] for every entry in "points".
+    """
+    if len(sys.argv) != 2:
+        print("Usage: python3 -m comp333.files.fitting <run_config.json>")
+        return
+
+    with open(sys.argv[1]) as f:
+        cfg = json.load(f)
+    print_fits(cfg.get("points", []), fit_from_config(cfg))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Default budget for parsed tracks, isochrone blocks and fit indexes.
+# The long-lived service sets its own with set_memory_budget().
+DEFAULT_BUDGET_MB = 2048
+
+
+def nbytes(value) -> int:
+    """Approximate memory held by a cached value (arrays, dicts of arrays, grids)."""
+    size = getattr(value, "nbytes", None)
+    if isinstance(size, int):
+        return size
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LruCache:
+    """
+    Dict-like least-recently-used cache bounded by total size in bytes.
+    Inserting past the budget evicts the oldest entries first; a single
+    entry larger than the whole budget is still kept until the next insert.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def __setitem__(self, key, value):
+        size = nbytes(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._items[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return default
+            self.total_bytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        while self.total_bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, size) = self._items.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "bytes": self.total_bytes,
+            "budget_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# One process-wide cache so a single budget covers every kind of grid data.
+# Keys start with a kind tag: ("track", ...), ("iso_block", ...), ("fit_index", ...).
+GRID_CACHE = LruCache(DEFAULT_BUDGET_MB * 1024 * 1024)
+
+
+def set_memory_budget(megabytes):
+    """Bound GRID_CACHE to megabytes (None for no limit)."""
+    GRID_CACHE.set_budget(None if megabytes is None else int(megabytes * 1024 * 1024))
@@ -0,0 +1,126 @@
+import os
+import shutil
+import sys
+import numpy as np
+from . import instrument
+from .config_utils import load_config
+from .grid_cache import GRID_CACHE
+from .manifest import PACK_FILE, installed_grids
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE, read_track
+
+# One uncompressed .npz per EEPS directory replaces ~200 text tracks:
+#   codes (n_mass,), masses (n_mass,), lengths (n_mass,) and one
+#   NaN-padded (n_mass x n_eep) float64 array per packed column.
+PACK_VERSION = 1
+PACK_COLUMNS = (STAR_AGE, LOG_L, LOG_TEFF)
+
+
+def pack_path(eep_dir: str) -> str:
+    return os.path.join(eep_dir, PACK_FILE)
+
+
+def _text_codes(eep_dir: str) -> list:
+    return sorted(f[:5] for f in os.listdir(eep_dir) if f.endswith(".track.eep"))
+
+
+def pack_eep_dir(eep_dir: str, columns=PACK_COLUMNS, delete_text=False) -> str:
+    """
+    Pack every .track.eep file of an EEPS directory into PACK_FILE, keeping
+    only the given columns. With delete_text=True the text tracks (and
+    their per-track binary cache) are removed afterwards.
+    Returns the pack path.
+    """
+    eep_dir = os.path.expanduser(eep_dir)
+    codes = _text_codes(eep_dir)
+    if not codes:
+        raise RuntimeError(f"No .track.eep files to pack in {eep_dir}")
+
+    with instrument.stage("eeps.pack", dir=os.path.basename(eep_dir), tracks=len(codes)):
+        tracks = [read_track(os.path.join(eep_dir, f"{code}M.track.eep"), columns) for code in codes]
+        lengths = np.array([len(t[columns[0]]) for t in tracks], dtype=np.int32)
+        arrays = {}
+        for name in columns:
+            arr = np.full((len(codes), int(lengths.max())), np.nan)
+            for i, track in enumerate(tracks):
+                arr[i, :lengths[i]] = track[name]
+            arrays[name] = arr
+
+        # Write under a temporary name so readers never see a half-written pack
+        path = pack_path(eep_dir)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            version=np.array(PACK_VERSION),
+            codes=np.array(codes),
+            masses=np.array([int(c) / 100.0 for c in codes]),
+            lengths=lengths,
+            **arrays,
+        )
+        os.replace(tmp_path, path)
+
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"[INFO] Packed {len(codes)} tracks of {eep_dir} into {PACK_FILE} ({size_mb:.1f} MB)")
+
+    if delete_text:
+        for code in codes:
+            os.remove(os.path.join(eep_dir, f"{code}M.track.eep"))
+        shutil.rmtree(os.path.join(eep_dir, ".track_cache"), ignore_errors=True)
+        print(f"[INFO] Removed {len(codes)} text tracks from {eep_dir}")
+    return path
+
+
+def pack_codes(eep_dir: str) -> list:
+    """Mass codes stored in the directory's pack ([] if there is none)."""
+    try:
+        with np.load(pack_path(eep_dir)) as pack:
+            return [str(c) for c in pack["codes"]]
+    except (OSError, KeyError, ValueError):
+        return []
+
+
+def load_pack(eep_dir: str):
+    """
+    The directory's pack as {"codes", "masses", "lengths", <columns>}, or
+    None if there is none or it was written by another PACK_VERSION.
+    """
+    path = pack_path(eep_dir)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    key = ("eep_pack", path, mtime_ns)
+    pack = GRID_CACHE.get(key)
+    if pack is None:
+        with instrument.stage("eeps.load_pack", dir=os.path.basename(eep_dir)), np.load(path) as f:
+            if int(f["version"]) != PACK_VERSION:
+                return None
+            pack = {name: f[name] for name in f.files if name != "version"}
+            pack["codes"] = [str(c) for c in pack["codes"]]
+            instrument.add(bytes_read=os.path.getsize(path))
+        GRID_CACHE[key] = pack
+    return pack
+
+
+def main():
+    """
+    Usage: python3 -m comp333.files.grid_pack [--delete-text] [EEPS_DIR ...]
+    With no directories, packs every EEPS directory in DOWNLOAD_DIR.
+    """
+    args = sys.argv[1:]
+    delete_text = "--delete-text" in args
+    eep_dirs = [a for a in args if a != "--delete-text"]
+    if not eep_dirs:
+        download_dir = os.path.expanduser(load_config()["DOWNLOAD_DIR"])
+        eep_dirs = [grid["path"] for grid in installed_grids(download_dir, kind="eeps")
+                    if _text_codes(grid["path"])]
+        if not eep_dirs:
+            print(f"[WARN] No unpacked EEPS directories found in {download_dir}")
+            return
+
+    for eep_dir in eep_dirs:
+        pack_eep_dir(eep_dir, delete_text=delete_text)
+
+
+if __name__ == "__main__":
+    main()
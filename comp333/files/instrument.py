@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+import time
+
+# Opt-in stage tracing: wall time, peak Python memory, bytes read and rows
+# parsed per named stage. A ".jsonl" trace gets one JSON object per stage;
+# anything else is a Chrome trace (chrome://tracing or ui.perfetto.dev).
+# When tracing is off, stage() returns one shared no-op context manager and
+# add() returns at once, so instrumented code pays only a global lookup.
+
+TRACE_ENV = "COMP333_TRACE"
+TRACE_FORMATS = ("chrome", "jsonl")
+
+_ACTIVE = None  # the running _Trace, or None when tracing is off
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.args = dict(attrs)
+        self.child_peak = 0
+
+    def __enter__(self):
+        stack = self.trace.stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.measure = self.trace.memory and self.trace.enter_memory_scope(self)
+        if self.measure:
+            import tracemalloc
+            # Keep the parent's peak so far before resetting it for this stage
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, tracemalloc.get_traced_memory()[1])
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.trace.stack().pop()
+        if self.trace.memory and self.trace.exit_memory_scope(self):
+            import tracemalloc
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            self.args["peak_mem_bytes"] = max(peak - self.mem_start, 0)
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, peak)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.record(self.name, self.start, end, self.args)
+        return False
+
+
+class _Trace:
+    def __init__(self, path, fmt, memory, owns_tracemalloc=False):
+        self.path = path
+        self.fmt = fmt
+        self.memory = memory
+        self.owns_tracemalloc = owns_tracemalloc
+        self.origin = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # tracemalloc's peak is process-wide, so only main-thread stages that
+        # no other thread's stage overlaps get a peak_mem_bytes
+        self.threaded_open = 0
+        self.threaded_entered = 0
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def enter_memory_scope(self, stage) -> bool:
+        """Note a stage starting; True if its memory can be measured."""
+        with self.lock:
+            if threading.current_thread() is not threading.main_thread():
+                self.threaded_open += 1
+                self.threaded_entered += 1
+                stage.threaded = True
+                return False
+            stage.threaded = False
+            stage.threaded_seen = self.threaded_entered
+            return self.threaded_open == 0
+
+    def exit_memory_scope(self, stage) -> bool:
+        """Note a stage ending; True if no other thread's stage ran during it."""
+        with self.lock:
+            if stage.threaded:
+                self.threaded_open -= 1
+                return False
+            return stage.measure and stage.threaded_seen == self.threaded_entered
+
+    def record(self, name, start, end, args):
+        event = {
+            "name": name,
+            "start_us": round((start - self.origin) * 1e6, 1),
+            "dur_us": round((end - start) * 1e6, 1),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def write(self):
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        pid = os.getpid()
+        with open(self.path, "w") as f:
+            if self.fmt == "jsonl":
+                for e in self.events:
+                    f.write(json.dumps({"stage": e["name"], "wall_s": round(e["dur_us"] / 1e6, 6),
+                                        "start_s": round(e["start_us"] / 1e6, 6), "tid": e["tid"], **e["args"]}) + "\n")
+            else:
+                json.dump({"traceEvents": [
+                    {"name": e["name"], "ph": "X", "ts": e["start_us"], "dur": e["dur_us"],
+                     "pid": pid, "tid": e["tid"], "args": e["args"]}
+                    for e in self.events
+                ], "displayTimeUnit": "ms"}, f)
+
+
+def stage(name: str, **attrs):
+    """Context manager timing one stage; a shared no-op when tracing is off."""
+    trace = _ACTIVE
+    if trace is None:
+        return _NULL_STAGE
+    return _Stage(trace, name, attrs)
+
+
+def add(**counters):
+    """
+    Add counters (e.g. bytes_read=..., rows=...) to the innermost stage of
+    the calling thread. Does nothing when tracing is off.
+    """
+    trace = _ACTIVE
+    if trace is None:
+        return
+    stack = trace.stack()
+    if not stack:
+        return
+    args = stack[-1].args
+    for key, value in counters.items():
+        args[key] = args.get(key, 0) + value
+
+
+def enabled() -> bool:
+    return _ACTIVE is not None
+
+
+def start(path: str, fmt=None, memory=True):
+    """
+    Begin collecting stages into path. fmt is "chrome" or "jsonl" (default:
+    from the extension). memory=True also records peak traced memory per
+    stage, which costs some speed while tracing. Stages on worker threads,
+    and main-thread stages they overlap, get no peak_mem_bytes.
+    RuntimeError if a trace is already running.
+    """
+    global _ACTIVE
+    if _ACTIVE is not None:
+        raise RuntimeError(f"A trace to {_ACTIVE.path} is already running; call finish() first.")
+    path = os.path.expanduser(path)
+    if fmt is None:
+        fmt = "jsonl" if path.endswith(".jsonl") else "chrome"
+    if fmt not in TRACE_FORMATS:
+        raise ValueError(f"Unknown trace format {fmt!r}; use one of {TRACE_FORMATS}.")
+    owns_tracemalloc = False
+    if memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            owns_tracemalloc = True
+    _ACTIVE = _Trace(path, fmt, memory, owns_tracemalloc)
+
+
+def start_from_config(trace_cfg=None) -> bool:
+    """
+    Start tracing if COMP333_TRACE is set or the run config has a "trace"
+    section ({"path": ..., "format": ..., "memory": ...}); the environment
+    variable wins. Returns True if tracing was started.
+    """
+    env_path = os.environ.get(TRACE_ENV)
+    if env_path:
+        start(env_path)
+        return True
+    if trace_cfg and trace_cfg.get("path"):
+        start(trace_cfg["path"], trace_cfg.get("format"), trace_cfg.get("memory", True))
+        return True
+    return False
+
+
+def finish():
+    """Stop tracing and write the collected stages. Returns the trace path."""
+    global _ACTIVE
+    trace = _ACTIVE
+    if trace is None:
+        return None
+    _ACTIVE = None
+    if trace.owns_tracemalloc:
+        import tracemalloc
+        tracemalloc.stop()
+    try:
+        import resource
+        trace.events.append({
+            "name": "process", "start_us": 0.0,
+            "dur_us": round((time.perf_counter() - trace.origin) * 1e6, 1),
+            "tid": threading.get_ident(),
+            "args": {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss},
+        })
+    except ImportError:  # not available on Windows
+        pass
+    trace.write()
+    print(f"[INFO] Trace written to {trace.path}")
+    return trace.path
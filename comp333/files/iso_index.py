@@ -0,0 +1,206 @@
+import json
+import os
+import numpy as np
+from . import instrument
+from .grid_cache import GRID_CACHE
+from .mist_reader import (
+    ISO_BLOCK_MARKER as BLOCK_MARKER,
+    ISO_LOG_AGE,
+    ISO_LOG_L,
+    ISO_LOG_TEFF,
+    column_indices,
+    parse_rows,
+)
+
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 2  # 2: records the block column names
+
+# Rows parsed at a time when streaming a block; bounds the text held in memory
+STREAM_CHUNK_ROWS = 256
+
+# In-process memo so repeated lookups skip the JSON read; parsed blocks
+# live in GRID_CACHE under ("iso_block", ...) keys.
+_INDEX_MEMO = {}
+
+
+def _index_path(iso_path: str) -> str:
+    return iso_path + INDEX_SUFFIX
+
+
+def _source_signature(iso_path: str) -> dict:
+    st = os.stat(iso_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def build_iso_index(iso_path: str) -> dict:
+    """
+    Scan an .iso.cmd file once and record, for every log-age block, the byte
+    offset of its first data row and its row count.
+
+    Each block in a MIST isochrone file looks like:
+      # number of EEPs, cols =   1449    84
+      #    1   2   3 ...
+      #  EEP log10_isochrone_age_yr ...
+      <rows>
+    Only the first row of each block is split; the rest are skipped unread.
+    """
+    blocks = []
+    names = []
+    with instrument.stage("iso.index_build", file=os.path.basename(iso_path)), open(iso_path, "rb") as f:
+        pending_rows = None
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if line.startswith(BLOCK_MARKER):
+                pending_rows = int(line.split(b"=", 1)[1].split()[0])
+                f.readline()  # column numbers
+                names = f.readline().decode("ascii").lstrip("#").split()
+                continue
+            if pending_rows is None or line.startswith(b"#") or not line.strip():
+                continue
+
+            age = float(line.split()[1])
+            blocks.append({"age": age, "offset": offset, "rows": pending_rows})
+            for _ in range(pending_rows - 1):
+                f.readline()
+            pending_rows = None
+
+    return {
+        "version": INDEX_VERSION,
+        "source": _source_signature(iso_path),
+        "columns": names,
+        "ages": sorted({b["age"] for b in blocks}),
+        "blocks": blocks,
+    }
+
+
+def load_iso_index(iso_path: str) -> dict:
+    """
+    Return the block index for an .iso.cmd file, building and saving it next
+    to the file (<name>.iso.cmd.idx.json) if it is missing or stale.
+    """
+    signature = _source_signature(iso_path)
+    memo = _INDEX_MEMO.get(iso_path)
+    if memo is not None and memo["source"] == signature:
+        return memo
+
+    index = None
+    try:
+        with open(_index_path(iso_path), "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if index is None or index.get("version") != INDEX_VERSION or index.get("source") != signature:
+        index = build_iso_index(iso_path)
+        try:
+            with open(_index_path(iso_path), "w") as f:
+                json.dump(index, f)
+        except OSError as e:
+            # Read-only data directory: keep the index in memory for this run.
+            print(f"[WARN] Could not save isochrone index: {e}")
+
+    _INDEX_MEMO[iso_path] = index
+    return index
+
+
+def nearest_age(index: dict, age: float) -> float:
+    """Closest log-age available in the indexed file."""
+    ages = np.asarray(index["ages"])
+    if ages.size == 0:
+        raise ValueError("Isochrone index contains no age blocks.")
+    return float(ages[np.argmin(np.abs(ages - age))])
+
+
+def _stream_block(f, block, usecols, keep=None, chunk_rows=None) -> np.ndarray:
+    """
+    Parse one indexed block chunk_rows lines at a time. keep(table) -> bool
+    mask drops rows as they are read, so only the kept rows are ever held.
+    """
+    chunk_rows = chunk_rows or STREAM_CHUNK_ROWS
+    f.seek(block["offset"])
+    parts = []
+    remaining = block["rows"]
+    n_bytes = 0
+    while remaining > 0:
+        lines = [f.readline() for _ in range(min(chunk_rows, remaining))]
+        remaining -= len(lines)
+        n_bytes += sum(map(len, lines))
+        table = parse_rows(lines, usecols=usecols)
+        if keep is not None:
+            table = table[keep(table)]
+        if len(table):
+            parts.append(table)
+    instrument.add(bytes_read=n_bytes, rows=block["rows"])
+    if not parts:
+        return np.empty((0, len(usecols)))
+    return np.concatenate(parts)
+
+
+def _bbox_filter(bbox, ix, iy):
+    x_lo, x_hi, y_lo, y_hi = bbox
+
+    def keep(table):
+        x, y = table[:, ix], table[:, iy]
+        return (x >= x_lo) & (x <= x_hi) & (y >= y_lo) & (y <= y_hi)
+    return keep
+
+
+def read_iso_block(iso_path: str, age: float, columns=(ISO_LOG_AGE, ISO_LOG_TEFF, ISO_LOG_L)):
+    """
+    Read only the block nearest to the requested log-age, converting only
+    the requested MIST columns (by header name, e.g. "log_Teff").
+    Returns (chosen_age, {name: float64 array}).
+    """
+    return select_iso_blocks(iso_path, [age], columns)[0]
+
+
+def select_iso_blocks(iso_path: str, ages, columns=(ISO_LOG_TEFF, ISO_LOG_L), bbox=None) -> list:
+    """
+    Stream the blocks nearest to each requested log-age in one pass over
+    the file. With bbox = (Teff_min, Teff_max, L_min, L_max) in log units,
+    rows outside the box are dropped while reading, so memory depends only
+    on what is kept, not on the file or block size.
+    Returns [(chosen_age, {name: float64 array}), ...] in the order of ages.
+    """
+    index = load_iso_index(iso_path)
+    columns = tuple(columns)
+    bbox = None if bbox is None else tuple(float(v) for v in bbox)
+    chosen_ages = [nearest_age(index, age) for age in ages]
+
+    # Clipping needs log_Teff/log_L even if the caller did not ask for them
+    read_columns = columns
+    if bbox is not None:
+        read_columns += tuple(c for c in (ISO_LOG_TEFF, ISO_LOG_L) if c not in columns)
+    usecols = column_indices(index["columns"], read_columns)
+    keep = None
+    if bbox is not None:
+        keep = _bbox_filter(bbox, read_columns.index(ISO_LOG_TEFF), read_columns.index(ISO_LOG_L))
+
+    tables = {}
+    missing = []
+    for chosen in dict.fromkeys(chosen_ages):
+        key = ("iso_block", iso_path, index["source"]["mtime_ns"], chosen, columns, bbox)
+        table = GRID_CACHE.get(key)
+        if table is None:
+            missing.append((chosen, key))
+        else:
+            tables[chosen] = table
+
+    if missing:
+        blocks = {b["age"]: b for b in index["blocks"]}
+        with open(iso_path, "rb") as f:
+            # Visit blocks in file order so the pass only ever seeks forward
+            for chosen, key in sorted(missing, key=lambda m: blocks[m[0]]["offset"]):
+                table = _stream_block(f, blocks[chosen], usecols, keep)
+                if len(read_columns) > len(columns):
+                    table = table[:, :len(columns)].copy()  # drop clip-only columns
+                GRID_CACHE[key] = table
+                tables[chosen] = table
+
+    return [
+        (chosen, {name: tables[chosen][:, i] for i, name in enumerate(columns)})
+        for chosen in chosen_ages
+    ]
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+from .eep_grid import load_eep_grid
+from .manifest import eep_mass_codes, find_eep_dir
+from .mist_reader import LOG_L, LOG_TEFF, STAR_AGE
+from .selective_extract import ensure_eep_members
+
+SYNTH_COLUMNS = (STAR_AGE, LOG_L, LOG_TEFF)
+
+# Ages handled per vectorized step; bounds the (ages x masses x EEPs) work array
+AGE_CHUNK = 16
+
+
+def synthesize_isochrones(grid, log_ages, columns=(LOG_TEFF, LOG_L)) -> list:
+    """
+    Build isochrones at arbitrary log10(age/yr) directly from an EepGrid.
+
+    At every EEP the track ages decrease with mass, so for a target age the
+    star on the isochrone lies between the two neighbouring tracks whose
+    ages at that EEP bracket it. The blend weight is found in log age and
+    applied to mass and every requested column, for all ages and EEPs in
+    one vectorized pass.
+
+    Returns one dict per age: {"log_age", "eep", "initial_mass", <columns>},
+    holding only the EEPs that some pair of tracks brackets.
+    """
+    if len(grid.masses) < 2:
+        raise ValueError("At least two mass tracks are needed to synthesize an isochrone.")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        track_log_age = np.log10(grid[STAR_AGE])
+    older = track_log_age[:-1]    # lower mass of each neighbouring pair
+    younger = track_log_age[1:]   # higher mass of each neighbouring pair
+    eeps = np.arange(1, grid.n_eep + 1)
+
+    log_ages = np.atleast_1d(np.asarray(log_ages, dtype=np.float64))
+    out = []
+    for start in range(0, len(log_ages), AGE_CHUNK):
+        tau = log_ages[start:start + AGE_CHUNK, None, None]
+
+        # crossing[k, i, j]: age k falls between tracks i and i+1 at EEP j.
+        # NaN padding compares False, so missing EEPs never bracket.
+        crossing = (older >= tau) & (younger < tau)
+        found = crossing.any(axis=1)
+        pair = crossing.argmax(axis=1)  # lowest-mass bracketing pair
+
+        cols = np.broadcast_to(np.arange(grid.n_eep), pair.shape)
+        a_lo = older[pair, cols]
+        a_hi = younger[pair, cols]
+        # Unbracketed (age, EEP) cells blend NaNs; they are dropped below
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = (a_lo - tau[:, :, 0]) / (a_lo - a_hi)
+            blended = {
+                "initial_mass": grid.masses[pair] * (1.0 - w) + grid.masses[pair + 1] * w,
+            }
+            for name in columns:
+                arr = grid[name]
+                blended[name] = arr[pair, cols] * (1.0 - w) + arr[pair + 1, cols] * w
+
+        for k in range(tau.shape[0]):
+            keep = found[k]
+            iso = {"log_age": float(tau[k, 0, 0]), "eep": eeps[keep]}
+            for name, values in blended.items():
+                iso[name] = values[k][keep]
+            out.append(iso)
+    return out
+
+
+def load_synth_grid(download_dir: str, feh: float, vcrit: float):
+    """Every track of the installed EEPS grid for feh + vcrit, as an EepGrid."""
+    download_dir = os.path.expanduser(download_dir)
+    eep_dir = find_eep_dir(download_dir, feh=float(feh), vcrit=float(vcrit))
+    if eep_dir is None:
+        raise RuntimeError(
+            f"No EEPS grid installed for [Fe/H]={float(feh):+.2f}, vcrit={float(vcrit):.1f}; "
+            f"iso_source \"tracks\" needs it. Run eep_download first."
+        )
+    ensure_eep_members(eep_dir)  # synthesis needs every mass
+    return load_eep_grid(eep_dir, columns=SYNTH_COLUMNS, codes=eep_mass_codes(eep_dir))
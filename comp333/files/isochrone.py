@@ -1,8 +1,15 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from astropy.io import ascii
+from . import instrument
+from .config_utils import load_config
+from .iso_index import select_iso_blocks
+from .feh_interp import blend_isochrones, bracket_feh
+from .layer_cache import cached_layers, eep_grid_signature, path_signature
+from .mist_reader import ISO_EEP, ISO_LOG_L, ISO_LOG_TEFF
+from .selective_extract import ensure_iso_member
+from . import manifest
+
+ISO_SOURCES = ("grid", "tracks")
 
 
 def _feh_to_code(feh: float) -> str:
@@ -20,80 +27,109 @@ def _find_iso_file(iso_dir: str, feh: float, vcrit: float) -> str:
     Example filename:
       MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.0_UBVRIplus.iso.cmd
     """
+    download_dir = os.path.abspath(os.path.expanduser(load_config()["DOWNLOAD_DIR"]))
+    if os.path.dirname(os.path.abspath(iso_dir)) == download_dir:
+        # Installed grid: answer from the manifest without touching the directory
+        path = manifest.find_iso_file(iso_dir, feh=float(feh), vcrit=float(vcrit))
+        if path is not None:
+            return path
+
     feh_code = _feh_to_code(float(feh))
     vv = _vcrit_to_code(float(vcrit))
     target = f"MIST_v1.2_feh_{feh_code}_afe_p0.0_vvcrit{vv}_UBVRIplus.iso.cmd"
     path = os.path.join(iso_dir, target)
     if os.path.isfile(path):
         return path
+    # A selectively extracted grid may still hold the file in its kept archive
+    if ensure_iso_member(iso_dir, float(feh)) and os.path.isfile(path):
+        return path
 
-    # fallback: try any iso.cmd if exact match missing
-    files = sorted(f for f in os.listdir(iso_dir) if f.endswith(".iso.cmd"))
-    if not files:
-        raise ValueError(f"No .iso.cmd files found in: {iso_dir}")
-    return os.path.join(iso_dir, files[0])
-
-
-def plt_iso(iso_cfg, eep_bounds, points):
-    iso_dir = os.path.expanduser(iso_cfg["iso_directory"])
-    age_min = float(iso_cfg["age_min"])
-    age_max = float(iso_cfg["age_max"])
-
-    feh_list = iso_cfg.get("feh_list", None)
-    if feh_list is None:
-        feh_list = [0.0]
-    if not isinstance(feh_list, list):
-        feh_list = [feh_list]
-
-    vcrit = float(iso_cfg.get("vcrit", 0.0))
-
-    if not os.path.isdir(iso_dir):
-        raise ValueError(f"Isochrone directory not found: {iso_dir}")
-
-    # Plot bounds from EEPs
-    xmin, xmax = min(eep_bounds["x"]), max(eep_bounds["x"])
-    ymin, ymax = min(eep_bounds["y"]), max(eep_bounds["y"])
-
-    used_T = []
-    used_L = []
-
-    # --- Isochrones for each metallicity ---
-    for feh in feh_list:
-        iso_path = _find_iso_file(iso_dir, feh=float(feh), vcrit=vcrit)
-        data = ascii.read(iso_path)
-
-        ages = np.array(data["col2"])
-        logT = np.array(data["col5"])
-        logL = np.array(data["col7"])
-
-        for age in [age_min, age_max]:
-            unique_ages = np.unique(ages)
-            chosen = unique_ages[np.argmin(np.abs(unique_ages - age))]
-            m = (ages == chosen)
-
-            T = logT[m]
-            L = logL[m]
-
-            # clip to EEP overlap region (keeps plot readable and scientifically relevant)
-            mask = (T >= xmin) & (T <= xmax) & (L >= ymin) & (L <= ymax)
-            if np.count_nonzero(mask) < 5:
-                continue
-
-            Tm = T[mask]
-            Lm = L[mask]
-
-            feh_tag = f"[Fe/H]={float(feh):+.2f}"
-            plt.plot(
-                Tm, Lm,
-                "--", lw=1.6, alpha=0.85,
-                label=f"Iso log(age)={chosen:.2f} ({feh_tag})"
-            )
+    # Never substitute another metallicity's file
+    raise ValueError(f"No isochrone file for [Fe/H]={float(feh):+.2f}, vcrit={float(vcrit):.1f} in: {iso_dir}")
 
-            used_T.append(Tm)
-            used_L.append(Lm)
 
-    # --- Flexible observational constraints ---
-    ax = plt.gca()
+def _iso_curves(iso_cfg, iso_source, iso_dir, feh, vcrit, ages, bbox=None):
+    """
+    Yield (log age, logT, logL) for each requested age at one metallicity.
+    Off-grid [Fe/H] blends the isochrones of the two bracketing grids on
+    matching EEPs. bbox = (Teff_min, Teff_max, L_min, L_max) lets isochrone
+    files drop rows outside the plot while they are read.
+    """
+    lo, hi, weight = bracket_feh(feh)
+    if weight == 0.0:
+        for age, _, T, L in _grid_iso_curves(iso_cfg, iso_source, iso_dir, lo, vcrit, ages, bbox):
+            yield age, T, L
+        return
+
+    # Rows stay unclipped until both grids are aligned on EEP
+    lower = _grid_iso_curves(iso_cfg, iso_source, iso_dir, lo, vcrit, ages, None)
+    upper = _grid_iso_curves(iso_cfg, iso_source, iso_dir, hi, vcrit, ages, None)
+    for (age, eep_lo, T_lo, L_lo), (_, eep_hi, T_hi, L_hi) in zip(list(lower), list(upper)):
+        iso = blend_isochrones(
+            {"eep": eep_lo, "T": T_lo, "L": L_lo}, {"eep": eep_hi, "T": T_hi, "L": L_hi}, weight, "eep"
+        )
+        yield age, iso["T"], iso["L"]
+
+
+def _grid_iso_curves(iso_cfg, iso_source, iso_dir, feh, vcrit, ages, bbox):
+    """Yield (log age, EEP, logT, logL) per age from the grid at exactly feh."""
+    if iso_source == "tracks":
+        from .iso_synth import load_synth_grid, synthesize_isochrones
+        from .mist_reader import LOG_L, LOG_TEFF
+
+        # EEPS grids may use a different vcrit than the isochrone download
+        eep_vcrit = float(iso_cfg.get("eep_vcrit", vcrit))
+        grid = load_synth_grid(load_config()["DOWNLOAD_DIR"], feh, eep_vcrit)
+        with instrument.stage("iso.synthesize", feh=feh, ages=len(ages)):
+            isos = synthesize_isochrones(grid, ages)
+        for iso in isos:
+            yield iso["log_age"], iso["eep"], iso[LOG_TEFF], iso[LOG_L]
+        return
+
+    iso_path = _find_iso_file(iso_dir, feh=feh, vcrit=vcrit)
+    # Seek straight to the nearest age blocks via the on-disk index and
+    # stream them in chunks, keeping only rows inside bbox
+    with instrument.stage("iso.read_block", feh=feh, ages=len(ages)):
+        blocks = select_iso_blocks(iso_path, ages, columns=(ISO_EEP, ISO_LOG_TEFF, ISO_LOG_L), bbox=bbox)
+    for chosen, block in blocks:
+        yield chosen, block[ISO_EEP], block[ISO_LOG_TEFF], block[ISO_LOG_L]
+
+
+def _iso_layer(iso_cfg, iso_source, iso_dir, feh, vcrit, ages, bbox) -> list:
+    """(log age, logT, logL) per age for one metallicity, clipped to bbox."""
+    xmin, xmax, ymin, ymax = bbox
+    layer = []
+    for chosen, T, L in _iso_curves(iso_cfg, iso_source, iso_dir, feh, vcrit, ages, bbox=bbox):
+        # clip to EEP overlap region (keeps plot readable and scientifically relevant)
+        mask = (T >= xmin) & (T <= xmax) & (L >= ymin) & (L <= ymax)
+        if np.count_nonzero(mask) >= 5:
+            layer.append((chosen, T[mask], L[mask]))
+    return layer
+
+
+def _source_signature(iso_cfg, iso_source, iso_dir, feh, vcrit) -> list:
+    """mtime/size of the files the isochrones for feh are read from."""
+    fehs = sorted(set(bracket_feh(feh)[:2]))
+    if iso_source == "tracks":
+        download_dir = load_config()["DOWNLOAD_DIR"]
+        eep_vcrit = float(iso_cfg.get("eep_vcrit", vcrit))
+        dirs = [manifest.find_eep_dir(download_dir, feh=f, vcrit=eep_vcrit) for f in fehs]
+        return [eep_vcrit] + eep_grid_signature(dirs)  # synthesis reads every track
+    paths = []
+    for f in fehs:
+        try:
+            paths.append(_find_iso_file(iso_dir, feh=f, vcrit=vcrit))
+        except ValueError:
+            paths.append(None)  # reported when the layer is computed
+    return path_signature(*paths)
+
+
+def draw_constraints(ax, points):
+    """
+    Draw the flexible observational constraints from run_config "points" on ax.
+    Returns (point_x_vals, point_y_vals, extra_x_extents, extra_y_extents)
+    for the bounds computed by plt_iso.
+    """
     point_x_vals = []
     point_y_vals = []
     extra_x_extents = []
@@ -128,7 +164,7 @@ def plt_iso(iso_cfg, eep_bounds, points):
         if "x" in p and "y" in p:
             x = float(p["x"])
             y = float(p["y"])
-            plt.errorbar(
+            ax.errorbar(
                 x, y,
                 xerr=p.get("x_err"),
                 yerr=p.get("y_err"),
@@ -143,7 +179,7 @@ def plt_iso(iso_cfg, eep_bounds, points):
             x = float(p["x"])
             ymid = 0.5 * (y0 + y1)
             yerr = [[ymid - y0], [y1 - ymid]]
-            plt.errorbar(
+            ax.errorbar(
                 x, ymid,
                 xerr=p.get("x_err"),
                 yerr=yerr,
@@ -158,7 +194,7 @@ def plt_iso(iso_cfg, eep_bounds, points):
             y = float(p["y"])
             xmid = 0.5 * (x0 + x1)
             xerr = [[xmid - x0], [x1 - xmid]]
-            plt.errorbar(
+            ax.errorbar(
                 xmid, y,
                 xerr=xerr,
                 yerr=p.get("y_err"),
@@ -190,6 +226,7 @@ def plt_iso(iso_cfg, eep_bounds, points):
 
         # Case 8: x_range + y_range -> shaded rectangle region
         elif x_range is not None and y_range is not None and "x" not in p and "y" not in p:
+            from matplotlib.patches import Rectangle
             rect = Rectangle(
                 (x0, y0),
                 width=(x1 - x0),
@@ -203,26 +240,112 @@ def plt_iso(iso_cfg, eep_bounds, points):
         else:
             print(f"[WARN] Skipping unsupported point specification: {p}")
 
+    return point_x_vals, point_y_vals, extra_x_extents, extra_y_extents
+
+
+def _catalog_list(catalog) -> list:
+    """Run config "catalog": a path, {"path", "label", "color"}, or a list of those."""
+    if not catalog:
+        return []
+    items = catalog if isinstance(catalog, list) else [catalog]
+    return [{"path": c} if isinstance(c, str) else c for c in items]
+
+
+def plt_iso(iso_cfg, eep_bounds, points, ax=None, catalog=None):
+    """
+    Plot isochrones for each metallicity plus the observational constraints
+    (run config "points" and any "catalog" files) on ax (defaults to the
+    current pyplot axes). iso_cfg["workers"] > 1 computes uncached
+    metallicities in a process pool; drawing order follows feh_list.
+    Returns the x/y extents of everything drawn.
+    """
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+
+    iso_dir = os.path.expanduser(iso_cfg.get("iso_directory", ""))
+    age_min = float(iso_cfg["age_min"])
+    age_max = float(iso_cfg["age_max"])
+
+    feh_list = iso_cfg.get("feh_list", None)
+    if feh_list is None:
+        feh_list = [0.0]
+    if not isinstance(feh_list, list):
+        feh_list = [feh_list]
+
+    vcrit = float(iso_cfg.get("vcrit", 0.0))
+
+    # "grid" reads the downloaded .iso.cmd files (ages snap to the grid);
+    # "tracks" synthesizes isochrones at the exact ages from the EEPS grid.
+    iso_source = iso_cfg.get("iso_source", "grid")
+    if iso_source not in ISO_SOURCES:
+        raise ValueError(f"iso_source must be one of {ISO_SOURCES}, got {iso_source!r}")
+
+    if iso_source == "grid" and not os.path.isdir(iso_dir):
+        raise ValueError(f"Isochrone directory not found: {iso_dir}")
+
+    # Plot bounds from EEPs
+    xmin, xmax = min(eep_bounds["x"]), max(eep_bounds["x"])
+    ymin, ymax = min(eep_bounds["y"]), max(eep_bounds["y"])
+
+    used_T = []
+    used_L = []
+
+    # --- Isochrones for each metallicity ---
+    bbox = (float(xmin), float(xmax), float(ymin), float(ymax))
+
+    jobs = []
+    for feh in feh_list:
+        # Curves are reused across runs until these settings or the source files change
+        inputs = {
+            "source": iso_source, "feh": float(feh), "vcrit": vcrit, "ages": [age_min, age_max],
+            "bbox": bbox, "sources": _source_signature(iso_cfg, iso_source, iso_dir, float(feh), vcrit),
+        }
+        jobs.append((inputs, (iso_cfg, iso_source, iso_dir, float(feh), vcrit, [age_min, age_max], bbox)))
+
+    # Uncached metallicities are read in parallel with "workers" > 1
+    workers = int(iso_cfg.get("workers", 1))
+    with instrument.stage("iso.layers", fehs=len(jobs), workers=workers):
+        layers = cached_layers("iso", jobs, _iso_layer, workers=workers)
+
+    for feh, layer in zip(feh_list, layers):
+        for chosen, Tm, Lm in layer:
+            chosen = float(chosen)
+            feh_tag = f"[Fe/H]={float(feh):+.2f}"
+            ax.plot(
+                Tm, Lm,
+                "--", lw=1.6, alpha=0.85,
+                label=f"Iso log(age)={chosen:.2f} ({feh_tag})"
+            )
+
+            used_T.append(Tm)
+            used_L.append(Lm)
+
+    # --- Flexible observational constraints ---
+    with instrument.stage("constraints", points=len(points)):
+        extents = [tuple(np.asarray(v, dtype=np.float64) for v in draw_constraints(ax, points))]
+
+    # --- Star catalogs: one collection per constraint category ---
+    for cat_cfg in _catalog_list(catalog):
+        from .catalog import draw_catalog, load_catalog
+
+        with instrument.stage("catalog", path=cat_cfg["path"]):
+            cat = load_catalog(cat_cfg["path"])
+            instrument.add(stars=len(cat["x"]))
+            extents.append(draw_catalog(
+                ax, cat,
+                label=cat_cfg.get("label", os.path.splitext(os.path.basename(cat_cfg["path"]))[0]),
+                color=cat_cfg.get("color", "k"),
+            ))
+
     # Bounds returned for master scaling if desired
-    all_x_parts = []
-    all_y_parts = []
-
-    if used_T:
-        all_x_parts.append(np.concatenate(used_T))
-    if point_x_vals:
-        all_x_parts.append(np.array(point_x_vals))
-    if extra_x_extents:
-        all_x_parts.append(np.array(extra_x_extents))
-
-    if used_L:
-        all_y_parts.append(np.concatenate(used_L))
-    if point_y_vals:
-        all_y_parts.append(np.array(point_y_vals))
-    if extra_y_extents:
-        all_y_parts.append(np.array(extra_y_extents))
-
-    all_x = np.concatenate(all_x_parts) if all_x_parts else np.array([xmin, xmax])
-    all_y = np.concatenate(all_y_parts) if all_y_parts else np.array([ymin, ymax])
+    point_x, point_y, extra_x, extra_y = (np.concatenate(parts) for parts in zip(*extents))
+    all_x = np.concatenate(used_T + [point_x, extra_x])
+    all_y = np.concatenate(used_L + [point_y, extra_y])
+    if all_x.size == 0:
+        all_x = np.array([xmin, xmax])
+    if all_y.size == 0:
+        all_y = np.array([ymin, ymax])
 
     return {
         "x": all_x,
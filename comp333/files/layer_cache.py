@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import instrument
+from .config_utils import load_config
+from .grid_cache import GRID_CACHE
+
+# Computed plot layers (the curves one metallicity contributes to a figure)
+# keyed by a hash of everything they depend on: the layer's settings plus
+# the mtime/size of the grid files it reads. Layers are kept in GRID_CACHE
+# and as small .npz files under DOWNLOAD_DIR/.layer_cache, so a re-run that
+# only changes a title or a constraint skips loading and interpolation.
+
+LAYER_DIRNAME = ".layer_cache"
+LAYER_VERSION = 1  # bump when the computation behind a layer changes
+MAX_LAYER_FILES = 512
+
+
+def path_signature(*paths) -> list:
+    """[path, mtime_ns, size] per path (None entries for missing paths)."""
+    out = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            out.append([path, st.st_mtime_ns, st.st_size])
+        except (OSError, TypeError):
+            out.append(None)
+    return out
+
+
+def eep_grid_signature(eep_dirs, mass_range=None) -> list:
+    """
+    path_signature of EEPS directories, their packs and every text track a
+    layer over mass_range (None: all masses) reads. Tracks edited in place
+    leave the directory mtime alone, so they are listed one by one.
+    """
+    from .grid_pack import pack_path
+    from .manifest import eep_mass_codes
+    from .selective_extract import bracket_codes
+
+    paths = []
+    for eep_dir in eep_dirs:
+        paths.extend([eep_dir, eep_dir and pack_path(eep_dir)])
+        if eep_dir:
+            paths.extend(os.path.join(eep_dir, f"{code}M.track.eep")
+                         for code in bracket_codes(eep_mass_codes(eep_dir), mass_range))
+    return path_signature(*paths)
+
+
+def layer_key(kind: str, inputs: dict) -> str:
+    payload = json.dumps({"kind": kind, "version": LAYER_VERSION, "inputs": inputs}, sort_keys=True, default=str)
+    return f"{kind}-{hashlib.sha1(payload.encode()).hexdigest()}"
+
+
+def _layer_dir() -> str:
+    return os.path.join(os.path.expanduser(load_config()["DOWNLOAD_DIR"]), LAYER_DIRNAME)
+
+
+def _to_arrays(items) -> dict:
+    return {f"{i}_{j}": np.asarray(value) for i, item in enumerate(items) for j, value in enumerate(item)}
+
+
+def _from_arrays(arrays) -> list:
+    items = {}
+    for name in arrays.files:
+        i, j = (int(part) for part in name.split("_"))
+        items.setdefault(i, {})[j] = arrays[name]
+    return [tuple(fields[j] for j in sorted(fields)) for _, fields in sorted(items.items())]
+
+
+def _prune(layer_dir):
+    names = [n for n in os.listdir(layer_dir) if n.endswith(".npz")]
+    if len(names) <= MAX_LAYER_FILES:
+        return
+    paths = sorted((os.path.join(layer_dir, n) for n in names), key=os.path.getmtime)
+    for path in paths[:len(paths) - MAX_LAYER_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _load_layer(key):
+    items = GRID_CACHE.get(("layer", key))
+    if items is not None:
+        return items
+    try:
+        with np.load(os.path.join(_layer_dir(), key + ".npz")) as arrays:
+            items = _from_arrays(arrays)
+    except (OSError, ValueError):
+        return None
+    instrument.add(layer_hits=1)
+    GRID_CACHE[("layer", key)] = items
+    return items
+
+
+def _save_layer(key, items):
+    instrument.add(layer_misses=1)
+    GRID_CACHE[("layer", key)] = items
+    path = os.path.join(_layer_dir(), key + ".npz")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, **_to_arrays(items))
+        os.replace(tmp_path, path)
+        _prune(os.path.dirname(path))
+    except OSError as e:
+        # Read-only data directory: keep the layer in memory only
+        print(f"[WARN] Could not save plot layer: {e}")
+
+
+def cached_layer(kind: str, inputs: dict, compute) -> list:
+    """
+    Return compute() -> list of tuples of arrays/scalars, reusing an earlier
+    result for the same kind and inputs from memory or disk.
+    """
+    key = layer_key(kind, inputs)
+    items = _load_layer(key)
+    if items is None:
+        items = compute()
+        _save_layer(key, items)
+    return items
+
+
+def cached_layers(kind: str, jobs, compute, workers=1) -> list:
+    """
+    Layers for jobs = [(inputs, args), ...], in jobs order. Cache misses
+    run compute(*args); with workers > 1 they run in a process pool and
+    only the finished arrays come back (compute must then be a
+    module-level function). Returns a list of layers.
+    """
+    keys = [layer_key(kind, inputs) for inputs, _ in jobs]
+    layers = [_load_layer(key) for key in keys]
+    missing = [i for i, layer in enumerate(layers) if layer is None]
+
+    workers = max(1, min(int(workers), len(missing)))
+    computed = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map keeps jobs order, so legend entries do not depend on which worker finishes first
+                computed = list(pool.map(compute, *zip(*(jobs[i][1] for i in missing))))
+        except (OSError, NotImplementedError) as e:
+            print(f"[WARN] Could not start {workers} layer workers ({e}); computing serially.")
+    if computed is None:
+        computed = [compute(*jobs[i][1]) for i in missing]
+
+    for i, items in zip(missing, computed):
+        _save_layer(keys[i], items)
+        layers[i] = items
+    return layers
@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import sys
+import threading
+from . import instrument
+from .config_utils import load_config
+from .download_engine import is_archive_file
+
+MANIFEST_FILE = "mist_manifest.json"
+MANIFEST_VERSION = 1
+PACK_FILE = "eeps_pack.npz"  # written by grid_pack into packed EEPS directories
+
+EEPS_DIR_RE = re.compile(r"^MIST_v1\.2_feh_([pm])(\d+\.\d+)_afe_p0\.0_vvcrit(\d\.\d)_EEPS$")
+ISO_DIR_RE = re.compile(r"^MIST_v1\.2_vvcrit(\d\.\d)_UBVRIplus$")
+ISO_FILE_RE = re.compile(r"^MIST_v1\.2_feh_([pm])(\d+\.\d+)_afe_p0\.0_vvcrit(\d\.\d)_UBVRIplus\.iso\.cmd$")
+
+# download_dir -> manifest dict; validated against directory mtimes on every use
+_MEMO = {}
+_LOCK = threading.RLock()
+
+
+def _feh_key(feh: float) -> str:
+    sign = "p" if feh >= 0 else "m"
+    return f"{sign}{abs(float(feh)):.2f}"
+
+
+def _mtime_ns(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+
+def _is_data_entry(name: str) -> bool:
+    """Hidden staging dirs, manifests and tarballs are not installed data."""
+    return not (name.startswith(".") or name == MANIFEST_FILE or is_archive_file(name))
+
+
+def _scan_grid(download_dir: str, name: str):
+    """Describe one top-level entry of DOWNLOAD_DIR, or None if it is not a grid."""
+    path = os.path.join(download_dir, name)
+    eeps = EEPS_DIR_RE.match(name)
+    iso = ISO_DIR_RE.match(name)
+    if not (eeps or iso) or not os.path.isdir(path):
+        return None
+
+    entry = {"path": path, "mtime_ns": _mtime_ns(path)}
+    if eeps:
+        sign, value, vcrit = eeps.groups()
+        entry.update({
+            "kind": "eeps",
+            "feh": float(value) * (-1.0 if sign == "m" else 1.0),
+            "vcrit": float(vcrit),
+        })
+    else:
+        entry.update({"kind": "iso", "vcrit": float(iso.group(1))})
+    _rescan_contents(entry)
+    return entry
+
+
+def _rescan_contents(entry: dict):
+    """Refresh the per-grid file list: mass codes for EEPS, iso files by [Fe/H]."""
+    names = os.listdir(entry["path"])
+    entry["mtime_ns"] = _mtime_ns(entry["path"])
+    if entry["kind"] == "eeps":
+        codes = {n[:5] for n in names if n.endswith(".track.eep")}
+        if PACK_FILE in names:
+            from .grid_pack import pack_codes  # needs numpy, so only once a pack exists
+            codes.update(pack_codes(entry["path"]))
+        entry["mass_codes"] = sorted(codes)
+    else:
+        files = {}
+        for n in names:
+            match = ISO_FILE_RE.match(n)
+            if match:
+                files[match.group(1) + match.group(2)] = os.path.join(entry["path"], n)
+        entry["iso_files"] = files
+
+
+def _read(download_dir: str):
+    try:
+        with open(os.path.join(download_dir, MANIFEST_FILE), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write(download_dir: str, manifest: dict):
+    path = os.path.join(download_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not save MIST manifest: {e}")
+
+
+def _save(download_dir: str, manifest: dict):
+    """
+    Write the manifest, then re-record DOWNLOAD_DIR's mtime: the manifest
+    lives inside the directory it watches, so saving it bumps that mtime.
+    The new value is adopted only if no other entry appeared meanwhile.
+    """
+    _write(download_dir, manifest)
+    dir_mtime = _mtime_ns(download_dir)
+    if dir_mtime != manifest.get("dir_mtime_ns"):
+        names = sorted(n for n in os.listdir(download_dir) if _is_data_entry(n))
+        if names == manifest.get("entries"):
+            manifest["dir_mtime_ns"] = dir_mtime
+
+
+def _refresh(download_dir: str, manifest: dict, force: bool) -> bool:
+    """
+    Bring the manifest up to date with as few filesystem calls as possible:
+    one stat of DOWNLOAD_DIR, and a listdir only if that mtime changed.
+    Grids whose names are unchanged keep their recorded contents.
+    Returns True if anything changed.
+    """
+    dir_mtime = _mtime_ns(download_dir)
+    if not force and manifest.get("dir_mtime_ns") == dir_mtime:
+        return False
+
+    with instrument.stage("manifest.scan", force=force):
+        names = sorted(n for n in os.listdir(download_dir) if _is_data_entry(n))
+        old_grids = {} if force else manifest.get("grids", {})
+        grids = {}
+        for name in names:
+            entry = old_grids.get(name) or _scan_grid(download_dir, name)
+            if entry is not None:
+                grids[name] = entry
+
+    manifest.update({"dir_mtime_ns": dir_mtime, "entries": names, "grids": grids})
+    return True
+
+
+def load_manifest(download_dir=None, force=False) -> dict:
+    """
+    Return the manifest for download_dir (default: DOWNLOAD_DIR from
+    config.json), creating or incrementally refreshing it as needed.
+    """
+    if download_dir is None:
+        download_dir = load_config()["DOWNLOAD_DIR"]
+    download_dir = os.path.abspath(os.path.expanduser(download_dir))
+
+    with _LOCK:
+        manifest = _MEMO.get(download_dir)
+        if manifest is None:
+            manifest = _read(download_dir) or {"version": MANIFEST_VERSION, "download_dir": download_dir}
+        if _refresh(download_dir, manifest, force):
+            _save(download_dir, manifest)
+        _MEMO[download_dir] = manifest
+        return manifest
+
+
+def refresh_manifest(download_dir=None) -> dict:
+    """Force a full rescan, e.g. after files were changed by hand."""
+    return load_manifest(download_dir, force=True)
+
+
+def _fresh_entry(download_dir: str, manifest: dict, entry: dict) -> dict:
+    """Rescan a single grid if its own directory changed since it was recorded."""
+    try:
+        if _mtime_ns(entry["path"]) != entry["mtime_ns"]:
+            with _LOCK:
+                _rescan_contents(entry)
+                _save(download_dir, manifest)
+    except FileNotFoundError:
+        with _LOCK:
+            if _refresh(download_dir, manifest, force=True):
+                _save(download_dir, manifest)
+    return entry
+
+
+def is_installed(download_dir: str, base_name: str) -> bool:
+    """True if DOWNLOAD_DIR holds an extracted entry whose name starts with base_name."""
+    manifest = load_manifest(download_dir)
+    return any(name.startswith(base_name) for name in manifest["entries"])
+
+
+def installed_grids(download_dir=None, kind=None) -> list:
+    """All recorded grid entries (optionally only "eeps" or "iso"), sorted by path."""
+    manifest = load_manifest(download_dir)
+    grids = [g for g in manifest["grids"].values() if kind is None or g["kind"] == kind]
+    return sorted(grids, key=lambda g: g["path"])
+
+
+def find_eep_dir(download_dir: str, feh: float, vcrit: float):
+    """Path of the installed EEPS directory for feh + vcrit, or None."""
+    for grid in installed_grids(download_dir, "eeps"):
+        if _feh_key(grid["feh"]) == _feh_key(feh) and grid["vcrit"] == round(float(vcrit), 1):
+            return grid["path"]
+    return None
+
+
+def eep_mass_codes(eep_dir: str) -> list:
+    """Sorted mass codes ("00105", ...) available in an installed EEPS directory."""
+    eep_dir = os.path.abspath(eep_dir)
+    download_dir = os.path.dirname(eep_dir)
+    manifest = load_manifest(download_dir)
+    entry = manifest["grids"].get(os.path.basename(eep_dir))
+    if entry is None:
+        raise RuntimeError(f"{eep_dir} is not an installed EEPS directory.")
+    return list(_fresh_entry(download_dir, manifest, entry)["mass_codes"])
+
+
+def find_iso_file(iso_dir: str, feh: float, vcrit: float):
+    """
+    Path of the .iso.cmd file for feh inside an installed isochrone
+    directory, or None if that directory or file is not recorded.
+    """
+    iso_dir = os.path.abspath(os.path.expanduser(iso_dir))
+    download_dir = os.path.dirname(iso_dir)
+    manifest = load_manifest(download_dir)
+    entry = manifest["grids"].get(os.path.basename(iso_dir))
+    if entry is None or entry["kind"] != "iso":
+        return None
+    files = _fresh_entry(download_dir, manifest, entry)["iso_files"]
+    return files.get(_feh_key(feh))
+
+
+def main():
+    """
+    Usage: python3 -m comp333.files.manifest [--rebuild]
+    Prints every installed grid recorded in DOWNLOAD_DIR's manifest.
+    """
+    manifest = refresh_manifest() if "--rebuild" in sys.argv[1:] else load_manifest()
+    print(f"[INFO] Manifest: {os.path.join(manifest['download_dir'], MANIFEST_FILE)}")
+    for grid in installed_grids(manifest["download_dir"]):
+        if grid["kind"] == "eeps":
+            print(f"  EEPS  [Fe/H]={grid['feh']:+.2f} vcrit={grid['vcrit']:.1f} "
+                  f"{len(grid['mass_codes'])} masses  {grid['path']}")
+        else:
+            fehs = ", ".join(sorted(grid["iso_files"]))
+            print(f"  ISO   vcrit={grid['vcrit']:.1f} [Fe/H]: {fehs}  {grid['path']}")
+
+
+if __name__ == "__main__":
+    main()
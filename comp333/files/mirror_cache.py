@@ -0,0 +1,155 @@
+import hashlib
+import os
+import tarfile
+from . import instrument
+from .download_engine import DownloadIntegrityError, _hash_file, extract_archive, fetch_and_extract, fetch_archive
+from .selective_extract import install_selected
+
+# Where a MIST tarball comes from, in this order:
+#   1. MIRROR_CACHE_DIR: a shared directory (e.g. on the cluster file system)
+#      of verified .txz files, extracted straight from disk
+#   2. MIRROR_URL: a `python3 -m comp333.mirror serve` server (or any HTTP
+#      server with Range support) in front of such a directory
+#   3. MIST_BASE_URL: the upstream MIST server
+# `python3 -m comp333.mirror sync` fills the cache once for every node.
+
+CHECKSUM_FILE = "SHA256SUMS"
+
+
+def eep_archive_name(feh: float, vcrit: float) -> str:
+    sign = "p" if feh >= 0 else "m"
+    return f"MIST_v1.2_feh_{sign}{abs(feh):.2f}_afe_p0.0_vvcrit{float(vcrit):.1f}_EEPS.txz"
+
+
+def iso_archive_name(vcrit: float) -> str:
+    return f"MIST_v1.2_vvcrit{float(vcrit):.1f}_UBVRIplus.txz"
+
+
+def archive_names(eep_vcrit=None, fehs=(), iso_vcrit=None) -> list:
+    """Tarball names for the given EEPS metallicities and isochrone vcrit."""
+    names = []
+    if eep_vcrit is not None:
+        names.extend(eep_archive_name(float(feh), eep_vcrit) for feh in fehs)
+    if iso_vcrit is not None:
+        names.append(iso_archive_name(iso_vcrit))
+    return names
+
+
+def read_checksums(cache_dir: str) -> dict:
+    """{tarball name: sha256} recorded by sync_archives ({} if none)."""
+    try:
+        with open(os.path.join(cache_dir, CHECKSUM_FILE)) as f:
+            return dict(reversed(line.split(None, 1)) for line in f.read().splitlines() if line.strip())
+    except FileNotFoundError:
+        return {}
+
+
+def _record_checksum(cache_dir, filename, digest):
+    checksums = read_checksums(cache_dir)
+    checksums[filename] = digest
+    tmp_path = os.path.join(cache_dir, f".{CHECKSUM_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        f.writelines(f"{checksums[name]}  {name}\n" for name in sorted(checksums))
+    os.replace(tmp_path, os.path.join(cache_dir, CHECKSUM_FILE))
+
+
+def _expected_sha256(filename, config):
+    expected = config.get("MIST_CHECKSUMS", {}).get(filename)
+    cache_dir = config.get("MIRROR_CACHE_DIR")
+    if not expected and cache_dir:
+        expected = read_checksums(os.path.expanduser(cache_dir)).get(filename)
+    return expected
+
+
+def cached_archive(filename: str, config: dict):
+    """Path of filename in MIRROR_CACHE_DIR, or None if it is not there."""
+    cache_dir = config.get("MIRROR_CACHE_DIR")
+    if not cache_dir:
+        return None
+    path = os.path.join(os.path.expanduser(cache_dir), filename)
+    return path if os.path.isfile(path) else None
+
+
+def fetch_from_sources(filename: str, local_path: str, config: dict, session=None, progress=None,
+                       select=None) -> str:
+    """
+    Install one tarball into local_path's directory from the first source
+    that has it: the mirror cache, the mirror server, then upstream.
+    select = {"mass_range": ..., "fehs": ...} extracts only those members
+    and keeps the archive (the cache copy, or local_path) for later
+    on-demand extraction; see selective_extract.
+    Returns "cache", "mirror" or "upstream".
+    """
+    expected = _expected_sha256(filename, config)
+    extract_dir = os.path.dirname(local_path)
+
+    cached = cached_archive(filename, config)
+    if cached is not None:
+        print(f"[INFO] Extracting {filename} from mirror cache {os.path.dirname(cached)}")
+        if expected:
+            digest = hashlib.sha256()
+            _hash_file(cached, digest)
+            if digest.hexdigest() != expected.lower():
+                raise DownloadIntegrityError(f"{cached}: sha256 does not match the recorded checksum")
+        if select is not None:
+            install_selected(cached, extract_dir, **select)
+        else:
+            with instrument.stage("extract", file=filename, source="cache"):
+                extract_archive(cached, extract_dir)
+        return "cache"
+
+    def transfer(url):
+        if select is None:
+            fetch_and_extract(url, local_path, session=session, progress=progress,
+                              expected_sha256=expected, mode=config.get("DOWNLOAD_MODE", "resume"))
+            return
+        # Selective extraction needs the archive on disk, whatever DOWNLOAD_MODE says
+        if os.path.exists(local_path):
+            print(f"[INFO] Using previously downloaded archive {filename}")
+        else:
+            with instrument.stage("download", file=filename, mode="keep"):
+                fetch_archive(url, local_path, session=session, progress=progress, expected_sha256=expected)
+            if progress is not None:
+                progress.finish(filename)
+        install_selected(local_path, extract_dir, **select)
+
+    mirror_url = config.get("MIRROR_URL")
+    if mirror_url:
+        try:
+            transfer(mirror_url.rstrip("/") + "/" + filename)
+            return "mirror"
+        except (OSError, RuntimeError, tarfile.TarError) as e:
+            print(f"[WARN] Mirror {mirror_url} could not provide {filename} ({e}); trying upstream")
+
+    transfer(config["MIST_BASE_URL"] + filename)
+    return "upstream"
+
+
+def sync_archives(cache_dir: str, filenames, base_url: str, session=None, checksums=None) -> dict:
+    """
+    Download every tarball in filenames that cache_dir does not hold yet,
+    without extracting it. Transfers resume after an interruption and
+    only verified archives appear under their final name.
+    Returns {filename: True (fetched) / None (already cached) / False (failed)}.
+    """
+    cache_dir = os.path.expanduser(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    checksums = checksums or {}
+    results = {}
+    for filename in filenames:
+        path = os.path.join(cache_dir, filename)
+        if os.path.isfile(path):
+            print(f"[INFO] Already mirrored: {filename}")
+            results[filename] = None
+            continue
+        print(f"[INFO] Mirroring {base_url}{filename}")
+        try:
+            with instrument.stage("mirror.fetch", file=filename):
+                digest = fetch_archive(base_url + filename, path, session=session,
+                                       expected_sha256=checksums.get(filename))
+            _record_checksum(cache_dir, filename, digest)
+            results[filename] = True
+        except (OSError, RuntimeError) as e:
+            print(f"[ERROR] Could not mirror {filename}: {e}")
+            results[filename] = False
+    return results
@@ -0,0 +1,112 @@
+import os
+import numpy as np
+from . import instrument
+
+# Column names used by the plotting code, as spelled in the MIST v1.2 headers
+STAR_AGE = "star_age"
+LOG_L = "log_L"
+LOG_TEFF = "log_Teff"
+
+ISO_EEP = "EEP"
+ISO_LOG_AGE = "log10_isochrone_age_yr"
+ISO_INITIAL_MASS = "initial_mass"
+ISO_LOG_TEFF = "log_Teff"
+ISO_LOG_L = "log_L"
+
+ISO_BLOCK_MARKER = b"# number of EEPs"
+
+
+def _names_from_header_line(line) -> list:
+    if isinstance(line, bytes):
+        line = line.decode("ascii")
+    return line.lstrip("#").split()
+
+
+def column_indices(names, columns) -> list:
+    """0-based positions of the requested column names; KeyError if unknown."""
+    lookup = {name: i for i, name in enumerate(names)}
+    missing = [c for c in columns if c not in lookup]
+    if missing:
+        raise KeyError(f"Unknown MIST column(s) {missing}; available: {', '.join(names)}")
+    return [lookup[c] for c in columns]
+
+
+def read_track_header(f) -> list:
+    """
+    Consume the '#' header of an open .track.eep file (binary mode) and
+    return its column names. The names are on the last header line, right
+    after the line of column numbers; f is left at the first data row.
+    """
+    last = None
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line.startswith(b"#"):
+            f.seek(offset)
+            break
+        last = line
+    if last is None:
+        raise ValueError("Not a MIST track file: no '#' header found.")
+    return _names_from_header_line(last)
+
+
+def parse_rows(lines, usecols=None) -> np.ndarray:
+    """
+    Whitespace-separated numeric rows (an open file or a list of lines) ->
+    (n_rows x n_cols) float64 array holding only the usecols positions.
+    """
+    return np.loadtxt(lines, dtype=np.float64, usecols=usecols, ndmin=2, comments=None)
+
+
+def read_track(path: str, columns=None) -> dict:
+    """
+    Read a .track.eep file into {column name: float64 array}.
+    Only the requested columns are converted (all of them if None).
+    """
+    with open(path, "rb") as f:
+        names = read_track_header(f)
+        if columns is None:
+            columns = names
+        usecols = column_indices(names, columns)
+        table = parse_rows(f, usecols=usecols)
+        instrument.add(bytes_read=os.fstat(f.fileno()).st_size, rows=len(table))
+    return {name: table[:, i] for i, name in enumerate(columns)}
+
+
+def read_iso_block_header(f):
+    """
+    Consume one '# number of EEPs, cols = N M' block header (plus its two
+    comment lines) from an open .iso.cmd file (binary mode).
+    Returns (n_rows, column names), or None at end of file.
+    """
+    while True:
+        line = f.readline()
+        if not line:
+            return None
+        if line.startswith(ISO_BLOCK_MARKER):
+            break
+    n_rows = int(line.split(b"=", 1)[1].split()[0])
+    f.readline()  # column numbers
+    names = _names_from_header_line(f.readline())
+    return n_rows, names
+
+
+def read_iso(path: str, columns=None) -> list:
+    """
+    Read every age block of an .iso.cmd file.
+    Returns a list of {column name: float64 array}, one per block, in file order.
+    """
+    blocks = []
+    with open(path, "rb") as f:
+        while True:
+            header = read_iso_block_header(f)
+            if header is None:
+                break
+            n_rows, names = header
+            wanted = names if columns is None else columns
+            # Read the block's lines here so the file position stays exact
+            lines = [f.readline() for _ in range(n_rows)]
+            table = parse_rows(lines, usecols=column_indices(names, wanted))
+            instrument.add(bytes_read=sum(map(len, lines)), rows=n_rows)
+            blocks.append({name: table[:, i] for i, name in enumerate(wanted)})
+    return blocks
@@ -0,0 +1,49 @@
+import io
+import os
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+FIGURE_FORMATS = ("png", "pdf", "svg")
+DEFAULT_FIGSIZE = (8.0, 6.0)
+DEFAULT_DPI = 150
+
+
+def new_figure(figsize=None, dpi=None):
+    """
+    Create a Figure/Axes pair on the Agg canvas without touching pyplot.
+    Nothing here is global, so separate threads or worker processes can
+    each build their own figure safely.
+    """
+    fig = Figure(figsize=tuple(figsize or DEFAULT_FIGSIZE), dpi=dpi or DEFAULT_DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    return fig, ax
+
+
+def _check_format(fmt):
+    if fmt not in FIGURE_FORMATS:
+        raise ValueError(f"Unsupported figure format {fmt!r}; use one of {FIGURE_FORMATS}.")
+
+
+def save_figure(fig, path, dpi=None):
+    """
+    Write the figure to path; the format (png, pdf or svg) comes from the
+    file extension. Missing parent directories are created.
+    """
+    path = os.path.expanduser(path)
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    _check_format(fmt)
+
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    fig.savefig(path, format=fmt, dpi=dpi or fig.dpi, bbox_inches="tight")
+    return path
+
+
+def figure_bytes(fig, fmt="png", dpi=None) -> bytes:
+    """Render the figure in memory and return the encoded png, pdf or svg."""
+    _check_format(fmt)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi or fig.dpi, bbox_inches="tight")
+    return buf.getvalue()
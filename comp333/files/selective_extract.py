@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import shutil
+import tarfile
+import threading
+from bisect import bisect_left, bisect_right
+from . import instrument
+from .manifest import ISO_FILE_RE, eep_mass_codes
+
+# Selective extraction (EXTRACT_MODE "selective" in config.json): a fresh
+# tarball is read once and only the tracks and .iso.cmd files a run needs
+# are written out. The archive is kept, and its member list is recorded in
+# DOWNLOAD_DIR/.archive_index.json, so members needed later are pulled out
+# on demand in a pass that stops right after the last of them.
+
+INDEX_FILE = ".archive_index.json"
+EXTRACT_MODES = ("all", "selective")
+_TRACK_RE = re.compile(r"^(\d{5})M\.track\.eep$")
+_LOCK = threading.Lock()
+
+
+def selective_enabled(config: dict) -> bool:
+    mode = config.get("EXTRACT_MODE", "all")
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"Unknown EXTRACT_MODE {mode!r}; expected one of {EXTRACT_MODES}.")
+    return mode == "selective"
+
+
+def _feh_key(feh: float) -> str:
+    sign = "p" if feh >= 0 else "m"
+    return f"{sign}{abs(float(feh)):.2f}"
+
+
+def _track_code(name):
+    match = _TRACK_RE.match(os.path.basename(name))
+    return match.group(1) if match else None
+
+
+def _iso_feh_key(name):
+    match = ISO_FILE_RE.match(os.path.basename(name))
+    return match.group(1) + match.group(2) if match else None
+
+
+def bracket_codes(codes, mass_range=None) -> list:
+    """
+    Mass codes inside mass_range plus the nearest one on either side, the
+    tracks interpolation reads (see eep_grid._codes_for_range). All codes
+    for mass_range=None.
+    """
+    codes = sorted(codes)
+    if mass_range is None:
+        return codes
+    masses = [int(c) / 100.0 for c in codes]
+    lo = max(bisect_right(masses, float(mass_range[0])) - 1, 0)
+    hi = min(bisect_left(masses, float(mass_range[1])) + 1, len(codes))
+    return codes[lo:hi]
+
+
+def _safe_path(root, name):
+    if os.path.isabs(name) or ".." in name.split("/"):
+        raise tarfile.TarError(f"Refusing to extract unsafe member {name!r}")
+    return os.path.join(root, name)
+
+
+def _extract(tar, member, staging_dir):
+    if hasattr(tarfile, "data_filter"):
+        tar.extract(member, staging_dir, filter="data")
+    else:
+        tar.extract(member, staging_dir)
+
+
+def _merge(staging_dir, extract_dir):
+    """Move staged files into extract_dir without touching files already there."""
+    for root, _, files in os.walk(staging_dir):
+        target_root = os.path.join(extract_dir, os.path.relpath(root, staging_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            os.replace(os.path.join(root, name), os.path.join(target_root, name))
+
+
+def extract_selected(archive_path, extract_dir, mass_range=None, fehs=None, names=None) -> list:
+    """
+    Read archive_path once and extract only:
+      names      : exactly these members (the pass stops after the last one)
+      mass_range : tracks inside (min, max) Msun plus the nearest on each side
+      fehs       : .iso.cmd files for these [Fe/H] values
+    Tracks are all taken when mass_range is None, isochrone files when fehs
+    is None; other members (READMEs) are skipped unless named.
+    Files are staged, then merged into extract_dir beside existing files.
+    Returns the member names seen (all of them unless names ended the pass).
+    """
+    wanted = set(names) if names is not None else None
+    feh_keys = None if fehs is None else {_feh_key(f) for f in fehs}
+    staging_dir = os.path.join(extract_dir, f".extract-{os.path.basename(archive_path)}-{os.getpid()}-sel")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    seen = []
+    below = above = None  # nearest track outside mass_range: (mass, member name, bytes)
+    n_taken = 0
+    try:
+        # "r|xz" streams forward only: nothing is decompressed twice
+        with tarfile.open(archive_path, "r|xz") as tar:
+            for member in tar:
+                seen.append(member.name)
+                if not member.isfile():
+                    continue
+                code, iso_key = _track_code(member.name), _iso_feh_key(member.name)
+                if wanted is not None:
+                    take = member.name in wanted
+                elif code is not None and mass_range is not None:
+                    mass = int(code) / 100.0
+                    take = float(mass_range[0]) <= mass <= float(mass_range[1])
+                    # Bracketing candidates stay in memory until the pass is over
+                    if mass < float(mass_range[0]) and (below is None or mass > below[0]):
+                        below = (mass, member.name, tar.extractfile(member).read())
+                    elif mass > float(mass_range[1]) and (above is None or mass < above[0]):
+                        above = (mass, member.name, tar.extractfile(member).read())
+                elif code is not None:
+                    take = True
+                elif iso_key is not None:
+                    take = feh_keys is None or iso_key in feh_keys
+                else:
+                    take = False
+
+                if take:
+                    _extract(tar, member, staging_dir)
+                    n_taken += 1
+                if wanted is not None:
+                    wanted.discard(member.name)
+                    if not wanted:
+                        break
+
+        for candidate in (below, above):
+            if candidate is not None:
+                path = _safe_path(staging_dir, candidate[1])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(candidate[2])
+                n_taken += 1
+
+        _merge(staging_dir, extract_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    instrument.add(members=n_taken)
+    print(f"[INFO] Extracted {n_taken} member(s) of {os.path.basename(archive_path)} "
+          f"({len(seen)} read)")
+    return seen
+
+
+def load_index(download_dir: str) -> dict:
+    """{extracted directory name: {"archive": path, "members": [...]}} for kept archives."""
+    try:
+        with open(os.path.join(download_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _record_archive(download_dir, base_name, archive_path, members):
+    with _LOCK:
+        index = load_index(download_dir)
+        index[base_name] = {"archive": os.path.abspath(archive_path), "members": members}
+        path = os.path.join(download_dir, INDEX_FILE)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+
+def install_selected(archive_path, extract_dir, mass_range=None, fehs=None):
+    """
+    First extraction of a kept archive: extract the selection and record
+    the archive and its member list for later on-demand extraction.
+    """
+    name = os.path.basename(archive_path)
+    print(f"Selectively extracting into: {extract_dir}")
+    with instrument.stage("extract", file=name, mode="selective"):
+        members = extract_selected(archive_path, extract_dir, mass_range=mass_range, fehs=fehs)
+    _record_archive(extract_dir, name[:-len(".txz")], archive_path, members)
+
+
+def _extract_on_demand(entry, extract_dir, names) -> list:
+    if not names:
+        return []
+    if not os.path.isfile(entry["archive"]):
+        print(f"[WARN] Kept archive {entry['archive']} is gone; cannot extract {len(names)} more member(s).")
+        return []
+    print(f"[INFO] Extracting {len(names)} more member(s) of {os.path.basename(entry['archive'])} on demand")
+    with instrument.stage("extract", file=os.path.basename(entry["archive"]), mode="on_demand"):
+        extract_selected(entry["archive"], extract_dir, names=names)
+    return names
+
+
+def ensure_eep_members(eep_dir: str, mass_range=None) -> list:
+    """
+    Extract the tracks of a selectively extracted EEPS directory that
+    mass_range (None: every mass) needs but that are not on disk yet.
+    Fully extracted directories are left alone. Returns the members extracted.
+    """
+    download_dir, base_name = os.path.split(os.path.abspath(eep_dir))
+    entry = load_index(download_dir).get(base_name)
+    if entry is None:
+        return []
+    members = {}
+    for name in entry["members"]:
+        code = _track_code(name)
+        if code is not None:
+            members[code] = name
+    have = set(eep_mass_codes(eep_dir))
+    missing = [members[c] for c in bracket_codes(members, mass_range) if c not in have]
+    return _extract_on_demand(entry, download_dir, missing)
+
+
+def ensure_iso_member(iso_dir: str, feh: float) -> list:
+    """Extract the .iso.cmd file for feh from a selectively extracted isochrone directory."""
+    download_dir, base_name = os.path.split(os.path.abspath(os.path.expanduser(iso_dir)))
+    entry = load_index(download_dir).get(base_name)
+    if entry is None:
+        return []
+    missing = [
+        name for name in entry["members"]
+        if _iso_feh_key(name) == _feh_key(feh) and not os.path.isfile(os.path.join(download_dir, name))
+    ]
+    return _extract_on_demand(entry, download_dir, missing)
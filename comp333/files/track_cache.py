@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import sys
+import numpy as np
+from . import instrument
+from .config_utils import load_config
+from .mist_reader import read_track
+
+CACHE_DIRNAME = ".track_cache"
+CACHE_VERSION = 2  # 2: columns stored by MIST name instead of colN
+META_FILE = "meta.json"
+
+
+def _cache_dir_for(track_path: str) -> str:
+    """
+    Cache location for one track file:
+      <EEPS dir>/.track_cache/<file name>/<column>.npy
+    """
+    parent, name = os.path.split(os.path.abspath(track_path))
+    return os.path.join(parent, CACHE_DIRNAME, name)
+
+
+def _source_signature(track_path: str) -> dict:
+    st = os.stat(track_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _read_meta(cache_dir: str):
+    try:
+        with open(os.path.join(cache_dir, META_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_cache_fresh(track_path: str) -> bool:
+    """
+    True if the binary cache exists and still matches the source file's
+    mtime and size.
+    """
+    meta = _read_meta(_cache_dir_for(track_path))
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return False
+    return meta.get("source") == _source_signature(track_path)
+
+
+def build_track_cache(track_path: str) -> str:
+    """
+    Parse a .track.eep file once and store every column as its own .npy file.
+    Returns the cache directory.
+    """
+    cache_dir = _cache_dir_for(track_path)
+    signature = _source_signature(track_path)
+    with instrument.stage("track.parse", file=os.path.basename(track_path)):
+        data = read_track(track_path)
+
+    # Write into a private directory first so readers never see a half cache.
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    for name, values in data.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": signature,
+        "columns": list(data),
+        "rows": len(next(iter(data.values()))),
+    }
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, cache_dir)
+    except OSError:
+        # Another process finished the same cache first; theirs is as good as ours.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return cache_dir
+
+
+def load_track_columns(track_path: str, columns) -> dict:
+    """
+    Return {column: memory-mapped array} for the requested columns of a
+    .track.eep file, (re)building the cache if it is missing or stale.
+    """
+    if not is_cache_fresh(track_path):
+        build_track_cache(track_path)
+
+    cache_dir = _cache_dir_for(track_path)
+    out = {}
+    for name in columns:
+        col_path = os.path.join(cache_dir, f"{name}.npy")
+        if not os.path.isfile(col_path):
+            raise KeyError(f"Column {name!r} not found in {track_path}")
+        out[name] = np.load(col_path, mmap_mode="r")
+    return out
+
+
+def warm_cache(eep_dir: str) -> int:
+    """
+    Build the binary cache for every .track.eep file in an EEPS directory.
+    Returns the number of files that had to be (re)built.
+    """
+    eep_dir = os.path.expanduser(eep_dir)
+    if not os.path.isdir(eep_dir):
+        raise ValueError(f"EEPS directory not found: {eep_dir}")
+
+    built = 0
+    for name in sorted(os.listdir(eep_dir)):
+        if not name.endswith(".track.eep"):
+            continue
+        path = os.path.join(eep_dir, name)
+        if is_cache_fresh(path):
+            continue
+        build_track_cache(path)
+        built += 1
+
+    print(f"[INFO] Track cache warm for {eep_dir} ({built} file(s) rebuilt)")
+    return built
+
+
+def main():
+    """
+    Usage: python3 -m comp333.files.track_cache [EEPS_DIR ...]
+    With no arguments, warms every EEPS directory in DOWNLOAD_DIR.
+    """
+    eep_dirs = sys.argv[1:]
+    if not eep_dirs:
+        from .manifest import installed_grids
+
+        download_dir = os.path.expanduser(load_config()["DOWNLOAD_DIR"])
+        eep_dirs = [grid["path"] for grid in installed_grids(download_dir, kind="eeps")]
+        if not eep_dirs:
+            print(f"[WARN] No EEPS directories found in {download_dir}")
+            return
+
+    for eep_dir in eep_dirs:
+        warm_cache(eep_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,59 @@
 import json
 import sys
-import numpy as np
-import matplotlib.pyplot as plt
 
+from comp333.files import instrument
 from comp333.files.config_utils import load_config, ensure_config_dir_exists
-from comp333.files.download_eep import download_eep
-from comp333.files.download_iso import download_isochrone
-from comp333.files.evolutionary_track import plot_eep
-from comp333.files.isochrone import plt_iso
 
-
-
-def run_from_config(cfg):
+# Heavy dependencies (numpy, matplotlib, astropy, requests) are imported
+# inside run_from_config, only on the code paths that need them, so that
+# download-only and fully cached runs start quickly.
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_PLOT_WORKERS = 1  # per-metallicity layers are computed in this process
+
+
+def run_from_config(cfg, output_path=None, headless=False):
+    """
+    Download, plot and show one HR diagram described by a run config.
+
+    If output_path (or "output": {"path": ...} in the config) is set, the
+    figure is built on an explicit Agg Figure and written to that file
+    (png, pdf or svg) without ever touching pyplot's global state.
+    Otherwise the figure is shown interactively, unless headless=True, in
+    which case the Agg figure is only built and returned.
+    A config without eep_plot_settings only downloads data.
+    Returns the Figure (None for download-only runs).
+
+    With COMP333_TRACE set, or a "trace": {"path": ...} section in the
+    config, per-stage timings are written to that trace file.
+    """
+    tracing = instrument.start_from_config(cfg.get("trace"))
+    try:
+        with instrument.stage("run_from_config"):
+            return _run(cfg, output_path, headless)
+    finally:
+        if tracing:
+            instrument.finish()
+
+
+def _needed_mass_range(cfg):
+    """(min, max) Msun covering the plotted tracks and the fit; None if every mass is needed."""
+    if cfg.get("plot_settings", {}).get("iso_source") == "tracks":
+        return None  # isochrone synthesis reads every track
+    ranges = []
+    eep_cfg = cfg.get("eep_plot_settings")
+    if eep_cfg:
+        ranges.append((int(eep_cfg["min_mass_code"]) / 100.0, int(eep_cfg["max_mass_code"]) / 100.0))
+    if cfg.get("fit", {}).get("run"):
+        if cfg["fit"].get("mass_range") is None:
+            return None
+        ranges.append(tuple(float(m) for m in cfg["fit"]["mass_range"]))
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def _run(cfg, output_path, headless):
     # --- Downloads ---
     fehs = []
     eep_vcrit = None
@@ -22,12 +64,61 @@ def run_from_config(cfg):
         fehs = cfg["eep_download"]["feh"]
         if not isinstance(fehs, list):
             fehs = [fehs]
-        for feh in fehs:
-            download_eep(vcrit=eep_vcrit, feh=feh)
 
     if cfg.get("iso_download", {}).get("run"):
         iso_vcrit = cfg["iso_download"]["vcrit"]
-        download_isochrone(iso_vcrit)
+
+    if eep_vcrit is not None or iso_vcrit is not None:
+        from comp333.files.download_manager import download_all
+        from comp333.files.feh_interp import grid_fehs
+
+        # All tarballs are fetched concurrently; at most download_workers at once.
+        # Off-grid [Fe/H] values download the two bracketing grids instead.
+        # With EXTRACT_MODE "selective" only these masses and [Fe/H] are unpacked.
+        with instrument.stage("downloads"):
+            download_all(
+                eep_vcrit=eep_vcrit,
+                fehs=grid_fehs(fehs),
+                iso_vcrit=iso_vcrit,
+                max_workers=cfg.get("download_workers", DEFAULT_DOWNLOAD_WORKERS),
+                mass_range=_needed_mass_range(cfg),
+                iso_fehs=grid_fehs(fehs or cfg.get("plot_settings", {}).get("feh_list", [0.0])),
+            )
+
+    if "eep_plot_settings" in cfg or cfg.get("fit", {}).get("run"):
+        from comp333.files.feh_interp import ensure_eep_grids
+
+        # Interpolated [Fe/H] values need both bracketing EEPS grids installed
+        eep_cfg = cfg.get("eep_plot_settings", {})
+        ensure_eep_grids(
+            fehs or eep_cfg.get("feh_list", [0.0]),
+            eep_vcrit if eep_vcrit is not None else eep_cfg.get("vcrit", 0.4),
+            max_workers=cfg.get("download_workers", DEFAULT_DOWNLOAD_WORKERS),
+        )
+
+    if cfg.get("fit", {}).get("run"):
+        from comp333.files.fitting import fit_from_config, print_fits
+
+        with instrument.stage("fit"):
+            print_fits(cfg.get("points", []), fit_from_config(cfg))
+
+    if "eep_plot_settings" not in cfg:
+        print("[INFO] No eep_plot_settings in run config; downloads only.")
+        return None
+
+    import numpy as np
+    from comp333.files.evolutionary_track import plot_eep
+    from comp333.files.isochrone import plt_iso
+
+    output_cfg = cfg.get("output", {})
+    output_path = output_path or output_cfg.get("path")
+
+    if output_path or headless:
+        from comp333.files.render import new_figure, save_figure
+        fig, ax = new_figure(figsize=output_cfg.get("figsize"), dpi=output_cfg.get("dpi"))
+    else:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots()
 
     # --- Plot EEPs (now supports multiple feh) ---
     eep_plot_cfg = dict(cfg["eep_plot_settings"])
@@ -35,8 +126,12 @@ def run_from_config(cfg):
         eep_plot_cfg["feh_list"] = fehs
     if eep_vcrit is not None:
         eep_plot_cfg["vcrit"] = eep_vcrit
+    # Worker processes for the per-metallicity load/interpolate step
+    plot_workers = cfg.get("plot_workers", DEFAULT_PLOT_WORKERS)
+    eep_plot_cfg.setdefault("workers", plot_workers)
 
-    eep_bounds = plot_eep(eep_plot_cfg)
+    with instrument.stage("plot_eep"):
+        eep_bounds = plot_eep(eep_plot_cfg, ax=ax)
 
     # --- Plot isochrones (now supports multiple feh) ---
     plot_cfg = dict(cfg["plot_settings"])
@@ -44,27 +139,50 @@ def run_from_config(cfg):
         plot_cfg["feh_list"] = fehs
     if iso_vcrit is not None:
         plot_cfg["vcrit"] = iso_vcrit
-
-    iso_bounds = plt_iso(
-        plot_cfg,
-        eep_bounds,
-        cfg.get("points", [])
-    )
+    # Isochrones synthesized from tracks use the same EEPS grids as plot_eep
+    plot_cfg.setdefault("eep_vcrit", eep_plot_cfg.get("vcrit", 0.4))
+    plot_cfg.setdefault("workers", plot_workers)
+
+    with instrument.stage("plt_iso"):
+        iso_bounds = plt_iso(
+            plot_cfg,
+            eep_bounds,
+            cfg.get("points", []),
+            ax=ax,
+            catalog=cfg.get("catalog"),
+        )
 
     # Combined bounds if needed later
     all_x = np.concatenate([eep_bounds["x"], iso_bounds["x"]])
     all_y = np.concatenate([eep_bounds["y"], iso_bounds["y"]])
 
     # Use bounds from EEPs (low-mass focused)
-    plt.xlim(*eep_bounds["xlim"])
-    plt.ylim(*eep_bounds["ylim"])
-
-    plt.xlabel(plot_cfg["xlabel"])
-    plt.ylabel(plot_cfg["ylabel"])
-    plt.title(plot_cfg["title"])
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    ax.set_xlim(*eep_bounds["xlim"])
+    ax.set_ylim(*eep_bounds["ylim"])
+
+    ax.set_xlabel(plot_cfg["xlabel"])
+    ax.set_ylabel(plot_cfg["ylabel"])
+    ax.set_title(plot_cfg["title"])
+    # loc="best" tests every catalog artist for overlap, which takes seconds
+    # for thousands of stars; catalogs get a fixed corner unless configured
+    ax.legend(loc=plot_cfg.get("legend_loc", "lower left" if cfg.get("catalog") else "best"))
+    ax.grid(True)
+
+    # Optional animation over the same tracks, isochrones and axis limits
+    anim_cfg = cfg.get("animation", {})
+    if anim_cfg.get("run"):
+        from comp333.files.animate import write_animation
+
+        with instrument.stage("animation"):
+            write_animation(eep_plot_cfg, plot_cfg, anim_cfg, (eep_bounds["xlim"], eep_bounds["ylim"]))
+
+    if output_path:
+        with instrument.stage("save_figure", path=output_path):
+            save_figure(fig, output_path, dpi=output_cfg.get("dpi"))
+        print(f"[INFO] Saved figure to {output_path}")
+    elif not headless:
+        plt.show()
+    return fig
 
 
 def main():
@@ -0,0 +1,166 @@
+import argparse
+import os
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from comp333.files.config_utils import load_config
+from comp333.files.mirror_cache import CHECKSUM_FILE, archive_names, sync_archives
+
+# Cluster-local stand-in for MIST_BASE_URL. "sync" downloads the chosen
+# tarballs once into a shared cache directory; "serve" hands them out over
+# HTTP with Range support, so interrupted node downloads resume against the
+# mirror exactly as they would upstream. Nodes point MIRROR_URL (or, on a
+# shared file system, MIRROR_CACHE_DIR) at it in config.json.
+
+DEFAULT_PORT = 8334
+COPY_CHUNK = 1024 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=a-b", "bytes=a-" or
+    "bytes=-n" range; None to send the whole file (no or multi-part
+    range); ValueError if the range lies outside the file.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, end
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """GET/HEAD /<tarball>.txz and /SHA256SUMS from the cache directory."""
+
+    server_version = "comp333-mirror"
+    cache_dir = "."
+    quiet = False
+
+    def _resolve(self):
+        name = self.path.partition("?")[0].lstrip("/")
+        # Flat directory: no sub-paths, no partial downloads, no hidden files
+        if "/" in name or name.startswith(".") or not (name.endswith(".txz") or name == CHECKSUM_FILE):
+            return None
+        path = os.path.join(self.cache_dir, name)
+        return path if os.path.isfile(path) else None
+
+    def _serve(self, send_body):
+        path = self._resolve()
+        if path is None:
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range if byte_range is not None else (0, size - 1)
+        self.send_response(206 if byte_range is not None else 200)
+        if byte_range is not None:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not send_body:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(COPY_CHUNK, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            print(f"[INFO] {self.address_string()} {fmt % args}")
+
+
+def make_server(cache_dir, host="0.0.0.0", port=DEFAULT_PORT, quiet=False):
+    """Threaded HTTP server for cache_dir; every node download gets its own thread."""
+    cache_dir = os.path.expanduser(cache_dir)
+    if not os.path.isdir(cache_dir):
+        raise ValueError(f"Mirror cache directory not found: {cache_dir}")
+    handler = type("Handler", (MirrorHandler,), {"cache_dir": cache_dir, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def _cache_dir(args, config):
+    cache_dir = args.cache_dir or config.get("MIRROR_CACHE_DIR")
+    if not cache_dir:
+        raise ValueError("No mirror cache directory; pass --cache-dir or set MIRROR_CACHE_DIR in config.json.")
+    return os.path.expanduser(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python3 -m comp333.mirror",
+        description="Keep a local mirror of MIST tarballs and serve it to other nodes.",
+    )
+    parser.add_argument("--cache-dir", help="mirror directory (default: MIRROR_CACHE_DIR in config.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync = commands.add_parser("sync", help="download tarballs into the mirror directory")
+    sync.add_argument("--eep-vcrit", type=float, help="vcrit of the EEPS grids to mirror")
+    sync.add_argument("--feh", type=float, nargs="*", default=[], help="[Fe/H] of the EEPS grids to mirror")
+    sync.add_argument("--iso-vcrit", type=float, help="vcrit of the isochrone grid to mirror")
+    sync.add_argument("--from", dest="base_url", help="source URL (default: MIST_BASE_URL)")
+
+    serve = commands.add_parser("serve", help="serve the mirror directory over HTTP")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = parser.parse_args()
+
+    config = load_config()
+    cache_dir = _cache_dir(args, config)
+
+    if args.command == "sync":
+        names = archive_names(args.eep_vcrit, args.feh, args.iso_vcrit)
+        if not names:
+            parser.error("nothing to mirror; give --eep-vcrit with --feh and/or --iso-vcrit")
+        results = sync_archives(cache_dir, names, args.base_url or config["MIST_BASE_URL"],
+                                checksums=config.get("MIST_CHECKSUMS", {}))
+        return 1 if False in results.values() else 0
+
+    server = make_server(cache_dir, args.host, args.port, args.quiet)
+    print(f"[INFO] Serving {cache_dir} on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Shutting down")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import argparse
+import json
+import math
+import os
+import socketserver
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from comp333.files.config_utils import load_config, ensure_config_dir_exists
+from comp333.files.grid_cache import DEFAULT_BUDGET_MB, GRID_CACHE, set_memory_budget
+
+# Long-lived query service: grids, isochrone blocks and fit indexes stay in
+# GRID_CACHE between requests, so only the first request for a grid pays
+# for parsing. Requests are served one at a time: matplotlib and the caches
+# are shared process state, and every request after the first is dominated
+# by numpy work that would not overlap anyway.
+
+DEFAULT_PORT = 8333
+DEFAULT_DPI = 100  # lower than the CLI default; PNG encoding dominates /plot
+# Run config keys a /plot request may not use: they download, write files
+# or start process pools inside the single-threaded request handler
+PLOT_IGNORED_KEYS = ("eep_download", "iso_download", "download_workers", "plot_workers",
+                     "animation", "output", "trace")
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+
+def _finite_list(arr) -> list:
+    """Array -> JSON-safe list with NaN/inf as null."""
+    return [float(v) if math.isfinite(v) else None for v in arr.tolist()]
+
+
+def _trim(columns: dict) -> dict:
+    """Drop the NaN padding past the end of a track."""
+    import numpy as np
+
+    keep = np.ones(len(next(iter(columns.values()))), dtype=bool)
+    for arr in columns.values():
+        keep &= np.isfinite(arr)
+    return {name: _finite_list(arr[keep]) for name, arr in columns.items()}
+
+
+def track_curves(req: dict) -> list:
+    """Interpolated tracks for req["masses"] at one feh/vcrit (off-grid [Fe/H] allowed)."""
+    from comp333.files.evolutionary_track import mass_curves
+
+    feh = float(req.get("feh", 0.0))
+    vcrit = float(req.get("vcrit", 0.4))
+    masses = [float(m) for m in req["masses"]]
+    tracks = mass_curves(load_config()["DOWNLOAD_DIR"], feh, vcrit, masses)
+    return [
+        {"mass": m, **_trim({name: arr[i] for name, arr in tracks.items()})}
+        for i, m in enumerate(masses)
+    ]
+
+
+def isochrone_curves(req: dict) -> list:
+    """
+    Isochrones at req["log_ages"] for one feh. source "tracks" synthesizes
+    them from the EEPS grid (eep_vcrit); "grid" reads the installed
+    isochrone file (vcrit).
+    """
+    from comp333.files.isochrone import ISO_SOURCES, _iso_curves
+    from comp333.files.manifest import installed_grids
+
+    source = req.get("source", "tracks")
+    if source not in ISO_SOURCES:
+        raise ValueError(f"Unknown isochrone source {source!r}; use one of {ISO_SOURCES}.")
+    feh = float(req.get("feh", 0.0))
+    vcrit = float(req.get("vcrit", 0.0))
+    ages = [float(a) for a in req["log_ages"]]
+
+    iso_dir = os.path.expanduser(req.get("iso_directory", ""))
+    if source == "grid" and not iso_dir:
+        grids = [g for g in installed_grids(kind="iso") if g["vcrit"] == round(vcrit, 1)]
+        if not grids:
+            raise RuntimeError(f"No isochrone grid installed for vcrit={vcrit:.1f}.")
+        iso_dir = grids[0]["path"]
+
+    iso_cfg = {"eep_vcrit": req.get("eep_vcrit", 0.4)}
+    return [
+        {"log_age": float(age), "log_Teff": _finite_list(logT), "log_L": _finite_list(logL)}
+        for age, logT, logL in _iso_curves(iso_cfg, source, iso_dir, feh, vcrit, ages)
+    ]
+
+
+def fit_results(cfg: dict) -> list:
+    from comp333.files.fitting import fit_from_config
+
+    results = fit_from_config(cfg)
+    return [
+        None if r is None else {"name": p.get("name", "Constraint"), **r}
+        for p, r in zip(cfg.get("points", []), results)
+    ]
+
+
+def _missing_eep_grids(cfg: dict) -> list:
+    """Grid [Fe/H] values the run config's tracks need that are not installed."""
+    from comp333.files.feh_interp import grid_fehs
+    from comp333.files.manifest import find_eep_dir
+
+    eep_cfg = cfg.get("eep_plot_settings", {})
+    vcrit = float(eep_cfg.get("vcrit", 0.4))
+    download_dir = load_config()["DOWNLOAD_DIR"]
+    return [f for f in grid_fehs(eep_cfg.get("feh_list", [0.0])) if find_eep_dir(download_dir, f, vcrit) is None]
+
+
+def plot_bytes(cfg: dict, fmt="png") -> bytes:
+    """
+    Render the run config's HR diagram in memory from installed grids only.
+    Downloads, animations, plot worker pools, tracing and output files are
+    never started by a request.
+    """
+    from comp333.master import run_from_config
+    from comp333.files.render import figure_bytes
+
+    cfg = {k: v for k, v in cfg.items() if k not in PLOT_IGNORED_KEYS}
+    if "eep_plot_settings" not in cfg:
+        raise ValueError("Run config has no eep_plot_settings; nothing to plot.")
+    missing = _missing_eep_grids(cfg)
+    if missing:
+        raise RuntimeError(
+            f"EEPS grids for [Fe/H]={', '.join(f'{f:+.2f}' for f in missing)} are not installed; "
+            f"the service does not download."
+        )
+    # Per-section "workers" would start layer process pools; keep them serial
+    for section in ("eep_plot_settings", "plot_settings"):
+        if section in cfg:
+            cfg[section] = dict(cfg[section], workers=1)
+    cfg["output"] = {"dpi": DEFAULT_DPI}
+    fig = run_from_config(cfg, headless=True)
+    return figure_bytes(fig, fmt, dpi=DEFAULT_DPI)
+
+
+def preload(fehs, vcrit):
+    """Parse every track of the installed EEPS grids for fehs before serving."""
+    from comp333.files.iso_synth import load_synth_grid
+
+    for feh in fehs:
+        grid = load_synth_grid(load_config()["DOWNLOAD_DIR"], feh, vcrit)
+        print(f"[INFO] Preloaded [Fe/H]={feh:+.2f}: {len(grid.masses)} tracks, {grid.nbytes / 1e6:.1f} MB")
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    GET  /status  cache statistics
+    POST /curve   {"kind": "tracks"|"isochrones", ...} -> JSON curves
+    POST /fit     run config with "points" -> JSON fits
+    POST /plot    run config -> image (?format=png|svg|pdf)
+    """
+
+    server_version = "comp333"
+    quiet = False
+
+    def _send(self, status, body: bytes, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Request body is not valid JSON: {e}")
+
+    def _dispatch(self, method):
+        path, _, query = self.path.partition("?")
+        params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+        if method == "GET" and path == "/status":
+            return self._send_json(200, {"uptime_s": round(time.time() - self.server.started, 1),
+                                         "grid_cache": GRID_CACHE.stats()})
+        if method != "POST" or path not in ("/curve", "/fit", "/plot"):
+            return self._send_json(404, {"error": f"No endpoint {method} {path}"})
+
+        req = self._read_json()
+        if path == "/curve":
+            kind = req.get("kind", "tracks")
+            if kind == "tracks":
+                return self._send_json(200, {"tracks": track_curves(req)})
+            if kind == "isochrones":
+                return self._send_json(200, {"isochrones": isochrone_curves(req)})
+            raise ValueError(f"Unknown curve kind {kind!r}; use 'tracks' or 'isochrones'.")
+        if path == "/fit":
+            return self._send_json(200, {"fits": fit_results(req)})
+        fmt = params.get("format", "png")
+        self._send(200, plot_bytes(req, fmt), CONTENT_TYPES.get(fmt, "application/octet-stream"))
+
+    def _handle(self, method):
+        start = time.perf_counter()
+        try:
+            self._dispatch(method)
+        except (ValueError, KeyError, RuntimeError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:  # keep serving after unexpected failures
+            print(f"[ERROR] {method} {self.path}: {e!r}")
+            self._send_json(500, {"error": repr(e)})
+        if not self.quiet:
+            print(f"[INFO] {method} {self.path} {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, *args):
+        pass  # _handle prints one line per request
+
+
+class _UnixHTTPServer(socketserver.UnixStreamServer):
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, socket_path=None, quiet=False):
+    """HTTP server on host:port, or on a Unix socket when socket_path is set."""
+    handler = type("Handler", (QueryHandler,), {"quiet": quiet})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, handler)
+    else:
+        server = HTTPServer((host, port), handler)
+    server.started = time.time()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve HR diagram, curve and fit queries over resident MIST grids.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_BUDGET_MB,
+                        help="memory budget for cached grids (least recently used are evicted)")
+    parser.add_argument("--preload", type=float, nargs="*", default=[], metavar="FEH",
+                        help="[Fe/H] values whose EEPS grids are parsed at startup")
+    parser.add_argument("--vcrit", type=float, default=0.4, help="vcrit of the preloaded EEPS grids")
+    parser.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    ensure_config_dir_exists(load_config())
+    set_memory_budget(args.memory_mb)
+    preload(args.preload, args.vcrit)
+
+    server = make_server(args.host, args.port, args.socket, args.quiet)
+    where = args.socket or f"http://{args.host}:{server.server_port}"
+    print(f"[INFO] Serving on {where} (memory budget {args.memory_mb:.0f} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Shutting down")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Synthetic MIST-format files for the unit tests.
+
+The values are smooth toy functions of mass and EEP, not stellar physics,
+but the file layout (comment header, column count, EEP numbering) follows
+the real MIST v1.2 .track.eep format closely enough for every reader in
+comp333.files to treat them as the genuine article.
+"""
+import os
+import numpy as np
+
+TRACK_COLUMNS = [
+    "star_age", "star_mass", "star_mdot", "he_core_mass", "c_core_mass",
+    "o_core_mass", "log_L", "log_L_div_Lsun", "log_LH", "log_LHe", "log_LZ",
+    "log_Teff", "log_abs_Lgrav", "log_R", "log_g", "log_surf_z",
+    "surf_avg_omega", "surf_avg_v_rot", "surf_num_c12_div_num_o16",
+    "v_wind_Km_per_s", "surf_avg_omega_crit", "surf_avg_omega_div_omega_crit",
+    "surf_avg_v_crit", "surf_avg_v_div_v_crit", "surf_avg_Lrad_div_Ledd",
+    "v_div_csound_surf", "surface_h1", "surface_he3", "surface_he4",
+    "surface_li7", "surface_be9", "surface_b11", "surface_c12", "surface_c13",
+    "surface_n14", "surface_o16", "surface_f19", "surface_ne20", "surface_na23",
+    "surface_mg24", "surface_si28", "surface_s32", "surface_ca40",
+    "surface_ti48", "surface_fe56", "log_center_T", "log_center_Rho",
+    "center_degeneracy", "center_omega", "center_gamma", "mass_conv_core",
+    "center_h1", "center_he4", "center_c12", "center_n14", "center_o16",
+    "center_ne20", "center_mg24", "center_si28", "pp", "cno", "tri_alfa",
+    "burn_c", "burn_n", "burn_o", "c12_c12", "delta_nu", "delta_Pg",
+    "nu_max", "acoustic_cutoff", "max_conv_vel_div_csound",
+    "max_gradT_div_grada", "gradT_excess_alpha", "min_Pgas_div_P",
+    "max_L_rad_div_Ledd", "e_thermal", "phase",
+]
+
+PRIMARY_EEPS = [1, 202, 353, 454, 605, 631, 707]
+
+
+def mass_to_code(mass: float) -> str:
+    return f"{int(round(mass * 100)):05d}"
+
+
+def track_n_eep(mass: float) -> int:
+    """Lower masses stop earlier, like the real grid."""
+    return 454 if mass < 0.7 else 707
+
+
+def track_arrays(mass: float, feh: float = 0.0):
+    """Return (eep, age, logT, logL, phase) for a synthetic track."""
+    n_eep = track_n_eep(mass)
+    eep = np.arange(1, n_eep + 1, dtype=float)
+    frac = (eep - 1.0) / 706.0
+    t_ms = 1.0e10 * mass ** -2.5 * (1.0 + 0.1 * feh)
+    age = 1.0e4 + t_ms * frac ** 2
+    logT = 3.6 + 0.25 * np.log10(mass) + 0.1 * frac - 0.02 * feh
+    logL = 4.5 * np.log10(mass) + 2.0 * frac - 0.5 * (1.0 - frac) ** 3 - 0.1 * feh
+    phase = np.where(eep < 202, -1.0, np.where(eep < 454, 0.0, 2.0))
+    return eep, age, logT, logL, phase
+
+
+def write_track(path: str, mass: float, feh: float = 0.0, vcrit: float = 0.4) -> str:
+    """Write one synthetic .track.eep file and return its path."""
+    eep, age, logT, logL, phase = track_arrays(mass, feh)
+    n_col = len(TRACK_COLUMNS)
+    data = np.zeros((len(eep), n_col))
+    data[:, 0] = age
+    data[:, 1] = mass
+    data[:, 6] = logL
+    data[:, 11] = logT
+    data[:, 13] = 0.5 * logL - 2.0 * (logT - 3.76)
+    data[:, -1] = phase
+
+    eeps = [e for e in PRIMARY_EEPS if e <= len(eep)]
+    rule = "# " + "-" * 86
+    header = [
+        "# MIST version number  = 1.2",
+        "# MESA revision number =     7503",
+        rule,
+        "#  Yinit        Zinit   [Fe/H]   [a/Fe]  v/vcrit",
+        f"#  0.2703  1.42857E-02  {feh:6.2f}     0.00  {vcrit:6.2f}",
+        rule,
+        "#  initial_mass   N_pts   N_EEP   N_col   phase        type",
+        f"#  {mass:.10E}  {len(eep):5d}  {len(eeps):5d}  {n_col:5d}     YES    low-mass",
+        "#   EEPs: " + " ".join(f"{e:4d}" for e in eeps),
+        rule,
+        "# " + "".join(f"{i + 1:>32d}" for i in range(n_col)),
+        "# " + "".join(f"{name:>32s}" for name in TRACK_COLUMNS),
+    ]
+    with open(path, "w") as f:
+        f.write("\n".join(header) + "\n")
+        np.savetxt(f, data, fmt="%32.16E", delimiter="")
+    return path
+
+
+def write_eep_dir(root: str, masses, feh: float = 0.0, vcrit: float = 0.4) -> str:
+    """Write an extracted EEPS directory with one track per mass."""
+    sign = "p" if feh >= 0 else "m"
+    name = f"MIST_v1.2_feh_{sign}{abs(feh):.2f}_afe_p0.0_vvcrit{vcrit:.1f}_EEPS"
+    eep_dir = os.path.join(root, name)
+    os.makedirs(eep_dir, exist_ok=True)
+    for mass in masses:
+        write_track(os.path.join(eep_dir, f"{mass_to_code(mass)}M.track.eep"), mass, feh, vcrit)
+    return eep_dir
+
+
+ISO_COLUMNS = [
+    "EEP", "log10_isochrone_age_yr", "initial_mass", "star_mass", "log_Teff",
+    "log_g", "log_L", "[Fe/H]_init", "[Fe/H]", "Bessell_U", "Bessell_B",
+    "Bessell_V", "Bessell_R", "Bessell_I", "2MASS_J", "2MASS_H", "2MASS_Ks",
+    "Kepler_Kp", "Kepler_D51", "Hipparcos_Hp", "Tycho_B", "Tycho_V",
+    "Gaia_G_DR2Rev", "Gaia_BP_DR2Rev", "Gaia_RP_DR2Rev", "Gaia_G_MAW",
+    "Gaia_BP_MAWb", "Gaia_BP_MAWf", "Gaia_RP_MAW", "TESS", "Gaia_G_EDR3",
+    "Gaia_BP_EDR3", "Gaia_RP_EDR3", "phase",
+]
+
+ISO_LOG_AGES = np.round(np.arange(5.0, 10.30001, 0.05), 2)
+
+
+def iso_block(log_age: float, feh: float = 0.0, eep_step: int = 1):
+    """
+    Return (eep, mass, logT, logL) for a synthetic isochrone that is exactly
+    consistent with track_arrays(): the mass at each EEP is solved analytically.
+    """
+    eep = np.arange(2, 708, eep_step, dtype=float)
+    frac = (eep - 1.0) / 706.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mass = ((10.0 ** log_age - 1.0e4) / (1.0e10 * (1.0 + 0.1 * feh) * frac ** 2)) ** (-1.0 / 2.5)
+    n_eep = np.where(mass < 0.7, 454, 707)
+    keep = np.isfinite(mass) & (mass >= 0.1) & (mass <= 300.0) & (eep <= n_eep)
+    eep, mass, frac = eep[keep], mass[keep], frac[keep]
+    logT = 3.6 + 0.25 * np.log10(mass) + 0.1 * frac - 0.02 * feh
+    logL = 4.5 * np.log10(mass) + 2.0 * frac - 0.5 * (1.0 - frac) ** 3 - 0.1 * feh
+    return eep, mass, logT, logL
+
+
+def write_isochrone(path: str, feh: float = 0.0, vcrit: float = 0.0,
+                    log_ages=ISO_LOG_AGES, eep_step: int = 1) -> str:
+    """Write one synthetic .iso.cmd file with a block per log-age."""
+    n_col = len(ISO_COLUMNS)
+    rule = "# " + "-" * 86
+    with open(path, "w") as f:
+        f.write("\n".join([
+            "# MIST version number  = 1.2",
+            "# MESA revision number =     7503",
+            rule,
+            "# photometric system ",
+            "# UBV(RI)c + 2MASS + Kepler + Hipparcos + Gaia (DR2/MAW/EDR3) + TESS",
+            rule,
+            "#  Yinit        Zinit   [Fe/H]   [a/Fe]  v/vcrit",
+            f"#  0.2703  1.42857E-02  {feh:6.2f}     0.00  {vcrit:6.2f}",
+            rule,
+            "#     Av     Rv",
+            "#  0.00   3.10",
+            rule,
+            f"# number of isochrones = {len(log_ages):4d}",
+            rule,
+        ]) + "\n")
+        for log_age in log_ages:
+            eep, mass, logT, logL = iso_block(log_age, feh, eep_step)
+            data = np.zeros((len(eep), n_col))
+            data[:, 0] = eep
+            data[:, 1] = log_age
+            data[:, 2] = mass
+            data[:, 3] = mass
+            data[:, 4] = logT
+            data[:, 5] = 4.44 + np.log10(mass) - logL + 4.0 * (logT - 3.76)
+            data[:, 6] = logL
+            data[:, 7] = feh
+            data[:, 8] = feh
+            data[:, -1] = np.where(eep < 202, -1, np.where(eep < 454, 0, 2))
+            f.write(f"# number of EEPs, cols = {len(eep):6d} {n_col:5d}\n")
+            f.write("# " + "".join(f"{i + 1:>23d}" for i in range(n_col)) + "\n")
+            f.write("# " + "".join(f"{name:>23s}" for name in ISO_COLUMNS) + "\n")
+            np.savetxt(f, data, fmt=["%5d"] + ["%23.16E"] * (n_col - 1), delimiter=" ")
+            f.write("\n\n")
+    return path
+
+
+def write_iso_dir(root: str, fehs, vcrit: float = 0.0, **kwargs) -> str:
+    """Write an extracted UBVRIplus directory with one .iso.cmd per [Fe/H]."""
+    iso_dir = os.path.join(root, f"MIST_v1.2_vvcrit{vcrit:.1f}_UBVRIplus")
+    os.makedirs(iso_dir, exist_ok=True)
+    for feh in fehs:
+        sign = "p" if feh >= 0 else "m"
+        name = f"MIST_v1.2_feh_{sign}{abs(feh):.2f}_afe_p0.0_vvcrit{vcrit:.1f}_UBVRIplus.iso.cmd"
+        write_isochrone(os.path.join(iso_dir, name), feh, vcrit, **kwargs)
+    return iso_dir
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from comp333.files.animate import assemble, frame_ages, render_frames, track_positions
+
+
+def _scene(n_frames):
+    ages = frame_ages(1e7, 1e9, n_frames)
+    T = np.linspace(3.70, 3.60, n_frames)[None, :].repeat(2, axis=0)
+    L = np.linspace(0.0, 1.0, n_frames)[None, :].repeat(2, axis=0)
+    layer = {
+        "feh": 0.0,
+        "tracks": [(np.array([3.7, 3.6]), np.array([0.0, 1.0]))] * 2,
+        "T": T,
+        "L": L,
+        "isochrones": [(np.array([3.65, 3.62]), np.array([0.2, 0.4]))] * n_frames,
+    }
+    return {"ages": ages, "masses": np.array([1.0, 1.1]), "layers": [layer], "xlim": (3.8, 3.5),
+            "ylim": (-0.5, 1.5), "labels": ("x", "y", "t"), "figsize": (3, 2), "dpi": 50}
+
+
+class TestAnimate(unittest.TestCase):
+    """Unit tests for precomputed, parallel-rendered track animations."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_positions_match_per_track_interpolation(self):
+        """Test that the vectorized positions equal np.interp in log(age) track by track."""
+        age = np.array([[1e6, 1e7, 1e8, 1e9], [2e6, 2e7, 2e8, np.nan]])
+        logT = np.array([[3.8, 3.7, 3.65, 3.5], [3.9, 3.85, 3.8, np.nan]])
+        logL = np.array([[0.0, 0.1, 0.3, 1.0], [0.5, 0.6, 0.8, np.nan]])
+        ages = frame_ages(5e5, 1e9, 25)
+        T, L = track_positions(age, logT, logL, ages)
+        for i in range(2):
+            ok = np.isfinite(age[i])
+            log_a = np.log10(age[i][ok])
+            inside = (np.log10(ages) >= log_a[0]) & (np.log10(ages) < log_a[-1])
+            expected = np.interp(np.log10(ages), log_a, logT[i][ok])
+            np.testing.assert_allclose(T[i][inside], expected[inside])
+            self.assertTrue(np.isnan(T[i][~inside]).all())
+            self.assertTrue(np.isnan(L[i][~inside]).all())
+
+    def test_frame_ages(self):
+        """Test that frame ages span the window and bad windows are rejected."""
+        ages = frame_ages(1e6, 1e9, 4)
+        np.testing.assert_allclose(ages, [1e6, 1e7, 1e8, 1e9])
+        self.assertEqual(frame_ages(1.0, 3.0, 3, spacing="linear").tolist(), [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            frame_ages(1e9, 1e6, 4)
+
+    def test_parallel_frames_in_order_and_gif(self):
+        """Test that frames from several workers come back in age order and join into a GIF."""
+        from PIL import Image
+
+        frame_dir = os.path.join(self.tmp.name, "frames")
+        paths = render_frames(_scene(5), frame_dir, workers=2)
+        self.assertEqual([os.path.basename(p) for p in paths], [f"frame_{i:05d}.png" for i in range(5)])
+        gif = assemble(paths, os.path.join(self.tmp.name, "evolution.gif"), fps=5)
+        with Image.open(gif) as im:
+            self.assertEqual(im.n_frames, 5)
+
+    def test_mp4_needs_ffmpeg(self):
+        """Test that MP4 output without ffmpeg fails with a clear error, and unknown formats are rejected."""
+        paths = render_frames(_scene(2), os.path.join(self.tmp.name, "frames"))
+        with mock.patch("comp333.files.animate.shutil.which", return_value=None):
+            with self.assertRaises(RuntimeError):
+                assemble(paths, os.path.join(self.tmp.name, "evolution.mp4"))
+        with self.assertRaises(ValueError):
+            assemble(paths, os.path.join(self.tmp.name, "evolution.avi"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from mist_fixtures import write_eep_dir, write_iso_dir
+from comp333.files import config_utils
+from comp333.batch import find_run_configs, run_batch
+
+
+def _run_config(data_dir, iso_dir):
+    return {
+        "eep_download": {"run": False},
+        "iso_download": {"run": False},
+        "eep_plot_settings": {
+            "min_mass_code": "00095",
+            "max_mass_code": "00105",
+            "age_min": 1.0e6,
+            "age_max": 3.0e9,
+            "vcrit": 0.4,
+        },
+        "plot_settings": {
+            "iso_directory": iso_dir,
+            "age_min": 9.0,
+            "age_max": 9.0,
+            "vcrit": 0.0,
+            "title": "Batch",
+            "xlabel": "log(T_eff)",
+            "ylabel": "log(L)",
+        },
+        "points": [{"name": "Star A", "x": 3.6, "y": 0.2}],
+    }
+
+
+class TestBatch(unittest.TestCase):
+    """Unit tests for headless multi-config batch rendering."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp.name, "data")
+        write_eep_dir(data_dir, [0.9, 1.0, 1.1])
+        iso_dir = write_iso_dir(data_dir, [0.0], log_ages=[8.5, 9.0], eep_step=4)
+
+        self.old_config_file = config_utils.CONFIG_FILE
+        config_utils.CONFIG_FILE = os.path.join(self.tmp.name, "config.json")
+        with open(config_utils.CONFIG_FILE, "w") as f:
+            json.dump({"DOWNLOAD_DIR": data_dir, "MIST_BASE_URL": "http://127.0.0.1:9/"}, f)
+
+        self.config_dir = os.path.join(self.tmp.name, "configs")
+        os.makedirs(self.config_dir)
+        for name in ("star_a", "star_b"):
+            with open(os.path.join(self.config_dir, f"{name}.json"), "w") as f:
+                json.dump(_run_config(data_dir, iso_dir), f)
+        with open(os.path.join(self.config_dir, "notes.txt"), "w") as f:
+            f.write("not a config")
+
+    def tearDown(self):
+        config_utils.CONFIG_FILE = self.old_config_file
+        self.tmp.cleanup()
+
+    def test_find_run_configs_expands_directories(self):
+        """Test that directories expand to their sorted .json files."""
+        configs = find_run_configs([self.config_dir])
+        self.assertEqual([os.path.basename(c) for c in configs], ["star_a.json", "star_b.json"])
+
+    def test_batch_renders_each_config(self):
+        """Test that every config produces a figure file."""
+        out_dir = os.path.join(self.tmp.name, "out")
+        results = run_batch([self.config_dir], out_dir, fmt="svg")
+        self.assertTrue(all(error is None for _, _, error, _ in results))
+        self.assertEqual(sorted(os.listdir(out_dir)), ["star_a.svg", "star_b.svg"])
+
+    def test_bad_config_does_not_stop_batch(self):
+        """Test that a broken config is reported and the rest still render."""
+        bad = os.path.join(self.config_dir, "bad.json")
+        with open(bad, "w") as f:
+            json.dump({"eep_plot_settings": {}}, f)
+        results = run_batch([self.config_dir], os.path.join(self.tmp.name, "out"))
+        errors = {os.path.basename(path): error for path, _, error, _ in results}
+        self.assertIsNotNone(errors["bad.json"])
+        self.assertIsNone(errors["star_a.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
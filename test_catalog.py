@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from comp333.files.catalog import classify, draw_catalog, load_catalog
+from comp333.files.isochrone import draw_constraints
+from comp333.files.render import new_figure
+
+CSV = """name,x,y,x_err,y_err,x_min,x_max,y_min,y_max
+A,3.70,0.50,0.01,0.05,,,,
+B,3.72,,0.01,,,,0.2,0.4
+C,,0.80,,0.05,3.60,3.64,,
+D,3.66,,,,,,,
+E,,,,,3.61,3.63,0.1,0.3
+F,,,,,,,,
+"""
+
+POINTS = [
+    {"name": "A", "x": 3.70, "y": 0.50, "x_err": 0.01, "y_err": 0.05},
+    {"name": "B", "x": 3.72, "x_err": 0.01, "y_range": [0.2, 0.4]},
+    {"name": "C", "y": 0.80, "y_err": 0.05, "x_range": [3.60, 3.64]},
+    {"name": "D", "x": 3.66},
+    {"name": "E", "x_range": [3.61, 3.63], "y_range": [0.1, 0.3]},
+]
+
+
+class TestCatalog(unittest.TestCase):
+    """Unit tests for vectorized star catalog constraints."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "stars.csv")
+        with open(self.csv_path, "w") as f:
+            f.write(CSV)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_fall_into_constraint_cases(self):
+        """Test that empty cells select the same cases as run config points."""
+        masks = classify(load_catalog(self.csv_path))
+        self.assertEqual(
+            {k: np.flatnonzero(m).tolist() for k, m in masks.items() if m.any()},
+            {"point": [0], "x_y_range": [1], "y_x_range": [2], "x_only": [3], "box": [4]},
+        )
+
+    def test_one_legend_entry_per_case(self):
+        """Test that each case is one artist with one legend entry."""
+        fig, ax = new_figure()
+        draw_catalog(ax, load_catalog(self.csv_path), label="Cluster")
+        labels = ax.get_legend_handles_labels()[1]
+        self.assertEqual(len(labels), 5)
+        self.assertIn("Cluster: x/y boxes (n=1)", labels)
+
+    def test_bounds_match_per_star_drawing(self):
+        """Test that catalog bounds equal those of the equivalent points."""
+        _, ax = new_figure()
+        expected = draw_constraints(ax, POINTS)
+        _, ax = new_figure()
+        got = draw_catalog(ax, load_catalog(self.csv_path))
+        for want, have in zip(expected, got):
+            np.testing.assert_allclose(np.sort(have), np.sort(want))
+
+    def test_npz_catalog(self):
+        """Test that .npz catalogs with only some columns load."""
+        path = os.path.join(self.tmp.name, "stars.npz")
+        np.savez(path, x=np.array([3.7, 3.8]), y=np.array([0.1, 0.2]))
+        cat = load_catalog(path)
+        self.assertTrue(np.isnan(cat["x_err"]).all())
+        self.assertEqual(int(classify(cat)["point"].sum()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import mass_to_code, track_arrays, write_eep_dir, write_track
+from comp333.files import manifest
+from comp333.files.derived import DERIVED_FILE, build_derived_table, load_derived_table
+from comp333.files.grid_cache import GRID_CACHE
+
+MASSES = [0.6, 0.9, 1.0, 1.2]
+
+
+class TestDerived(unittest.TestCase):
+    """Unit tests for the precomputed per-grid table of derived track quantities."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.eep_dir = write_eep_dir(self.tmp.name, MASSES, feh=0.0)
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        build_derived_table(self.eep_dir)
+        self.table = load_derived_table(self.eep_dir)
+
+    def tearDown(self):
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        self.tmp.cleanup()
+
+    def test_phase_points_match_tracks(self):
+        """Test that ZAMS and TAMS ages and positions equal the track values at their EEPs."""
+        _, age, logT, logL, _ = track_arrays(1.0)
+        self.assertAlmostEqual(self.table.phase_age(1.0, "ZAMS"), age[201])
+        self.assertAlmostEqual(self.table.ms_lifetime(1.0), age[453] - age[201])
+        self.assertEqual(self.table.phase_point(1.0, "TAMS"), (logT[453], logL[453]))
+        self.assertEqual(self.table.extremes(1.2)["logL_max"], track_arrays(1.2)[3].max())
+        self.assertTrue(np.isnan(self.table.phase_age(0.6, "RGBTip")))  # short low-mass track
+
+        masses, T, _ = self.table.locus("RGBTip")
+        np.testing.assert_array_equal(masses, [0.9, 1.0, 1.2])
+        self.assertEqual(len(T), 3)
+
+    def test_age_at_log_l_matches_scan(self):
+        """Test that the bisection lookup agrees with a linear scan of the track."""
+        _, age, _, logL, _ = track_arrays(0.9)
+        for target in (logL[250], 0.5 * (logL[300] + logL[301]), logL[-1]):
+            k = 201 + int(np.argmax(logL[201:] >= target))
+            expected = age[k] if k == 201 else np.interp(target, logL[k - 1:k + 1], age[k - 1:k + 1])
+            self.assertAlmostEqual(self.table.age_at_log_l(0.9, target), expected, delta=1.0)
+        self.assertTrue(np.isnan(self.table.age_at_log_l(0.9, logL[-1] + 1.0)))
+        between = self.table.age_at_log_l(0.95, 0.0)
+        self.assertTrue(self.table.age_at_log_l(1.0, 0.0) < between < self.table.age_at_log_l(0.9, 0.0))
+
+    def test_tracks_ending_early_give_nan(self):
+        """Test that tracks ending before the ZAMS or below log_l return NaN without warnings."""
+        import warnings
+        from unittest import mock
+
+        with mock.patch("mist_fixtures.track_n_eep", return_value=150):
+            write_track(os.path.join(self.eep_dir, f"{mass_to_code(0.5)}M.track.eep"), 0.5, feh=0.0)
+        table = load_derived_table(self.eep_dir)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertTrue(np.isnan(table.age_at_log_l(0.5, -1.0)))
+            self.assertTrue(np.isnan(table.phase_age(0.5, "ZAMS")))
+            self.assertTrue(np.isnan(table.age_at_log_l(0.6, track_arrays(0.6)[3].max() + 0.1)))
+
+    def test_time_in_box(self):
+        """Test that a box around the whole diagram holds each track for its full lifetime."""
+        durations = self.table.time_in_box((0.0, 10.0), (-10.0, 10.0))
+        for mass, duration in zip(MASSES, durations):
+            age = track_arrays(mass)[1]
+            self.assertAlmostEqual(duration, age[-1] - age[0], delta=1.0)
+        np.testing.assert_array_equal(self.table.time_in_box((9.0, 10.0), (0.0, 1.0)), 0.0)
+
+    def test_rebuilt_when_masses_change(self):
+        """Test that a track added after precomputing triggers a rebuild on load."""
+        write_track(os.path.join(self.eep_dir, f"{mass_to_code(1.5)}M.track.eep"), 1.5, feh=0.0)
+        table = load_derived_table(self.eep_dir)
+        self.assertEqual(table.codes[-1], "00150")
+        self.assertTrue(os.path.isfile(os.path.join(self.eep_dir, DERIVED_FILE)))
+        self.assertAlmostEqual(table.phase_age(1.5, "ZAMS"), track_arrays(1.5)[1][201])
+
+    def test_bad_lookups(self):
+        """Test that masses outside the grid and unknown phases raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.table.phase_age(2.0, "ZAMS")
+        with self.assertRaises(ValueError):
+            self.table.phase_age(1.0, "HB")
+
+
+if __name__ == "__main__":
+    unittest.main()
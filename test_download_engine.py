@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from comp333.files.download_engine import (
+    DownloadIntegrityError,
+    fetch_and_extract,
+    fetch_archive,
+    PART_SUFFIX,
+)
+
+ARCHIVE_NAME = "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS.txz"
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serves one in-memory payload, honoring simple "bytes=N-" ranges."""
+
+    payload = b""
+    ranges_seen = []
+    honor_range = True
+
+    def do_GET(self):
+        start = 0
+        header = self.headers.get("Range")
+        type(self).ranges_seen.append(header)
+        if header and self.honor_range:
+            start = int(header.split("=")[1].split("-")[0])
+            if start >= len(self.payload):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(self.payload)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(self.payload) - 1}/{len(self.payload)}")
+        else:
+            self.send_response(200)
+        body = self.payload[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _build_payload(tmp_dir):
+    src = os.path.join(tmp_dir, "src", "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS")
+    os.makedirs(src)
+    for code in ("00100", "00110"):
+        with open(os.path.join(src, f"{code}M.track.eep"), "wb") as f:
+            f.write(os.urandom(200_000))
+    path = os.path.join(tmp_dir, "payload.txz")
+    with tarfile.open(path, "w:xz") as tar:
+        tar.add(src, arcname=os.path.basename(src))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TestDownloadEngine(unittest.TestCase):
+    """Unit tests for resumable, verified and streaming downloads."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.payload = _build_payload(self.tmp.name)
+        self.sha256 = hashlib.sha256(self.payload).hexdigest()
+        _RangeHandler.payload = self.payload
+        _RangeHandler.ranges_seen = []
+        _RangeHandler.honor_range = True
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/{ARCHIVE_NAME}"
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data_dir)
+        self.archive_path = os.path.join(self.data_dir, ARCHIVE_NAME)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _write_partial(self, n_bytes):
+        with open(self.archive_path + PART_SUFFIX, "wb") as f:
+            f.write(self.payload[:n_bytes])
+
+    def test_resume_sends_range_and_completes(self):
+        """Test that an existing .part file is continued with a Range request."""
+        self._write_partial(len(self.payload) // 2)
+        digest = fetch_archive(self.url, self.archive_path, expected_sha256=self.sha256)
+        self.assertEqual(digest, self.sha256)
+        self.assertEqual(_RangeHandler.ranges_seen, [f"bytes={len(self.payload) // 2}-"])
+        self.assertFalse(os.path.exists(self.archive_path + PART_SUFFIX))
+
+    def test_complete_part_file_is_accepted(self):
+        """Test that a 416 reply for a finished .part file is not an error."""
+        self._write_partial(len(self.payload))
+        self.assertEqual(fetch_archive(self.url, self.archive_path), self.sha256)
+
+    def test_oversized_part_file_restarts(self):
+        """Test that a .part file larger than the server's archive is discarded, not accepted."""
+        with open(self.archive_path + PART_SUFFIX, "wb") as f:
+            f.write(self.payload + b"stale tail")
+        self.assertEqual(fetch_archive(self.url, self.archive_path), self.sha256)
+        self.assertEqual(_RangeHandler.ranges_seen, [f"bytes={len(self.payload) + 10}-", None])
+        with open(self.archive_path, "rb") as f:
+            self.assertEqual(f.read(), self.payload)
+
+    def test_server_without_range_support_restarts(self):
+        """Test that a 200 reply to a Range request restarts from zero."""
+        _RangeHandler.honor_range = False
+        self._write_partial(1000)
+        self.assertEqual(fetch_archive(self.url, self.archive_path), self.sha256)
+
+    def test_checksum_mismatch_extracts_nothing(self):
+        """Test that a bad checksum raises and leaves no files behind."""
+        with self.assertRaises(DownloadIntegrityError):
+            fetch_and_extract(self.url, self.archive_path, expected_sha256="0" * 64)
+        self.assertEqual(os.listdir(self.data_dir), [])
+
+    def test_resume_mode_extracts_and_removes_archive(self):
+        """Test the default mode end to end."""
+        fetch_and_extract(self.url, self.archive_path, expected_sha256=self.sha256)
+        extracted = os.path.join(self.data_dir, "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS")
+        self.assertEqual(sorted(os.listdir(extracted)), ["00100M.track.eep", "00110M.track.eep"])
+        self.assertEqual(os.listdir(self.data_dir), [os.path.basename(extracted)])
+
+    def test_stream_mode_never_writes_archive(self):
+        """Test that stream mode extracts without an archive on disk."""
+        digest = fetch_and_extract(self.url, self.archive_path, mode="stream")
+        self.assertEqual(digest, self.sha256)
+        self.assertEqual(os.listdir(self.data_dir), ["MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS"])
+
+    def test_stream_mode_checksum_mismatch(self):
+        """Test that stream mode verifies before publishing files."""
+        with self.assertRaises(DownloadIntegrityError):
+            fetch_and_extract(self.url, self.archive_path, expected_sha256="0" * 64, mode="stream")
+        self.assertEqual(os.listdir(self.data_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
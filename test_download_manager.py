@@ -0,0 +1,94 @@
+import functools
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from comp333.files import config_utils
+from comp333.files.download_manager import download_all, DownloadProgress
+from comp333.files.manifest import MANIFEST_FILE
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _make_txz(serve_dir, member_dir_name):
+    """Create <serve_dir>/<member_dir_name>.txz holding one small file."""
+    src = os.path.join(serve_dir, "src", member_dir_name)
+    os.makedirs(src)
+    with open(os.path.join(src, "00100M.track.eep"), "w") as f:
+        f.write("# synthetic\n1 2 3\n")
+    with tarfile.open(os.path.join(serve_dir, member_dir_name + ".txz"), "w:xz") as tar:
+        tar.add(src, arcname=member_dir_name)
+
+
+class TestDownloadAll(unittest.TestCase):
+    """Unit tests for concurrent MIST downloads against a local server."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.serve_dir = os.path.join(self.tmp.name, "serve")
+        self.download_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.serve_dir)
+        for name in (
+            "MIST_v1.2_feh_m0.25_afe_p0.0_vvcrit0.4_EEPS",
+            "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS",
+            "MIST_v1.2_vvcrit0.0_UBVRIplus",
+        ):
+            _make_txz(self.serve_dir, name)
+
+        handler = functools.partial(_QuietHandler, directory=self.serve_dir)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.old_config_file = config_utils.CONFIG_FILE
+        config_utils.CONFIG_FILE = os.path.join(self.tmp.name, "config.json")
+        with open(config_utils.CONFIG_FILE, "w") as f:
+            json.dump({
+                "DOWNLOAD_DIR": self.download_dir,
+                "MIST_BASE_URL": f"http://127.0.0.1:{self.server.server_port}/",
+            }, f)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        config_utils.CONFIG_FILE = self.old_config_file
+        self.tmp.cleanup()
+
+    def test_fetches_every_tarball(self):
+        """Test that all EEPS and isochrone tarballs are extracted."""
+        results = download_all(eep_vcrit=0.4, fehs=[-0.25, 0.0], iso_vcrit=0.0, max_workers=3)
+        self.assertEqual(list(results.values()), [True, True, True])
+        extracted = sorted(n for n in os.listdir(self.download_dir) if n != MANIFEST_FILE)
+        self.assertEqual(len(extracted), 3)
+        self.assertFalse(any(name.endswith(".txz") for name in extracted))
+
+    def test_second_run_skips_existing(self):
+        """Test that already-extracted grids are not downloaded again."""
+        download_all(eep_vcrit=0.4, fehs=[0.0], max_workers=2)
+        results = download_all(eep_vcrit=0.4, fehs=[0.0], max_workers=2)
+        self.assertEqual(list(results.values()), [None])
+
+    def test_failed_download_reported(self):
+        """Test that a missing tarball is reported as False, not raised."""
+        results = download_all(eep_vcrit=0.4, fehs=[0.5], max_workers=1)
+        self.assertEqual(list(results.values()), [False])
+
+    def test_progress_totals(self):
+        """Test that the progress counter sums bytes across downloads."""
+        progress = DownloadProgress(report_interval=3600)
+        progress.start("a", 100)
+        progress.start("b", 300)
+        progress.update("a", 100)
+        progress.update("b", 100)
+        progress.finish("a")
+        self.assertIn("50.0%", progress.summary())
+        self.assertIn("1 finished", progress.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import mass_to_code, write_eep_dir, write_track, track_arrays
+from comp333.files.eep_grid import interpolate_masses, load_eep_grid
+from comp333.files.grid_cache import GRID_CACHE
+from comp333.files.grid_pack import pack_eep_dir
+
+
+class TestEepGrid(unittest.TestCase):
+    """Unit tests for the padded mass x EEP grid and its interpolation."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.eep_dir = write_eep_dir(cls.tmp.name, [0.6, 0.8, 1.0, 1.2])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_grid_is_padded_with_nan(self):
+        """Test that shorter low-mass tracks are NaN-padded to the longest."""
+        grid = load_eep_grid(self.eep_dir)
+        self.assertEqual(grid["star_age"].shape, (4, 707))
+        self.assertTrue(np.isnan(grid["star_age"][0, 454:]).all())
+        self.assertFalse(np.isnan(grid["star_age"][1]).any())
+
+    def test_exact_mass_returns_track(self):
+        """Test that a grid mass reproduces its own track exactly."""
+        grid = load_eep_grid(self.eep_dir)
+        curves = interpolate_masses(grid, [0.6, 1.0])
+        _, age, logT, _, _ = track_arrays(1.0)
+        np.testing.assert_allclose(curves["log_Teff"][1], logT)
+        np.testing.assert_allclose(curves["star_age"][1], age)
+        self.assertEqual(np.count_nonzero(np.isfinite(curves["star_age"][0])), 454)
+
+    def test_midpoint_blends_same_eep(self):
+        """Test that interpolation blends points at the same EEP."""
+        grid = load_eep_grid(self.eep_dir)
+        curves = interpolate_masses(grid, [1.1])
+        expected = 0.5 * (track_arrays(1.0)[3] + track_arrays(1.2)[3])
+        np.testing.assert_allclose(curves["log_L"][0], expected)
+
+    def test_many_masses_in_one_call(self):
+        """Test that a dense fan comes back as one 2-D array."""
+        grid = load_eep_grid(self.eep_dir)
+        curves = interpolate_masses(grid, np.linspace(0.8, 1.2, 60))
+        self.assertEqual(curves["log_Teff"].shape, (60, 707))
+        self.assertTrue(np.all(np.diff(curves["log_Teff"][:, 300]) > 0))
+
+    def test_mass_range_loads_bracketing_tracks_only(self):
+        """Test that mass_range keeps just the tracks needed to interpolate."""
+        grid = load_eep_grid(self.eep_dir, mass_range=(0.9, 1.0))
+        self.assertEqual(grid.codes, ["00080", "00100"])
+
+    def test_rewritten_track_and_repack_are_reloaded(self):
+        """Test that cached grids are dropped once a track file or the pack changes."""
+        with tempfile.TemporaryDirectory() as tmp:
+            eep_dir = write_eep_dir(tmp, [0.9, 1.0])
+            GRID_CACHE.clear()
+            before = load_eep_grid(eep_dir)["log_Teff"][1].copy()
+
+            path = os.path.join(eep_dir, f"{mass_to_code(1.0)}M.track.eep")
+            write_track(path, 1.0, feh=0.5)  # same mass, different values
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            after = load_eep_grid(eep_dir)["log_Teff"][1]
+            np.testing.assert_allclose(after, track_arrays(1.0, 0.5)[2])
+            self.assertFalse(np.allclose(before, after))
+
+            pack_eep_dir(eep_dir, delete_text=True)
+            np.testing.assert_allclose(load_eep_grid(eep_dir, codes=["00090", "00100"])["log_Teff"][1], after)
+            GRID_CACHE.clear()
+
+    def test_out_of_range_mass_raises(self):
+        """Test that extrapolation is refused."""
+        grid = load_eep_grid(self.eep_dir)
+        with self.assertRaises(ValueError):
+            interpolate_masses(grid, [1.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
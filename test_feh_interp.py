@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from mist_fixtures import write_eep_dir
+from comp333.files import config_utils, manifest
+from comp333.files import evolutionary_track
+from comp333.files.evolutionary_track import _eep_layer, mass_curves
+from comp333.files.feh_interp import (
+    blend_isochrones,
+    bracket_feh,
+    ensure_eep_grids,
+    grid_fehs,
+)
+from comp333.files.grid_cache import GRID_CACHE
+
+
+class TestFehInterpolation(unittest.TestCase):
+    """Unit tests for interpolating between bracketing [Fe/H] grids."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.download_dir = self.tmp.name
+        for feh in (-0.25, 0.0):
+            write_eep_dir(self.download_dir, [0.9, 1.0, 1.1], feh=feh)
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+
+    def tearDown(self):
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        self.tmp.cleanup()
+
+    def test_bracket_feh(self):
+        """Test that off-grid values find their neighbors and grid values match exactly."""
+        lo, hi, w = bracket_feh(-0.13)
+        self.assertEqual((lo, hi), (-0.25, 0.0))
+        self.assertAlmostEqual(w, 0.48)
+        self.assertEqual(bracket_feh(-1.75), (-1.75, -1.75, 0.0))
+        self.assertEqual(grid_fehs([-0.13, 0.0, 0.1]), [-0.25, 0.0, 0.25])
+        with self.assertRaises(ValueError):
+            bracket_feh(0.7)
+
+    def test_tracks_blend_bracketing_grids(self):
+        """Test that an off-grid track is the EEP-by-EEP blend of its neighbors."""
+        masses = [0.95, 1.05]
+        lower = mass_curves(self.download_dir, -0.25, 0.4, masses)
+        upper = mass_curves(self.download_dir, 0.0, 0.4, masses)
+        mid = mass_curves(self.download_dir, -0.13, 0.4, masses)
+        for name, arr in mid.items():
+            n = arr.shape[1]
+            np.testing.assert_allclose(arr, 0.52 * lower[name][:, :n] + 0.48 * upper[name][:, :n])
+
+    def test_missing_grid_is_an_error(self):
+        """Test that a missing bracketing grid raises instead of using another grid."""
+        with self.assertRaises(RuntimeError):
+            mass_curves(self.download_dir, 0.1, 0.4, [1.0])
+
+    def test_only_range_errors_name_the_mass_codes(self):
+        """Test that masses off the grid get the mass-range error and other errors pass through."""
+        with self.assertRaisesRegex(ValueError, "mass code 00095-00120 is outside"):
+            _eep_layer(self.download_dir, 0.0, 0.4, np.array([0.95, 1.2]), 1e6, 1e10)
+
+        parse_error = ValueError("could not convert string to float")
+        with mock.patch.object(evolutionary_track, "load_eep_grid", side_effect=parse_error):
+            with self.assertRaises(ValueError) as caught:
+                _eep_layer(self.download_dir, 0.0, 0.4, np.array([0.95, 1.05]), 1e6, 1e10)
+        self.assertIs(caught.exception, parse_error)
+
+    def test_isochrones_blend_on_common_eeps(self):
+        """Test that isochrones are aligned by EEP before blending."""
+        lo = {"eep": np.array([1.0, 2.0, 3.0]), "T": np.array([3.6, 3.7, 3.8])}
+        hi = {"eep": np.array([2.0, 3.0, 4.0]), "T": np.array([3.8, 3.9, 4.0])}
+        iso = blend_isochrones(lo, hi, 0.5, "eep")
+        np.testing.assert_allclose(iso["eep"], [2.0, 3.0])
+        np.testing.assert_allclose(iso["T"], [3.75, 3.85])
+
+    def test_missing_brackets_are_downloaded(self):
+        """Test that only the uninstalled bracketing grids are requested."""
+        config_file = os.path.join(self.download_dir, "config.json")
+        with open(config_file, "w") as f:
+            json.dump({"DOWNLOAD_DIR": self.download_dir}, f)
+        with mock.patch.object(config_utils, "CONFIG_FILE", config_file), \
+                mock.patch("comp333.files.download_manager.download_all") as download_all:
+            self.assertEqual(ensure_eep_grids([-0.13, 0.1], 0.4), [0.25])
+        download_all.assert_called_once_with(eep_vcrit=0.4, fehs=[0.25])
+
+
+if __name__ == "__main__":
+    unittest.main()
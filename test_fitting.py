@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import write_eep_dir, track_arrays
+from comp333.files.fitting import _grid_models, build_fit_index, fit_point, fit_points
+
+
+class TestFitting(unittest.TestCase):
+    """Unit tests for the (log T_eff, log L) fitting engine."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        masses = [0.8, 0.9, 1.0, 1.1, 1.2]
+        write_eep_dir(cls.tmp.name, masses, feh=0.0)
+        write_eep_dir(cls.tmp.name, masses, feh=-0.25)
+        cls.index = build_fit_index([0.0, -0.25], 0.4, download_dir=cls.tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _model_point(self, mass, feh, eep):
+        _, age, logT, logL, _ = track_arrays(mass, feh)
+        return logT[eep - 1], logL[eep - 1], np.log10(age[eep - 1])
+
+    def test_recovers_mass_and_age(self):
+        """Test that a point taken from a track fits back to that track."""
+        x, y, log_age = self._model_point(1.0, 0.0, 400)
+        r = fit_point(self.index, {"x": x, "x_err": 0.002, "y": y, "y_err": 0.005})
+        self.assertAlmostEqual(r["best_mass"], 1.0, delta=0.03)
+        self.assertAlmostEqual(r["mass"], 1.0, delta=3 * r["mass_err"] + 0.03)
+        self.assertAlmostEqual(r["log_age"], log_age, delta=3 * r["log_age_err"] + 0.05)
+        self.assertGreater(r["n_models"], 0)
+
+    def test_range_constraints(self):
+        """Test that x + y_range and box-only constraints are supported."""
+        x, y, _ = self._model_point(1.0, 0.0, 300)
+        r = fit_point(self.index, {"x": x, "y_range": [y - 0.05, y + 0.05]})
+        self.assertIsNotNone(r)
+        self.assertTrue(0.8 <= r["mass"] <= 1.2)
+
+        box = fit_point(self.index, {"x_range": [x - 0.01, x + 0.01], "y_range": [y - 0.05, y + 0.05]})
+        self.assertIsNotNone(box)
+
+    def test_one_sided_constraint_uses_whole_column(self):
+        """Test that an x-only point matches models at every luminosity."""
+        x, _, _ = self._model_point(1.0, 0.0, 300)
+        only_x = fit_point(self.index, {"x": x})
+        both = fit_point(self.index, {"x": x, "y": 0.0})
+        self.assertGreater(only_x["n_models"], both["n_models"])
+
+    def test_unmatched_and_invalid_points(self):
+        """Test that impossible points give None instead of raising."""
+        results = fit_points(self.index, [{"x": 9.0, "y": 9.0}, {"name": "empty"}])
+        self.assertEqual(results, [None, None])
+
+    def test_last_eep_of_short_tracks_is_kept(self):
+        """Test that every EEP of a track shorter than the grid, its last included, becomes a model."""
+        with tempfile.TemporaryDirectory() as tmp:
+            eep_dir = write_eep_dir(tmp, [0.6, 0.8], feh=0.0)
+            logT, _, mass, log_age, _, prior = _grid_models(eep_dir, 0.0, None, 1)
+        short = mass == 0.6
+        _, age, _, _, _ = track_arrays(0.6)
+        self.assertEqual(np.count_nonzero(short), len(age))
+        self.assertEqual(np.count_nonzero(mass == 0.8), len(track_arrays(0.8)[1]))
+        self.assertAlmostEqual(log_age[short][-1], np.log10(age[-1]))
+        self.assertTrue(np.all(prior > 0))
+
+    def test_missing_grid_raises(self):
+        """Test that an uninstalled metallicity is an error, not a substitution."""
+        with self.assertRaises(RuntimeError):
+            build_fit_index([0.5], 0.4, download_dir=self.tmp.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
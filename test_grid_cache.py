@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from comp333.files import config_utils
+from comp333.files.grid_cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    """Unit tests for the byte-bounded least-recently-used grid cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that inserting past the budget drops the oldest unused entry."""
+        cache = LruCache(max_bytes=2500)
+        cache["a"] = np.zeros(100)  # 800 bytes each
+        cache["b"] = np.zeros(100)
+        cache.get("a")
+        cache["c"] = np.zeros(100)
+        cache["d"] = np.zeros(100)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.total_bytes, 2500)
+
+    def test_sizes_dicts_of_arrays(self):
+        """Test that dict values are charged for every array they hold."""
+        cache = LruCache()
+        cache["track"] = {"x": np.zeros(10), "y": np.zeros(20)}
+        self.assertEqual(cache.total_bytes, 240)
+        cache.pop("track")
+        self.assertEqual(cache.total_bytes, 0)
+
+    def test_shrinking_budget_evicts(self):
+        """Test that lowering the budget evicts immediately."""
+        cache = LruCache()
+        for key in "abc":
+            cache[key] = np.zeros(100)
+        cache.set_budget(1000)
+        self.assertEqual(len(cache), 1)
+        self.assertIn("c", cache)
+
+
+class TestConfigMemo(unittest.TestCase):
+    """Unit tests for the parsed config.json memo."""
+
+    def test_callers_get_independent_copies(self):
+        """Test that a cached config cannot be modified through a returned copy."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            with open(path, "w") as f:
+                json.dump({"DOWNLOAD_DIR": tmp}, f)
+            with mock.patch.object(config_utils, "CONFIG_FILE", path):
+                config_utils.load_config()["DOWNLOAD_DIR"] = "elsewhere"
+                self.assertEqual(config_utils.load_config()["DOWNLOAD_DIR"], tmp)
+
+                with open(path, "w") as f:
+                    json.dump({"DOWNLOAD_DIR": tmp, "DOWNLOAD_MODE": "stream"}, f)
+                st = os.stat(path)
+                os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+                self.assertEqual(config_utils.load_config()["DOWNLOAD_MODE"], "stream")
+
+
+if __name__ == "__main__":
+    unittest.main()
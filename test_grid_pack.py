@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import write_eep_dir, write_track, mass_to_code
+from comp333.files import manifest
+from comp333.files.eep_grid import load_eep_grid
+from comp333.files.grid_cache import GRID_CACHE
+from comp333.files.grid_pack import PACK_FILE, load_pack, pack_eep_dir
+from comp333.files.manifest import eep_mass_codes
+
+
+class TestGridPack(unittest.TestCase):
+    """Unit tests for the consolidated per-directory EEPS pack."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.eep_dir = write_eep_dir(self.tmp.name, [0.9, 1.0, 1.1], feh=0.0)
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        self.text_grid = load_eep_grid(self.eep_dir)
+        GRID_CACHE.clear()
+
+    def tearDown(self):
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        self.tmp.cleanup()
+
+    def test_pack_matches_text_tracks(self):
+        """Test that grids loaded from the pack equal those parsed from text."""
+        pack_eep_dir(self.eep_dir)
+        grid = load_eep_grid(self.eep_dir, mass_range=(0.95, 1.05))
+        self.assertEqual(grid.codes, ["00090", "00100", "00110"])
+        for name, arr in self.text_grid.columns.items():
+            np.testing.assert_array_equal(grid[name], arr)
+        self.assertIsNotNone(load_pack(self.eep_dir))
+
+    def test_text_can_be_deleted(self):
+        """Test that a packed directory without text tracks still loads and lists its masses."""
+        pack_eep_dir(self.eep_dir, delete_text=True)
+        self.assertEqual(os.listdir(self.eep_dir), [PACK_FILE])
+        self.assertEqual(eep_mass_codes(self.eep_dir), ["00090", "00100", "00110"])
+        grid = load_eep_grid(self.eep_dir, codes=eep_mass_codes(self.eep_dir))
+        np.testing.assert_array_equal(grid["log_Teff"], self.text_grid["log_Teff"])
+
+    def test_tracks_added_after_packing_are_read(self):
+        """Test that a track missing from the pack falls back to its text file."""
+        pack_eep_dir(self.eep_dir)
+        write_track(os.path.join(self.eep_dir, f"{mass_to_code(1.2)}M.track.eep"), 1.2, feh=0.0)
+        grid = load_eep_grid(self.eep_dir)
+        self.assertEqual(grid.codes[-1], "00120")
+        self.assertEqual(len(grid.masses), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from comp333.files import instrument
+
+
+class TestInstrument(unittest.TestCase):
+    """Unit tests for the opt-in stage tracing layer."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        instrument.finish()
+        self.tmp.cleanup()
+
+    def test_disabled_is_a_shared_noop(self):
+        """Test that stages cost nothing and record nothing when tracing is off."""
+        self.assertFalse(instrument.enabled())
+        self.assertIs(instrument.stage("a"), instrument.stage("b"))
+        with instrument.stage("a"):
+            instrument.add(rows=10)
+        self.assertIsNone(instrument.finish())
+
+    def test_jsonl_records_nested_stages_and_counters(self):
+        """Test that counters land on the innermost stage and peaks propagate up."""
+        path = os.path.join(self.tmp.name, "trace.jsonl")
+        instrument.start(path)
+        with instrument.stage("outer", feh=0.0):
+            with instrument.stage("inner"):
+                instrument.add(bytes_read=100, rows=2)
+                instrument.add(bytes_read=50, rows=1)
+                blob = bytearray(2_000_000)
+            del blob
+        instrument.finish()
+
+        with open(path) as f:
+            events = {e["stage"]: e for e in map(json.loads, f)}
+        self.assertEqual(events["inner"]["bytes_read"], 150)
+        self.assertEqual(events["inner"]["rows"], 3)
+        self.assertNotIn("rows", events["outer"])
+        self.assertEqual(events["outer"]["feh"], 0.0)
+        self.assertGreaterEqual(events["inner"]["peak_mem_bytes"], 2_000_000)
+        self.assertGreaterEqual(events["outer"]["peak_mem_bytes"], 2_000_000)
+        self.assertIn("process", events)
+
+    def test_no_memory_peak_for_overlapping_threads(self):
+        """Test that stages overlapping another thread's stage report no peak memory."""
+        import threading
+
+        path = os.path.join(self.tmp.name, "trace.jsonl")
+        instrument.start(path)
+        started, release = threading.Event(), threading.Event()
+
+        def worker():
+            with instrument.stage("worker"):
+                started.set()
+                release.wait(5)
+
+        with instrument.stage("solo"):
+            pass
+        with instrument.stage("overlapped"):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            started.wait(5)
+            with instrument.stage("during"):
+                pass
+            release.set()
+            thread.join()
+        instrument.finish()
+
+        with open(path) as f:
+            events = {e["stage"]: e for e in map(json.loads, f)}
+        self.assertIn("peak_mem_bytes", events["solo"])
+        for name in ("worker", "overlapped", "during"):
+            self.assertNotIn("peak_mem_bytes", events[name])
+
+    def test_chrome_trace_format(self):
+        """Test that a non-.jsonl path gets a Chrome trace of complete events."""
+        path = os.path.join(self.tmp.name, "trace.json")
+        instrument.start(path, memory=False)
+        with instrument.stage("work"):
+            pass
+        instrument.finish()
+
+        with open(path) as f:
+            trace = json.load(f)
+        work = [e for e in trace["traceEvents"] if e["name"] == "work"][0]
+        self.assertEqual(work["ph"], "X")
+        self.assertGreaterEqual(work["dur"], 0)
+
+    def test_failed_stage_is_marked(self):
+        """Test that a stage left by an exception is still recorded, with the error."""
+        path = os.path.join(self.tmp.name, "trace.jsonl")
+        instrument.start(path, memory=False)
+        with self.assertRaises(KeyError):
+            with instrument.stage("boom"):
+                raise KeyError("x")
+        instrument.finish()
+        with open(path) as f:
+            first = json.loads(f.readline())
+        self.assertEqual(first["error"], "KeyError")
+
+    def test_second_start_is_an_error(self):
+        """Test that starting a trace while one is running raises instead of dropping the first."""
+        first = os.path.join(self.tmp.name, "first.jsonl")
+        instrument.start(first, memory=False)
+        with self.assertRaises(RuntimeError):
+            instrument.start(os.path.join(self.tmp.name, "second.jsonl"), memory=False)
+        self.assertEqual(instrument.finish(), first)
+
+    def test_environment_variable_wins_over_config(self):
+        """Test that COMP333_TRACE overrides the run config's trace section."""
+        env_path = os.path.join(self.tmp.name, "env.jsonl")
+        with mock.patch.dict(os.environ, {instrument.TRACE_ENV: env_path}):
+            self.assertTrue(instrument.start_from_config({"path": "ignored.json"}))
+        self.assertEqual(instrument.finish(), env_path)
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(instrument.start_from_config(None))
+            self.assertFalse(instrument.start_from_config({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
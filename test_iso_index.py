@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import write_isochrone, iso_block
+from comp333.files import iso_index
+from comp333.files.grid_cache import GRID_CACHE
+from comp333.files.iso_index import (
+    load_iso_index,
+    nearest_age,
+    read_iso_block,
+    select_iso_blocks,
+)
+
+
+class TestIsoIndex(unittest.TestCase):
+    """Unit tests for the per-age block index over .iso.cmd files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.iso_path = write_isochrone(
+            os.path.join(self.tmp.name, "test.iso.cmd"),
+            log_ages=[6.0, 6.5, 7.0, 7.5],
+            eep_step=5,
+        )
+
+    def tearDown(self):
+        GRID_CACHE.clear()
+        self.tmp.cleanup()
+
+    def test_index_lists_every_age_block(self):
+        """Test that the index records one block per log-age."""
+        index = load_iso_index(self.iso_path)
+        self.assertEqual(index["ages"], [6.0, 6.5, 7.0, 7.5])
+        self.assertEqual(len(index["blocks"]), 4)
+        self.assertTrue(os.path.isfile(self.iso_path + ".idx.json"))
+
+    def test_nearest_age_snaps_to_grid(self):
+        """Test that a requested age snaps to the closest block."""
+        index = load_iso_index(self.iso_path)
+        self.assertEqual(nearest_age(index, 6.9), 7.0)
+        self.assertEqual(nearest_age(index, 1.0), 6.0)
+
+    def test_block_rows_match_written_values(self):
+        """Test that the seek-and-parse path returns exactly the block's rows."""
+        chosen, block = read_iso_block(self.iso_path, 6.5, columns=("EEP", "log_Teff", "log_L"))
+        eep, _, logT, logL = iso_block(6.5, eep_step=5)
+        self.assertEqual(chosen, 6.5)
+        np.testing.assert_allclose(block["EEP"], eep)
+        np.testing.assert_allclose(block["log_Teff"], logT)
+        np.testing.assert_allclose(block["log_L"], logL)
+
+    def test_streamed_selection_clips_to_bbox(self):
+        """Test that chunked reads keep exactly the rows inside the box, for several ages."""
+        bbox = (3.6, 3.75, -0.5, 1.0)
+        iso_index.STREAM_CHUNK_ROWS, old_chunk = 7, iso_index.STREAM_CHUNK_ROWS
+        try:
+            blocks = select_iso_blocks(self.iso_path, [7.4, 6.1], columns=("EEP",), bbox=bbox)
+        finally:
+            iso_index.STREAM_CHUNK_ROWS = old_chunk
+        self.assertEqual([chosen for chosen, _ in blocks], [7.5, 6.0])
+        for chosen, block in blocks:
+            eep, _, logT, logL = iso_block(chosen, eep_step=5)
+            inside = (logT >= bbox[0]) & (logT <= bbox[1]) & (logL >= bbox[2]) & (logL <= bbox[3])
+            self.assertEqual(list(block), ["EEP"])
+            np.testing.assert_allclose(block["EEP"], eep[inside])
+
+    def test_index_rebuilt_when_file_changes(self):
+        """Test that a rewritten isochrone file is re-indexed."""
+        load_iso_index(self.iso_path)
+        write_isochrone(self.iso_path, log_ages=[8.0], eep_step=5)
+        self.assertEqual(load_iso_index(self.iso_path)["ages"], [8.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
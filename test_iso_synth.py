@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import write_eep_dir, iso_block
+from comp333.files.iso_synth import load_synth_grid, synthesize_isochrones
+
+
+class TestIsoSynth(unittest.TestCase):
+    """Unit tests for isochrones synthesized from the EEP track grid."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        write_eep_dir(cls.tmp.name, np.round(np.arange(0.5, 2.01, 0.1), 2))
+        cls.grid = load_synth_grid(cls.tmp.name, 0.0, 0.4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_reference_isochrone(self):
+        """Test that a synthesized isochrone follows the exact one for the same age."""
+        iso = synthesize_isochrones(self.grid, [9.0])[0]
+        eep, mass, logT, logL = iso_block(9.0)
+        common, ia, ib = np.intersect1d(eep.astype(int), iso["eep"], return_indices=True)
+        self.assertGreater(len(common), 100)
+        np.testing.assert_allclose(iso["log_Teff"][ib], logT[ia], atol=1e-3)
+        np.testing.assert_allclose(iso["log_L"][ib], logL[ia], atol=1e-2)
+        np.testing.assert_allclose(iso["initial_mass"][ib], mass[ia], rtol=1e-2)
+
+    def test_requested_age_is_not_snapped(self):
+        """Test that off-grid ages are kept exactly and differ from their neighbours."""
+        a, b = synthesize_isochrones(self.grid, [9.0, 9.03])
+        self.assertEqual(b["log_age"], 9.03)
+        shared = np.intersect1d(a["eep"], b["eep"])
+        mass_a = a["initial_mass"][np.isin(a["eep"], shared)]
+        mass_b = b["initial_mass"][np.isin(b["eep"], shared)]
+        self.assertTrue(np.all(mass_b < mass_a))
+
+    def test_many_ages_in_one_call(self):
+        """Test that more ages than one vectorized chunk are all returned in order."""
+        ages = np.linspace(8.5, 9.5, 40)
+        isos = synthesize_isochrones(self.grid, ages)
+        self.assertEqual([iso["log_age"] for iso in isos], list(ages))
+
+    def test_missing_grid_raises(self):
+        """Test that synthesis needs the EEPS grid for the requested [Fe/H]."""
+        with self.assertRaises(RuntimeError):
+            load_synth_grid(self.tmp.name, -1.0, 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from comp333.files import config_utils
+from comp333.files.grid_cache import GRID_CACHE
+from comp333.files.layer_cache import LAYER_DIRNAME, cached_layer, cached_layers, path_signature
+
+
+def _feh_layer(feh, n):
+    # Module level so worker processes can unpickle it
+    return [(feh, np.full(n, feh), np.arange(n, dtype=np.float64))]
+
+
+class TestLayerCache(unittest.TestCase):
+    """Unit tests for content-hash memoization of plot layers."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config_file = os.path.join(self.tmp.name, "config.json")
+        with open(config_file, "w") as f:
+            json.dump({"DOWNLOAD_DIR": self.tmp.name}, f)
+        self.patch = mock.patch.object(config_utils, "CONFIG_FILE", config_file)
+        self.patch.start()
+        GRID_CACHE.clear()
+        self.calls = 0
+
+    def tearDown(self):
+        self.patch.stop()
+        GRID_CACHE.clear()
+        self.tmp.cleanup()
+
+    def _compute(self):
+        self.calls += 1
+        return [(8.5, np.array([3.7, 3.6]), np.array([0.1, 0.2])), (9.0, np.array([3.65]), np.array([0.3]))]
+
+    def test_layer_reused_from_disk(self):
+        """Test that a new process (empty memory cache) reads the saved layer instead of recomputing."""
+        first = cached_layer("iso", {"feh": 0.0}, self._compute)
+        GRID_CACHE.clear()
+        second = cached_layer("iso", {"feh": 0.0}, self._compute)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, LAYER_DIRNAME))), 1)
+        for a, b in zip(first, second):
+            self.assertEqual(float(a[0]), float(b[0]))
+            np.testing.assert_array_equal(a[1], b[1])
+            np.testing.assert_array_equal(a[2], b[2])
+
+    def test_changed_inputs_recompute(self):
+        """Test that any change to a layer's inputs misses the cache."""
+        cached_layer("iso", {"feh": 0.0, "ages": [8.5, 9.0]}, self._compute)
+        cached_layer("iso", {"feh": 0.0, "ages": [8.5, 9.5]}, self._compute)
+        cached_layer("eep", {"feh": 0.0, "ages": [8.5, 9.0]}, self._compute)
+        self.assertEqual(self.calls, 3)
+
+    def test_signature_follows_file_changes(self):
+        """Test that rewriting a source file changes its signature."""
+        path = os.path.join(self.tmp.name, "grid.iso.cmd")
+        with open(path, "w") as f:
+            f.write("a")
+        before = path_signature(path)
+        with open(path, "w") as f:
+            f.write("ab")
+        self.assertNotEqual(path_signature(path), before)
+        self.assertEqual(path_signature(os.path.join(self.tmp.name, "missing")), [None])
+
+    def test_track_edited_in_place_is_a_miss(self):
+        """Test that touching a track the layer reads recomputes it, and other tracks do not."""
+        import matplotlib
+        matplotlib.use("Agg")
+        from mist_fixtures import write_eep_dir
+        from comp333.files import evolutionary_track, manifest
+        from comp333.files.render import new_figure
+        from comp333.files.track_cache import warm_cache
+
+        eep_dir = write_eep_dir(self.tmp.name, [0.9, 1.0, 1.1, 1.2])
+        manifest._MEMO.clear()
+        cfg = {"min_mass_code": "00100", "max_mass_code": "00110", "age_min": 1e6, "age_max": 1e10}
+
+        def touch(code):
+            path = os.path.join(eep_dir, f"{code}M.track.eep")
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        warm_cache(eep_dir)  # creating .track_cache later would change the directory's signature
+        with mock.patch.object(evolutionary_track, "_eep_layer", wraps=evolutionary_track._eep_layer) as layer:
+            evolutionary_track.plot_eep(cfg, ax=new_figure()[1])
+            touch("00090")  # outside the plotted masses
+            evolutionary_track.plot_eep(cfg, ax=new_figure()[1])
+            self.assertEqual(layer.call_count, 1)
+            touch("00100")
+            evolutionary_track.plot_eep(cfg, ax=new_figure()[1])
+            self.assertEqual(layer.call_count, 2)
+        manifest._MEMO.clear()
+
+    def test_parallel_layers_keep_job_order(self):
+        """Test that layers computed in worker processes come back in job order, like a serial run."""
+        jobs = [({"feh": f}, (f, 3)) for f in (0.25, -1.0, 0.0, -0.5)]
+        parallel = cached_layers("eep", jobs, _feh_layer, workers=3)
+        GRID_CACHE.clear()
+        for name in os.listdir(os.path.join(self.tmp.name, LAYER_DIRNAME)):
+            os.remove(os.path.join(self.tmp.name, LAYER_DIRNAME, name))
+        serial = cached_layers("eep", jobs, _feh_layer, workers=1)
+        self.assertEqual([float(layer[0][0]) for layer in parallel], [0.25, -1.0, 0.0, -0.5])
+        for a, b in zip(parallel, serial):
+            np.testing.assert_array_equal(a[0][1], b[0][1])
+
+    def test_parallel_layers_compute_only_misses(self):
+        """Test that cached metallicities are not handed to the workers again."""
+        cached_layer("eep", {"feh": 0.0}, self._compute)
+        jobs = [({"feh": 0.0}, (0.0, 2)), ({"feh": 0.5}, (0.5, 2))]
+        with mock.patch("comp333.files.layer_cache.ProcessPoolExecutor") as pool:
+            layers = cached_layers("eep", jobs, _feh_layer, workers=4)
+        pool.assert_not_called()  # one miss runs in this process
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(layers[0]), 2)
+        self.assertEqual(float(layers[1][0][0]), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
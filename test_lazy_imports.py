@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _modules_after(statement):
+    """Run statement in a fresh interpreter and list the heavy modules it loaded."""
+    code = (
+        f"import json, sys\n{statement}\n"
+        "print(json.dumps([m for m in ('numpy', 'matplotlib', 'astropy', 'requests') if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+class TestLazyImports(unittest.TestCase):
+    """Unit tests that keep heavy dependencies off the CLI startup path."""
+
+    def test_master_import_is_light(self):
+        """Test that importing comp333.master loads no heavy dependency."""
+        self.assertEqual(_modules_after("import comp333.master"), [])
+
+    def test_download_manager_defers_requests(self):
+        """Test that requests is only imported once a transfer starts."""
+        self.assertEqual(_modules_after("import comp333.files.download_manager"), [])
+
+    def test_download_only_run_skips_numpy(self):
+        """Test that a download-only run of installed grids never imports numpy."""
+        from mist_fixtures import write_eep_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_eep_dir(tmp, [0.9, 1.0], feh=0.0)
+            config_file = os.path.join(tmp, "config.json")
+            with open(config_file, "w") as f:
+                json.dump({"DOWNLOAD_DIR": tmp, "MIST_BASE_URL": "http://127.0.0.1:9/"}, f)
+            loaded = _modules_after(
+                "from comp333.files import config_utils\n"
+                f"config_utils.CONFIG_FILE = {config_file!r}\n"
+                "from comp333.master import run_from_config\n"
+                "run_from_config({'eep_download': {'run': True, 'vcrit': 0.4, 'feh': [0.0]}})"
+            )
+        self.assertNotIn("numpy", loaded)
+
+    def test_plotting_modules_defer_pyplot_and_astropy(self):
+        """Test that plot modules need only numpy at import time."""
+        loaded = _modules_after("import comp333.files.evolutionary_track, comp333.files.isochrone")
+        self.assertEqual(loaded, ["numpy"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from mist_fixtures import write_eep_dir, write_iso_dir, write_track, mass_to_code
+from comp333.files import manifest
+from comp333.files.manifest import (
+    MANIFEST_FILE,
+    eep_mass_codes,
+    find_eep_dir,
+    find_iso_file,
+    installed_grids,
+    is_installed,
+    load_manifest,
+)
+
+
+def _touch_later(path):
+    """Advance a directory's mtime so coarse filesystem clocks still see a change."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+class TestManifest(unittest.TestCase):
+    """Unit tests for the persisted manifest of installed MIST grids."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.download_dir = self.tmp.name
+        self.eep_dir = write_eep_dir(self.download_dir, [0.9, 1.0], feh=-0.25)
+        self.iso_dir = write_iso_dir(self.download_dir, [0.0, -0.25], log_ages=[9.0], eep_step=50)
+        manifest._MEMO.clear()
+
+    def tearDown(self):
+        manifest._MEMO.clear()
+        self.tmp.cleanup()
+
+    def test_manifest_is_written(self):
+        """Test that the first lookup records both grids on disk."""
+        load_manifest(self.download_dir)
+        with open(os.path.join(self.download_dir, MANIFEST_FILE)) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["version"], manifest.MANIFEST_VERSION)
+        self.assertEqual(len(installed_grids(self.download_dir)), 2)
+
+    def test_find_eep_dir_by_feh_and_vcrit(self):
+        """Test that EEPS directories are looked up by their parsed parameters."""
+        self.assertEqual(find_eep_dir(self.download_dir, -0.25, 0.4), self.eep_dir)
+        self.assertIsNone(find_eep_dir(self.download_dir, 0.0, 0.4))
+        self.assertIsNone(find_eep_dir(self.download_dir, -0.25, 0.0))
+
+    def test_mass_codes_follow_new_tracks(self):
+        """Test that adding a track to an EEPS directory updates its mass codes."""
+        self.assertEqual(eep_mass_codes(self.eep_dir), ["00090", "00100"])
+        write_track(os.path.join(self.eep_dir, f"{mass_to_code(1.1)}M.track.eep"), 1.1, feh=-0.25)
+        _touch_later(self.eep_dir)
+        self.assertEqual(eep_mass_codes(self.eep_dir), ["00090", "00100", "00110"])
+
+    def test_find_iso_file(self):
+        """Test that isochrone files are found by [Fe/H]."""
+        path = find_iso_file(self.iso_dir, -0.25, 0.0)
+        self.assertTrue(path.endswith("MIST_v1.2_feh_m0.25_afe_p0.0_vvcrit0.0_UBVRIplus.iso.cmd"))
+        self.assertIsNone(find_iso_file(self.iso_dir, 0.5, 0.0))
+
+    def test_archives_and_partials_are_not_installed(self):
+        """Test that leftover tarballs and .part files do not count as installed."""
+        base = "MIST_v1.2_feh_p0.50_afe_p0.0_vvcrit0.4_EEPS"
+        for name in (base + ".txz", base + ".txz.part"):
+            open(os.path.join(self.download_dir, name), "w").close()
+        self.assertFalse(is_installed(self.download_dir, base))
+        self.assertTrue(is_installed(self.download_dir, "MIST_v1.2_vvcrit0.0_UBVRIplus"))
+
+    def test_new_grid_picked_up_incrementally(self):
+        """Test that a grid extracted later is added without rescanning the others."""
+        load_manifest(self.download_dir)
+        known = manifest._MEMO[os.path.abspath(self.download_dir)]["grids"]
+        old_entry = known[os.path.basename(self.eep_dir)]
+
+        new_dir = write_eep_dir(self.download_dir, [1.0], feh=0.0)
+        _touch_later(self.download_dir)
+        self.assertEqual(find_eep_dir(self.download_dir, 0.0, 0.4), new_dir)
+        grids = manifest._MEMO[os.path.abspath(self.download_dir)]["grids"]
+        self.assertIs(grids[os.path.basename(self.eep_dir)], old_entry)
+
+    def test_saving_does_not_invalidate_itself(self):
+        """Test that writing the manifest into DOWNLOAD_DIR does not force a rescan."""
+        saved = load_manifest(self.download_dir)
+        self.assertEqual(saved["dir_mtime_ns"], os.stat(self.download_dir).st_mtime_ns)
+        manifest_path = os.path.join(self.download_dir, MANIFEST_FILE)
+        before = os.stat(manifest_path).st_mtime_ns
+        load_manifest(self.download_dir)
+        self.assertEqual(os.stat(manifest_path).st_mtime_ns, before)
+
+    def test_manifest_survives_a_new_process(self):
+        """Test that a fresh process reuses the saved manifest."""
+        load_manifest(self.download_dir)
+        manifest._MEMO.clear()
+        self.assertEqual(find_eep_dir(self.download_dir, -0.25, 0.4), self.eep_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+from comp333.files.download_engine import PART_SUFFIX, fetch_archive
+from comp333.files.mirror_cache import CHECKSUM_FILE, fetch_from_sources, read_checksums, sync_archives
+from comp333.mirror import make_server, parse_range
+
+ARCHIVE_NAME = "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS.txz"
+DEAD_URL = "http://127.0.0.1:9/"
+
+
+def _serve(directory):
+    server = make_server(directory, host="127.0.0.1", port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+class TestMirror(unittest.TestCase):
+    """Unit tests for the tarball mirror: sync, Range serving and source order."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upstream_dir = os.path.join(self.tmp.name, "upstream")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        for d in (self.upstream_dir, self.cache_dir, self.data_dir):
+            os.makedirs(d)
+        src = os.path.join(self.tmp.name, "src", ARCHIVE_NAME[:-4])
+        os.makedirs(src)
+        with open(os.path.join(src, "00100M.track.eep"), "wb") as f:
+            f.write(os.urandom(50_000))
+        with tarfile.open(os.path.join(self.upstream_dir, ARCHIVE_NAME), "w:xz") as tar:
+            tar.add(src, arcname=os.path.basename(src))
+        self.upstream, self.upstream_url = _serve(self.upstream_dir)
+
+    def tearDown(self):
+        self.upstream.shutdown()
+        self.upstream.server_close()
+        self.tmp.cleanup()
+
+    def _installed(self):
+        return os.path.isfile(os.path.join(self.data_dir, ARCHIVE_NAME[:-4], "00100M.track.eep"))
+
+    def test_parse_range(self):
+        """Test that single byte ranges are parsed and unsatisfiable ones rejected."""
+        self.assertEqual(parse_range("bytes=10-", 100), (10, 99))
+        self.assertEqual(parse_range("bytes=10-19", 100), (10, 19))
+        self.assertEqual(parse_range("bytes=-5", 100), (95, 99))
+        self.assertEqual(parse_range("bytes=90-500", 100), (90, 99))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(parse_range(None, 100))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=100-", 100)
+
+    def test_resume_against_mirror(self):
+        """Test that an interrupted download resumes with a Range request to the mirror."""
+        with open(os.path.join(self.upstream_dir, ARCHIVE_NAME), "rb") as f:
+            payload = f.read()
+        target = os.path.join(self.data_dir, ARCHIVE_NAME)
+        with open(target + PART_SUFFIX, "wb") as f:
+            f.write(payload[:1000])
+        fetch_archive(self.upstream_url + ARCHIVE_NAME, target)
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), payload)
+
+    def test_sync_then_install_from_cache(self):
+        """Test that a synced tarball installs from the cache directory with upstream unreachable."""
+        results = sync_archives(self.cache_dir, [ARCHIVE_NAME], self.upstream_url)
+        self.assertEqual(results, {ARCHIVE_NAME: True})
+        self.assertIn(ARCHIVE_NAME, read_checksums(self.cache_dir))
+        self.assertEqual(sync_archives(self.cache_dir, [ARCHIVE_NAME], self.upstream_url), {ARCHIVE_NAME: None})
+
+        config = {"MIRROR_CACHE_DIR": self.cache_dir, "MIST_BASE_URL": DEAD_URL}
+        source = fetch_from_sources(ARCHIVE_NAME, os.path.join(self.data_dir, ARCHIVE_NAME), config)
+        self.assertEqual(source, "cache")
+        self.assertTrue(self._installed())
+        self.assertTrue(os.path.isfile(os.path.join(self.cache_dir, ARCHIVE_NAME)))  # shared copy kept
+
+    def test_mirror_before_upstream(self):
+        """Test that the mirror server is used before upstream, and upstream when the mirror fails."""
+        sync_archives(self.cache_dir, [ARCHIVE_NAME], self.upstream_url)
+        mirror, mirror_url = _serve(self.cache_dir)
+        try:
+            config = {"MIRROR_URL": mirror_url, "MIST_BASE_URL": DEAD_URL}
+            self.assertEqual(fetch_from_sources(ARCHIVE_NAME, os.path.join(self.data_dir, ARCHIVE_NAME), config),
+                             "mirror")
+        finally:
+            mirror.shutdown()
+            mirror.server_close()
+
+        os.remove(os.path.join(self.cache_dir, ARCHIVE_NAME))
+        config = {"MIRROR_URL": DEAD_URL, "MIST_BASE_URL": self.upstream_url}
+        self.assertEqual(fetch_from_sources(ARCHIVE_NAME, os.path.join(self.data_dir, ARCHIVE_NAME), config),
+                         "upstream")
+        self.assertTrue(self._installed())
+
+    def test_server_hides_non_archives(self):
+        """Test that only tarballs and the checksum list are served."""
+        import requests
+
+        with open(os.path.join(self.upstream_dir, "notes.txt"), "w") as f:
+            f.write("x")
+        self.assertEqual(requests.get(self.upstream_url + "notes.txt").status_code, 404)
+        self.assertEqual(requests.get(self.upstream_url + CHECKSUM_FILE).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import ISO_COLUMNS, TRACK_COLUMNS, iso_block, track_arrays, write_isochrone, write_track
+from comp333.files.mist_reader import read_iso, read_track
+
+
+class TestMistReader(unittest.TestCase):
+    """Unit tests for the named-column MIST track and isochrone reader."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.track = write_track(os.path.join(self.tmp.name, "00100M.track.eep"), 1.0)
+        self.iso = write_isochrone(os.path.join(self.tmp.name, "test.iso.cmd"), log_ages=[8.0, 9.0], eep_step=7)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_track_projection(self):
+        """Test that only the requested track columns are returned, by name."""
+        cols = read_track(self.track, ("star_age", "log_Teff"))
+        _, age, logT, _, _ = track_arrays(1.0)
+        self.assertEqual(list(cols), ["star_age", "log_Teff"])
+        self.assertEqual(cols["star_age"].dtype, np.float64)
+        np.testing.assert_allclose(cols["star_age"], age)
+        np.testing.assert_allclose(cols["log_Teff"], logT)
+
+    def test_track_all_columns(self):
+        """Test that every header name is available when no columns are given."""
+        cols = read_track(self.track)
+        self.assertEqual(list(cols), TRACK_COLUMNS)
+        self.assertEqual(len(cols["phase"]), 707)
+
+    def test_unknown_column_raises(self):
+        """Test that a misspelled column name is a KeyError."""
+        with self.assertRaises(KeyError):
+            read_track(self.track, ("log_teff",))
+
+    def test_iso_blocks(self):
+        """Test that every isochrone block is read in file order."""
+        blocks = read_iso(self.iso, ("log10_isochrone_age_yr", "log_L"))
+        self.assertEqual(len(blocks), 2)
+        _, _, _, logL = iso_block(9.0, eep_step=7)
+        self.assertTrue(np.all(blocks[1]["log10_isochrone_age_yr"] == 9.0))
+        np.testing.assert_allclose(blocks[1]["log_L"], logL)
+        self.assertEqual(list(read_iso(self.iso)[0]), ISO_COLUMNS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+from comp333.files.render import new_figure, save_figure
+
+
+class TestRender(unittest.TestCase):
+    """Unit tests for headless Figure/Axes rendering."""
+
+    def test_saves_each_supported_format(self):
+        """Test that png, pdf and svg files are written from one figure."""
+        fig, ax = new_figure(figsize=(4, 3), dpi=72)
+        ax.plot([3.7, 3.6], [0.0, 1.0], label="track")
+        ax.legend()
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in ("png", "pdf", "svg"):
+                path = save_figure(fig, os.path.join(tmp, "nested", f"hr.{fmt}"))
+                self.assertGreater(os.path.getsize(path), 0)
+
+    def test_unsupported_format_raises(self):
+        """Test that an unknown extension is rejected before writing."""
+        fig, _ = new_figure()
+        with self.assertRaises(ValueError):
+            save_figure(fig, "hr.bmp")
+
+    def test_figure_is_not_registered_with_pyplot(self):
+        """Test that headless figures never enter pyplot's global state."""
+        import matplotlib.pyplot as plt
+        before = plt.get_fignums()
+        new_figure()
+        self.assertEqual(plt.get_fignums(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
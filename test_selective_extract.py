@@ -0,0 +1,93 @@
+import os
+import tarfile
+import tempfile
+import unittest
+from comp333.files.eep_grid import _codes_for_range
+from comp333.files.selective_extract import (
+    INDEX_FILE,
+    bracket_codes,
+    ensure_eep_members,
+    ensure_iso_member,
+    extract_selected,
+    install_selected,
+    load_index,
+)
+
+EEP_NAME = "MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.4_EEPS"
+ISO_NAME = "MIST_v1.2_vvcrit0.0_UBVRIplus"
+CODES = ("00080", "00090", "00100", "00110", "00120", "00150")
+ISO_FEHS = ("m0.25", "p0.00", "p0.25")
+
+
+def _make_txz(root, top, files):
+    src = os.path.join(root, "src", top)
+    os.makedirs(src)
+    for name in files:
+        with open(os.path.join(src, name), "w") as f:
+            f.write(f"# {name}\n")
+    path = os.path.join(root, top + ".txz")
+    with tarfile.open(path, "w:xz") as tar:
+        tar.add(src, arcname=top)
+    return path
+
+
+class TestSelectiveExtract(unittest.TestCase):
+    """Unit tests for extracting only the needed members of MIST tarballs."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data_dir)
+        self.eep_archive = _make_txz(self.data_dir, EEP_NAME, [f"{c}M.track.eep" for c in CODES] + ["README"])
+        self.iso_archive = _make_txz(self.data_dir, ISO_NAME, [
+            f"MIST_v1.2_feh_{k}_afe_p0.0_vvcrit0.0_UBVRIplus.iso.cmd" for k in ISO_FEHS
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _tracks(self):
+        return sorted(n[:5] for n in os.listdir(os.path.join(self.data_dir, EEP_NAME)))
+
+    def test_bracket_codes_match_grid_loader(self):
+        """Test that selection keeps exactly the tracks load_eep_grid reads for a mass range."""
+        for mass_range in ((0.95, 1.12), (1.0, 1.1), (0.5, 0.85), (1.3, 2.0), None):
+            expected = list(CODES) if mass_range is None else _codes_for_range(list(CODES), mass_range)
+            self.assertEqual(bracket_codes(CODES, mass_range), expected)
+
+    def test_mass_range_with_bracketing_tracks(self):
+        """Test that only tracks in the mass range plus one neighbor on each side are extracted."""
+        members = extract_selected(self.eep_archive, self.data_dir, mass_range=(0.95, 1.12))
+        self.assertEqual(self._tracks(), ["00090", "00100", "00110", "00120"])
+        self.assertEqual(len(members), len(CODES) + 2)  # directory + README are listed too
+
+    def test_iso_files_for_requested_fehs(self):
+        """Test that the isochrone tarball yields only the requested [Fe/H] files."""
+        extract_selected(self.iso_archive, self.data_dir, fehs=[0.0])
+        names = os.listdir(os.path.join(self.data_dir, ISO_NAME))
+        self.assertEqual(names, ["MIST_v1.2_feh_p0.00_afe_p0.0_vvcrit0.0_UBVRIplus.iso.cmd"])
+
+    def test_on_demand_tracks_from_kept_archive(self):
+        """Test that a wider mass range later extracts the missing tracks from the kept archive."""
+        install_selected(self.eep_archive, self.data_dir, mass_range=(1.0, 1.0))
+        self.assertIn(EEP_NAME, load_index(self.data_dir))
+        self.assertTrue(os.path.isfile(os.path.join(self.data_dir, INDEX_FILE)))
+        self.assertEqual(self._tracks(), ["00090", "00100", "00110"])
+
+        extracted = ensure_eep_members(os.path.join(self.data_dir, EEP_NAME), (1.0, 1.3))
+        self.assertEqual(len(extracted), 2)
+        self.assertEqual(self._tracks(), ["00090", "00100", "00110", "00120", "00150"])
+        self.assertEqual(ensure_eep_members(os.path.join(self.data_dir, EEP_NAME), (1.0, 1.3)), [])
+        self.assertTrue(os.path.isfile(self.eep_archive))
+
+    def test_on_demand_iso_file(self):
+        """Test that a new [Fe/H] pulls its .iso.cmd file out of the kept archive."""
+        install_selected(self.iso_archive, self.data_dir, fehs=[0.0])
+        iso_dir = os.path.join(self.data_dir, ISO_NAME)
+        self.assertEqual(len(ensure_iso_member(iso_dir, -0.25)), 1)
+        self.assertEqual(len(os.listdir(iso_dir)), 2)
+        self.assertEqual(ensure_iso_member(iso_dir, 0.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+from mist_fixtures import write_eep_dir, write_iso_dir
+from comp333 import service
+from comp333.files import config_utils, manifest
+from comp333.files.grid_cache import GRID_CACHE
+
+
+class TestService(unittest.TestCase):
+    """Unit tests for the long-lived HTTP query service."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        data_dir = cls.tmp.name
+        write_eep_dir(data_dir, [0.9, 1.0, 1.1], feh=0.0)
+        write_eep_dir(data_dir, [0.9, 1.0, 1.1], feh=-0.25)
+        cls.iso_dir = write_iso_dir(data_dir, [0.0], log_ages=[8.5, 9.0], eep_step=50)
+        config_file = os.path.join(data_dir, "config.json")
+        with open(config_file, "w") as f:
+            json.dump({"DOWNLOAD_DIR": data_dir, "MIST_BASE_URL": "http://127.0.0.1:9/"}, f)
+        cls.patch = mock.patch.object(config_utils, "CONFIG_FILE", config_file)
+        cls.patch.start()
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+
+        cls.server = service.make_server(port=0, quiet=True)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.patch.stop()
+        manifest._MEMO.clear()
+        GRID_CACHE.clear()
+        cls.tmp.cleanup()
+
+    def _post(self, path, payload):
+        req = urllib.request.Request(self.url + path, data=json.dumps(payload).encode(), method="POST")
+        with urllib.request.urlopen(req) as resp:
+            return resp.headers["Content-Type"], resp.read()
+
+    def test_track_curves(self):
+        """Test that interpolated tracks come back without NaN padding."""
+        _, body = self._post("/curve", {"kind": "tracks", "feh": 0.0, "vcrit": 0.4, "masses": [0.95]})
+        track = json.loads(body)["tracks"][0]
+        self.assertEqual(track["mass"], 0.95)
+        self.assertGreater(len(track["log_Teff"]), 100)
+        self.assertNotIn(None, track["log_L"])
+
+    def test_isochrones_from_both_sources(self):
+        """Test that isochrones are served from the tracks and from the isochrone file."""
+        for source in ("tracks", "grid"):
+            _, body = self._post("/curve", {"kind": "isochrones", "source": source,
+                                            "feh": 0.0, "vcrit": 0.0, "log_ages": [9.0]})
+            iso = json.loads(body)["isochrones"][0]
+            self.assertAlmostEqual(iso["log_age"], 9.0, places=2)
+            self.assertEqual(len(iso["log_Teff"]), len(iso["log_L"]))
+
+    def test_fit_and_status(self):
+        """Test that fits are returned as JSON and later requests hit the cache."""
+        cfg = {"eep_plot_settings": {"vcrit": 0.4, "feh_list": [0.0]},
+               "points": [{"name": "Star", "x": 3.76, "x_err": 0.02, "y": 0.0, "y_err": 0.1}]}
+        _, body = self._post("/fit", cfg)
+        self.assertEqual(len(json.loads(body)["fits"]), 1)
+        self._post("/fit", cfg)
+        with urllib.request.urlopen(self.url + "/status") as resp:
+            stats = json.load(resp)["grid_cache"]
+        self.assertGreater(stats["hits"], 0)
+
+    def test_plot_png(self):
+        """Test that a run config is rendered to PNG bytes in the response."""
+        cfg = {
+            "eep_plot_settings": {"min_mass_code": "00090", "max_mass_code": "00110",
+                                  "age_min": 1.0e6, "age_max": 1.0e10, "vcrit": 0.4},
+            "plot_settings": {"iso_directory": self.iso_dir, "age_min": 8.5, "age_max": 9.0,
+                              "vcrit": 0.0, "title": "t", "xlabel": "x", "ylabel": "y"},
+            "output": {"path": os.path.join(self.tmp.name, "unused.png")},
+        }
+        content_type, body = self._post("/plot", cfg)
+        self.assertEqual(content_type, "image/png")
+        self.assertTrue(body.startswith(b"\x89PNG"))
+        self.assertFalse(os.path.exists(cfg["output"]["path"]))
+
+    def test_plot_never_downloads_or_animates(self):
+        """Test that /plot rejects uninstalled grids and ignores animation and worker settings."""
+        eep_cfg = {"min_mass_code": "00090", "max_mass_code": "00110",
+                   "age_min": 1.0e6, "age_max": 1.0e10, "vcrit": 0.4}
+        plot_cfg = {"iso_directory": self.iso_dir, "age_min": 8.5, "age_max": 9.0,
+                    "vcrit": 0.0, "title": "t", "xlabel": "x", "ylabel": "y"}
+        with mock.patch("comp333.files.download_manager.download_all") as download_all:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                self._post("/plot", {"eep_plot_settings": dict(eep_cfg, feh_list=[0.1]),
+                                     "plot_settings": plot_cfg})
+        self.assertEqual(ctx.exception.code, 400)
+        self.assertIn("not installed", json.load(ctx.exception)["error"])
+        download_all.assert_not_called()
+
+        animation_path = os.path.join(self.tmp.name, "anim.gif")
+        with mock.patch("comp333.files.layer_cache.ProcessPoolExecutor") as pool:
+            _, body = self._post("/plot", {
+                "eep_plot_settings": dict(eep_cfg, workers=4, n_masses=3, feh_list=[0.0, -0.25]),
+                "plot_settings": dict(plot_cfg, workers=4),
+                "plot_workers": 4,
+                "animation": {"run": True, "path": animation_path, "frames": 2},
+            })
+        self.assertTrue(body.startswith(b"\x89PNG"))
+        self.assertFalse(os.path.exists(animation_path))
+        pool.assert_not_called()
+
+    def test_bad_request(self):
+        """Test that invalid requests get a 400 with an error message."""
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._post("/curve", {"kind": "tracks", "feh": 0.5, "masses": [1.0]})
+        self.assertEqual(ctx.exception.code, 400)
+        self.assertIn("error", json.load(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
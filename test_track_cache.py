@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from mist_fixtures import write_eep_dir, track_arrays
+from comp333.files.track_cache import (
+    is_cache_fresh,
+    load_track_columns,
+    warm_cache,
+)
+
+
+class TestTrackCache(unittest.TestCase):
+    """Unit tests for the binary .track.eep cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.eep_dir = write_eep_dir(self.tmp.name, [0.5, 1.0])
+        self.track = os.path.join(self.eep_dir, "00100M.track.eep")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_loaded_columns_match_source(self):
+        """Test that cached columns equal the values written to the text file."""
+        cols = load_track_columns(self.track, ("star_age", "log_L", "log_Teff"))
+        _, age, logT, logL, _ = track_arrays(1.0)
+        np.testing.assert_allclose(cols["star_age"], age)
+        np.testing.assert_allclose(cols["log_L"], logL)
+        np.testing.assert_allclose(cols["log_Teff"], logT)
+        self.assertIsInstance(cols["star_age"], np.memmap)
+
+    def test_cache_goes_stale_when_source_changes(self):
+        """Test that a rewritten source file invalidates the cache."""
+        load_track_columns(self.track, ("star_age",))
+        self.assertTrue(is_cache_fresh(self.track))
+        with open(self.track, "a") as f:
+            f.write("\n")
+        self.assertFalse(is_cache_fresh(self.track))
+
+    def test_warm_cache_builds_each_file_once(self):
+        """Test that warming twice only builds on the first pass."""
+        self.assertEqual(warm_cache(self.eep_dir), 2)
+        self.assertEqual(warm_cache(self.eep_dir), 0)
+
+    def test_unknown_column_raises(self):
+        """Test that asking for a missing column raises KeyError."""
+        with self.assertRaises(KeyError):
+            load_track_columns(self.track, ("no_such_column",))
+
+
+if __name__ == '__main__':
+    unittest.main()